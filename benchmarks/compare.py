@@ -0,0 +1,71 @@
+"""
+Compare two benchmark reports produced by ``python -m benchmarks``.
+
+Prints every shared metric with its relative change and exits with status 1
+when any metric regressed by more than ``--threshold`` percent::
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+# Metrics whose names end with these suffixes are better when higher.
+HIGHER_IS_BETTER = ("_per_s", "hit_rate")
+
+
+def flatten(node, prefix=""):
+    """Map dotted metric paths to numbers, keying list rows by concurrency."""
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = ((row.get("concurrency", i), row) for i, row in enumerate(node))
+    else:
+        return {prefix: node} if isinstance(node, (int, float)) else {}
+
+    flat = {}
+    for key, value in items:
+        if key in ("concurrency", "iterations", "calls"):
+            continue
+        flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def compare(baseline, candidate, threshold):
+    """Return ``(rows, regressions)`` for metrics present in both reports."""
+    before = flatten(baseline["results"])
+    after = flatten(candidate["results"])
+    rows, regressions = [], []
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        change = (new - old) / old * 100 if old else 0.0
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        rows.append((name, old, new, change))
+        if worse > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    with open(args.candidate, encoding="utf-8") as fh:
+        candidate = json.load(fh)
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    for name, old, new, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:55} {old:>12g} {new:>12g} {change:>+8.1f}%{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Load test of WebSearchTool as agents call it, against a local Querit stub.
+
+Drives many concurrent ``_run`` (threads) or ``_arun`` (asyncio tasks) calls,
+or ``invoke`` / ``ainvoke`` to include LangChain's tool-call overhead, with
+one of two arrival patterns:
+
+* ``closed``: ``--concurrency`` agents each issue their next call as soon as
+  the previous one returns;
+* ``poisson``: calls arrive at ``--rate`` per second with exponential gaps,
+  whether or not earlier ones have finished. Latency is measured from the
+  scheduled arrival, so time spent queueing behind a saturated client
+  counts.
+
+Reports throughput, latency percentiles, error rate, peak thread count and
+peak memory in the ``python -m benchmarks`` format, so saved reports can be
+compared with ``python -m benchmarks.compare``. Run with::
+
+    python -m benchmarks.load [--mode poisson --rate 200] [--api async]
+        [--concurrency 32] [--duration 10] [--output load.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import langchain_websearch
+from langchain_websearch import ConnectionPool, WebSearchTool
+
+from .run import make_backend, percentiles
+from .stub_server import start_stub
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODES = ("closed", "poisson")
+APIS = ("sync", "async")
+
+
+class ResourceSampler:
+    """Track peak thread count and resident memory on a background thread."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss_mb = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+        current = rss_mb()
+        if current is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, current)
+
+
+def rss_mb():
+    """Resident memory of this process in MiB, or None where unavailable."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Peak rather than current, in KiB on Linux but bytes on macOS.
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+class Recorder:
+    """Thread-safe latency and error collector."""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, started, output):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies.append(elapsed)
+            # The tool reports failures in its output instead of raising.
+            self.errors += isinstance(output, str) and output.startswith(
+                "Search failed"
+            )
+
+    def add_error(self, started):
+        with self._lock:
+            self.latencies.append(time.perf_counter() - started)
+            self.errors += 1
+
+
+def make_tool(stub, concurrency):
+    pool = ConnectionPool(pool_size=concurrency)
+    backend = make_backend(stub, pool=pool)
+    return WebSearchTool(backend=backend), pool
+
+
+def query_stream(distinct, seed):
+    rng = random.Random(seed)
+    while True:
+        yield f"load query {rng.randrange(distinct)}"
+
+
+def call_sync(tool, entry, query):
+    if entry == "invoke":
+        return tool.invoke(query)
+    return tool._run(query)
+
+
+async def call_async(tool, entry, query):
+    if entry == "invoke":
+        return await tool.ainvoke(query)
+    return await tool._arun(query)
+
+
+def run_sync(tool, args, recorder):
+    queries = query_stream(args.distinct, args.seed)
+    lock = threading.Lock()
+    end = time.perf_counter() + args.duration
+
+    def next_query():
+        with lock:
+            return next(queries)
+
+    def one(query, started):
+        try:
+            recorder.add(started, call_sync(tool, args.entry, query))
+        except Exception:
+            recorder.add_error(started)
+
+    if args.mode == "closed":
+
+        def agent():
+            while time.perf_counter() < end:
+                one(next_query(), time.perf_counter())
+
+        threads = [threading.Thread(target=agent) for _ in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return
+
+    rng = random.Random(args.seed + 1)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        arrival = time.perf_counter()
+        while arrival < end:
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(one, next(queries), arrival)
+            arrival += rng.expovariate(args.rate)
+
+
+async def run_async(tool, args, recorder):
+    queries = query_stream(args.distinct, args.seed)
+    loop = asyncio.get_running_loop()
+    end = loop.time() + args.duration
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def one(query, started):
+        async with limit:
+            try:
+                recorder.add(started, await call_async(tool, args.entry, query))
+            except Exception:
+                recorder.add_error(started)
+
+    if args.mode == "closed":
+
+        async def agent():
+            while loop.time() < end:
+                await one(next(queries), time.perf_counter())
+
+        await asyncio.gather(*(agent() for _ in range(args.concurrency)))
+        return
+
+    rng = random.Random(args.seed + 1)
+    tasks = []
+    arrival = loop.time()
+    while arrival < end:
+        delay = arrival - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # perf_counter and the loop clock differ; anchor on the former.
+        started = time.perf_counter() - max(0.0, loop.time() - arrival)
+        tasks.append(asyncio.ensure_future(one(next(queries), started)))
+        arrival += rng.expovariate(args.rate)
+    await asyncio.gather(*tasks)
+
+
+def load_test(args):
+    stub = start_stub(
+        latency=args.latency,
+        jitter=args.jitter,
+        snippet_size=args.snippet_size,
+        error_rate=args.error_rate,
+    )
+    tool, pool = make_tool(stub, args.concurrency)
+    recorder = Recorder()
+    try:
+        call_sync(tool, "run", "warmup")
+        with ResourceSampler() as sampler:
+            start = time.perf_counter()
+            if args.api == "sync":
+                run_sync(tool, args, recorder)
+            else:
+
+                async def drive():
+                    await run_async(tool, args, recorder)
+                    await pool.aclose()
+
+                asyncio.run(drive())
+            elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+        stub.shutdown()
+        stub.server_close()
+
+    calls = len(recorder.latencies)
+    result = {
+        "calls": calls,
+        "calls_per_s": round(calls / elapsed, 1) if elapsed else None,
+        "error_rate": round(recorder.errors / calls, 4) if calls else None,
+        "peak_threads": sampler.peak_threads,
+        "peak_rss_mb": sampler.peak_rss_mb,
+    }
+    if calls:
+        result.update(percentiles(recorder.latencies))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=MODES, default="closed")
+    parser.add_argument("--api", choices=APIS, default="sync")
+    parser.add_argument(
+        "--entry",
+        choices=("run", "invoke"),
+        default="run",
+        help="call _run/_arun, or invoke/ainvoke through LangChain",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="agents (closed) or the most calls in flight (poisson)",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=100.0, help="calls per second (poisson)"
+    )
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--distinct", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--snippet-size", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    name = f"load_{args.mode}_{args.api}"
+    report = {
+        "package_version": langchain_websearch.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": {name: load_test(args)},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
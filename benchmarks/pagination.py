@@ -0,0 +1,73 @@
+"""
+Latency and payload size of upstream counts and pagination.
+
+Compares the current backend with the previous behaviour of requesting the
+default page and truncating it locally. Run with::
+
+    python -m benchmarks.pagination [--latency 0.05] [--repeat 20]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from langchain_websearch import QueritSearchBackend
+
+from .stub_server import start_stub
+
+
+class TruncatingBackend(QueritSearchBackend):
+    """Previous behaviour: one request without a count, truncated locally."""
+
+    def _pages(self, num_results):
+        return [(num_results, 0)]
+
+    def _build_payload(self, query, count, offset=0):
+        return {"query": query}
+
+
+def measure(backend, stub, num_results, repeat):
+    stub.reset_counters()
+    latencies = []
+    returned = 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        returned = len(backend.search(f"query {i}", num_results=num_results))
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "num_results": num_results,
+        "returned": returned,
+        "median_latency_ms": round(statistics.median(latencies) * 1000, 2),
+        "requests_per_search": len(stub.requests) / repeat,
+        "bytes_per_search": stub.bytes_sent // repeat,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    stub = start_stub(latency=args.latency)
+    report = {"latency_s": args.latency, "repeat": args.repeat, "results": []}
+    try:
+        for name, cls in (
+            ("truncate", TruncatingBackend),
+            ("paginate", QueritSearchBackend),
+        ):
+            backend = cls(api_key="benchmark", coalesce=False)
+            backend.base_url = stub.url
+            for num_results in (3, 10, 25, 50):
+                row = measure(backend, stub, num_results, args.repeat)
+                report["results"].append(dict(mode=name, **row))
+    finally:
+        stub.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
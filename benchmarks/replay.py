@@ -0,0 +1,86 @@
+"""
+Replay recorded Querit traffic through the backend, offline.
+
+Searches recorded with ``RecordingTransport`` are issued again against a
+``ReplayTransport`` serving the same archive, so the client side (parsing,
+caching, concurrency) can be measured on production-shaped traffic without
+an API key. Each recorded first-page request is replayed as one search. Run
+with::
+
+    python -m benchmarks.replay traffic.qrpl [--speed 1.0] [--concurrency 8]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_websearch import QueritSearchBackend, ReplayTransport, TrafficArchive
+
+from .run import percentiles
+
+
+def recorded_searches(archive):
+    """``(query, num_results)`` for every recorded first-page request."""
+    searches = []
+    for exchange in archive:
+        body = exchange.request["body"]
+        if isinstance(body, dict) and "query" in body and not body.get("offset"):
+            searches.append((body["query"], body.get("count", 10)))
+    return searches
+
+
+def replay(path, speed=None, concurrency=1):
+    archive = TrafficArchive(path)
+    searches = recorded_searches(archive)
+    if not searches:
+        raise SystemExit(f"{path} holds no recorded searches")
+    backend = QueritSearchBackend(
+        api_key="replay",
+        base_url="http://replay.invalid/v1/search",
+        coalesce=False,
+        transport=ReplayTransport(archive, speed=speed),
+    )
+
+    latencies = []
+
+    def timed_search(search):
+        query, num_results = search
+        start = time.perf_counter()
+        backend.search(query, num_results=num_results)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        for search in searches:
+            timed_search(search)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(timed_search, searches))
+    elapsed = time.perf_counter() - start
+
+    return dict(
+        percentiles(latencies),
+        searches=len(searches),
+        searches_per_s=round(len(searches) / elapsed, 1) if elapsed else None,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("archive")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=None,
+        help="replay recorded latencies divided by this (default: no delay)",
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = replay(args.archive, args.speed, args.concurrency)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
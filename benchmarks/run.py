@@ -0,0 +1,367 @@
+"""
+Benchmark suite for langchain_websearch against a local Querit stub.
+
+Measures single-query latency, throughput at several concurrency levels,
+parse and format cost per result, the effect of caching and connection
+pooling, tail latency with and without hedging, the size of the tool output
+in each format, bytes on the wire, JSON decode cost and cold import time.
+Results are written as JSON so that runs can be compared across releases
+with ``python -m benchmarks.compare``. Run with::
+
+    python -m benchmarks [--quick] [--output report.json] [--suite latency ...]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+import langchain_websearch
+from langchain_websearch import (
+    ConnectionPool,
+    HedgePolicy,
+    InMemoryCache,
+    QueritSearchBackend,
+    RetryPolicy,
+    WebSearchTool,
+)
+
+from langchain_websearch.codec import get_decoder
+from langchain_websearch.formatting import (
+    CHARS_PER_TOKEN,
+    FORMATS,
+    estimate_tokens,
+    format_results,
+)
+
+from .stub_server import make_results, start_stub
+
+SUITES = (
+    "latency",
+    "throughput",
+    "parse_format",
+    "output",
+    "cache",
+    "pool",
+    "hedge",
+    "wire",
+    "import",
+)
+
+# Statements timed by the import suite, each in a fresh interpreter.
+IMPORT_STATEMENTS = {
+    "package": "import langchain_websearch",
+    "tool": "from langchain_websearch import WebSearchTool; WebSearchTool()",
+    "backend": "from langchain_websearch import QueritSearchBackend",
+}
+
+
+def percentiles(samples):
+    """p50/p90/p99 of ``samples`` (seconds) in milliseconds."""
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {"p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99)}
+
+
+def make_backend(stub, **kwargs):
+    kwargs.setdefault("coalesce", False)
+    kwargs.setdefault("retry", RetryPolicy(max_attempts=1))
+    return QueritSearchBackend(api_key="benchmark", base_url=stub.url, **kwargs)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def bench_latency(stub, iterations):
+    backend = make_backend(stub)
+    backend.search("warmup")
+    samples = [timed(backend.search, f"latency {i}") for i in range(iterations)]
+    return dict(percentiles(samples), iterations=iterations)
+
+
+def bench_throughput(stub, iterations, levels):
+    pool = ConnectionPool(pool_size=max(levels))
+    backend = make_backend(stub, pool=pool)
+    backend.search("warmup")
+    rows = []
+    for level in levels:
+        queries = [f"throughput {level} {i}" for i in range(level * iterations)]
+
+        elapsed = timed(backend.search_many, queries, max_concurrency=level)
+        sync_rate = len(queries) / elapsed
+
+        async def run_async():
+            # Exclude creating the event loop's client from the measurement.
+            await backend.asearch("warmup")
+            start = time.perf_counter()
+            await backend.asearch_many(queries, max_concurrency=level)
+            elapsed = time.perf_counter() - start
+            await pool.aclose()
+            return elapsed
+
+        async_rate = len(queries) / asyncio.run(run_async())
+        rows.append(
+            {
+                "concurrency": level,
+                "sync_searches_per_s": round(sync_rate, 1),
+                "async_searches_per_s": round(async_rate, 1),
+            }
+        )
+    pool.close()
+    return rows
+
+
+def bench_parse_format(iterations, snippet_size):
+    page = [make_results("parse", count=50, snippet_size=snippet_size)]
+    report = {}
+    for name, fast in (("validated", False), ("fast", True)):
+        backend = QueritSearchBackend(api_key="benchmark", fast_results=fast)
+        seconds = min(
+            timeit.repeat(
+                lambda: backend._parse_results(page, 50), number=iterations, repeat=5
+            )
+        )
+        report[f"parse_{name}_us_per_result"] = round(
+            seconds / iterations / 50 * 1e6, 3
+        )
+
+    tool = WebSearchTool()
+    results = QueritSearchBackend(api_key="benchmark")._parse_results(page, 50)
+    seconds = min(
+        timeit.repeat(
+            lambda: tool._format_results(results), number=iterations, repeat=5
+        )
+    )
+    report["format_us_per_result"] = round(seconds / iterations / 50 * 1e6, 3)
+    return report
+
+
+def bench_output(iterations, snippet_size):
+    """Estimated tokens and cost per result for each output format."""
+    page = [make_results("output", count=10, snippet_size=snippet_size)]
+    results = QueritSearchBackend(api_key="benchmark")._parse_results(page, 10)
+    report = {}
+    for mode in FORMATS:
+        for name, budget in (
+            (mode, None),
+            (f"{mode}_budget_400", 400 * CHARS_PER_TOKEN),
+        ):
+            seconds = min(
+                timeit.repeat(
+                    lambda: format_results(results, mode, budget),
+                    number=iterations,
+                    repeat=5,
+                )
+            )
+            output = format_results(results, mode, budget)
+            report[name] = {
+                "tokens_per_result": round(estimate_tokens(output) / len(results), 1),
+                "format_us_per_result": round(
+                    seconds / iterations / len(results) * 1e6, 3
+                ),
+            }
+    return report
+
+
+def bench_cache(stub, iterations):
+    backend = make_backend(stub, cache=InMemoryCache(maxsize=iterations))
+    misses = [timed(backend.search, f"cache {i}") for i in range(iterations)]
+    hits = [timed(backend.search, f"cache {i}") for i in range(iterations)]
+    return {
+        "miss": percentiles(misses),
+        "hit": percentiles(hits),
+        "hit_rate": round(backend.cache.stats.hit_rate, 3),
+    }
+
+
+def bench_pool(stub, iterations):
+    pooled = make_backend(stub, pool=ConnectionPool())
+    pooled.search("warmup")
+    pooled_samples = [timed(pooled.search, f"pool {i}") for i in range(iterations)]
+
+    fresh_samples = []
+    for i in range(iterations):
+        # A new pool per search forces a new connection every time.
+        pool = ConnectionPool()
+        fresh_samples.append(timed(make_backend(stub, pool=pool).search, f"fresh {i}"))
+        pool.close()
+
+    return {"pooled": percentiles(pooled_samples), "fresh": percentiles(fresh_samples)}
+
+
+def bench_hedge(stub, iterations):
+    """Latency percentiles when a few responses are very slow."""
+    stub.slow_rate, stub.slow_latency = 0.05, 0.25
+    report = {}
+    try:
+        for name, policy in (("plain", None), ("hedged", HedgePolicy(percentile=90))):
+            backend = make_backend(stub, hedge=policy)
+            # Let the hedge delay settle on observed latencies first.
+            for i in range(50):
+                backend.search(f"hedge warmup {i}")
+            samples = [timed(backend.search, f"{name} {i}") for i in range(iterations)]
+            report[name] = percentiles(samples)
+    finally:
+        stub.slow_rate = 0.0
+    return report
+
+
+def bench_wire(stub, iterations, snippet_size):
+    """Response bytes on the wire, with and without gzip, and decode cost."""
+    report = {}
+    for name, compression in (("identity", False), ("gzip", True)):
+        stub.compression = compression
+        backend = make_backend(stub)
+        backend.search("warmup")
+        stub.reset_counters()
+        for i in range(iterations):
+            backend.search(f"wire {i}")
+        report[f"{name}_bytes_per_response"] = round(stub.bytes_sent / iterations)
+    stub.compression = False
+
+    body = json.dumps(
+        make_results("decode", count=10, snippet_size=snippet_size)
+    ).encode()
+    for name in ("json", "orjson"):
+        try:
+            loads = get_decoder(name)
+        except ImportError:
+            continue
+        seconds = min(timeit.repeat(lambda: loads(body), number=iterations, repeat=5))
+        report[f"decode_{name}_us_per_response"] = round(seconds / iterations * 1e6, 3)
+    return report
+
+
+def import_time(statement, startup=frozenset()):
+    """Seconds ``statement`` spends importing, from ``python -X importtime``.
+
+    Sums the cumulative time of every top-level import except the modules in
+    ``startup``, which the interpreter loads before running any code.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    total = 0
+    for line in stderr.splitlines():
+        _, _, rest = line.partition("import time:")
+        fields = rest.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2]
+        # Nested imports are indented; their time is already in their parent.
+        if name.startswith("  ") or name.strip() in startup:
+            continue
+        total += int(fields[1])
+    return total / 1e6
+
+
+def bench_import(iterations):
+    """Median cold import time of the package, the tool and the backend."""
+    startup = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "pass"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    startup = frozenset(
+        line.split("|")[-1].strip() for line in startup.splitlines() if "|" in line
+    )
+    report = {}
+    for name, statement in IMPORT_STATEMENTS.items():
+        samples = [import_time(statement, startup) for _ in range(iterations)]
+        report[f"{name}_ms"] = round(statistics.median(samples) * 1000, 3)
+    return report
+
+
+def run(args):
+    stub = start_stub(
+        latency=args.latency,
+        jitter=args.jitter,
+        snippet_size=args.snippet_size,
+    )
+    iterations = 20 if args.quick else 200
+    levels = (1, 4, 16) if args.quick else (1, 4, 16, 64)
+    suites = args.suite or SUITES
+
+    results = {}
+    try:
+        if "latency" in suites:
+            results["latency"] = bench_latency(stub, iterations)
+        if "throughput" in suites:
+            results["throughput"] = bench_throughput(
+                stub, 5 if args.quick else 20, levels
+            )
+        if "parse_format" in suites:
+            results["parse_format"] = bench_parse_format(
+                iterations * 10, args.snippet_size
+            )
+        if "output" in suites:
+            results["output"] = bench_output(iterations * 10, args.snippet_size)
+        if "cache" in suites:
+            results["cache"] = bench_cache(stub, iterations)
+        if "pool" in suites:
+            results["pool"] = bench_pool(stub, iterations)
+        if "hedge" in suites:
+            results["hedge"] = bench_hedge(stub, iterations)
+        if "wire" in suites:
+            results["wire"] = bench_wire(stub, iterations, args.snippet_size)
+        if "import" in suites:
+            results["import"] = bench_import(5 if args.quick else 20)
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    return {
+        "package_version": langchain_websearch.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "snippet_size": args.snippet_size,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark langchain_websearch against a local Querit stub."
+    )
+    parser.add_argument("--suite", action="append", choices=SUITES)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--snippet-size", type=int, default=200)
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Local stand-in for the Querit search endpoint.
+
+Mimics the ``https://api.querit.ai/v1/search`` response schema with
+configurable latency, payload size and error rate. Point a backend at it
+with ``QueritSearchBackend(base_url=stub.url)`` or the ``QUERIT_BASE_URL``
+environment variable. Run standalone with ``python -m benchmarks.stub_server``.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Results returned when a request doesn't ask for a count.
+DEFAULT_COUNT = 20
+
+
+def make_results(query, count=DEFAULT_COUNT, offset=0, snippet_size=0):
+    """Build a Querit-shaped response body for ``query``.
+
+    ``snippet_size`` pads each snippet to that many characters.
+    """
+    return {
+        "results": {
+            "result": [
+                {
+                    "title": f"{query} result {i}",
+                    "url": f"https://example.com/{i}",
+                    "snippet": f"Snippet {i} for {query}".ljust(snippet_size, "x"),
+                    "site_name": "example.com",
+                }
+                for i in range(offset, offset + count)
+            ]
+        }
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        api_key = self.headers.get("Authorization", "").replace("Bearer ", "")
+        accept_encoding = self.headers.get("Accept-Encoding", "")
+        server.log(payload, self.client_address, api_key, accept_encoding)
+
+        # Per-request delays are served in arrival order before falling back
+        # to the fixed latency.
+        latency = server.delays.pop(0) if server.delays else server.latency
+        if server.jitter:
+            latency += random.uniform(0, server.jitter)
+        if server.slow_rate and random.random() < server.slow_rate:
+            latency += server.slow_latency
+        if latency:
+            time.sleep(latency)
+
+        status = server.status_for(payload.get("query"), api_key)
+        if status != 200:
+            # Counted before answering, so a client that has seen the error
+            # also sees it in ``errors``.
+            server.record(0, error=True)
+            self.send_response(status)
+            if server.retry_after is not None:
+                self.send_header("Retry-After", server.retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        offset = payload.get("offset", 0)
+        count = payload.get("count", DEFAULT_COUNT)
+        count = min(count, max(0, server.result_count - offset))
+        body = make_results(
+            payload.get("query", ""), count, offset, server.snippet_size
+        )
+        body = json.dumps(body).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if server.compression and "gzip" in accept_encoding:
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        server.record(len(body))
+        chunk_size = server.chunk_size or len(body)
+        try:
+            for start in range(0, len(body), chunk_size):
+                self.wfile.write(body[start : start + chunk_size])
+                self.wfile.flush()
+                if server.chunk_delay:
+                    time.sleep(server.chunk_delay)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QueritStub(ThreadingHTTPServer):
+    """Threaded HTTP server answering like ``/v1/search``.
+
+    Every response is delayed by ``latency`` plus up to ``jitter`` seconds. A
+    fraction ``error_rate`` of requests fail with ``error_status`` and a
+    fraction ``slow_rate`` take ``slow_latency`` seconds longer, modelling a
+    latency tail.
+    ``result_count`` bounds the results available for any query and
+    ``snippet_size`` sets the length of each snippet. With ``compression``
+    bodies are gzipped for clients that accept it; ``bytes_sent`` counts
+    bytes on the wire.
+
+    Tests script individual requests through the remaining attributes:
+    ``delays`` are served one per request before ``latency`` applies,
+    ``statuses`` maps a query to a status (or a list of statuses served in
+    order, repeating the last), keys in ``limited_keys`` get 429 with
+    ``retry_after`` sent on every error, and a non-zero ``chunk_size``
+    writes bodies in chunks with ``chunk_delay`` seconds between them.
+    ``requests``, ``connections``, ``api_keys`` and ``accept_encodings``
+    record what clients sent.
+    """
+
+    daemon_threads = True
+    # Room for many simultaneous connects without SYN retransmits.
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        result_count=100,
+        snippet_size=0,
+        error_rate=0.0,
+        error_status=503,
+        slow_rate=0.0,
+        slow_latency=0.0,
+        compression=False,
+        port=0,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.result_count = result_count
+        self.snippet_size = snippet_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.compression = compression
+        self.delays = []
+        self.statuses = {}
+        self.limited_keys = set()
+        self.retry_after = None
+        self.chunk_size = 0
+        self.chunk_delay = 0.0
+        self.requests = []
+        self.connections = set()
+        self.api_keys = []
+        self.accept_encodings = []
+        self.errors = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/search"
+
+    def log(self, payload, client_address, api_key, accept_encoding):
+        with self._lock:
+            self.requests.append(payload)
+            self.connections.add(client_address)
+            self.api_keys.append(api_key)
+            self.accept_encodings.append(accept_encoding)
+
+    def status_for(self, query, api_key):
+        """Status to answer a search for ``query`` made with ``api_key``."""
+        if api_key in self.limited_keys:
+            return 429
+        status = self.statuses.get(query, 200)
+        if isinstance(status, list):
+            status = status.pop(0) if len(status) > 1 else status[0]
+        if status == 200 and self.error_rate and random.random() < self.error_rate:
+            status = self.error_status
+        return status
+
+    def record(self, nbytes, error=False):
+        with self._lock:
+            self.errors += error
+            self.bytes_sent += nbytes
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests.clear()
+            self.connections.clear()
+            self.api_keys.clear()
+            self.accept_encodings.clear()
+            self.errors = 0
+            self.bytes_sent = 0
+
+
+def start_stub(**kwargs):
+    """Start a ``QueritStub`` on a daemon thread and return it."""
+    server = QueritStub(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local Querit stub.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--snippet-size", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument(
+        "--compression", action="store_true", help="gzip responses when accepted"
+    )
+    args = parser.parse_args(argv)
+
+    server = QueritStub(
+        latency=args.latency,
+        jitter=args.jitter,
+        snippet_size=args.snippet_size,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        compression=args.compression,
+        port=args.port,
+    )
+    print(f"Querit stub listening on {server.url}")
+    print(f"export QUERIT_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -29,8 +29,11 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "langchain>=0.0.300",
+        "langchain-core>=0.2.15",
         "pydantic>=1.10.0",
         "requests>=2.28.0",
+        "httpx>=0.24.0",
+        "beautifulsoup4>=4.11.0",
         "python-dotenv>=1.0.0",
     ],
     extras_require={
@@ -40,6 +43,15 @@ setup(
             "flake8>=6.0.0",
             "mypy>=1.0.0",
             "types-requests",  # Type stubs for requests library
+            "fakeredis>=2.0.0",
+            "lupa>=1.14",  # lets fakeredis run RedisStore's Lua script
+        ],
+        "semantic": [
+            "numpy>=1.20.0",
+        ],
+        "fast": [
+            "orjson>=3.6.0",
+            "brotli>=1.0.9",
         ],
     },
     include_package_data=True,
@@ -3,8 +3,107 @@ LangChain WebSearch Tool
 A powerful search tool for LangChain using Querit Search API.
 """
 
-from .core import WebSearchTool, SearchResult
-from .querit_search import QueritSearchBackend
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .core import (  # noqa: F401
+        WebSearchTool,
+        SearchResult,
+        CompactResult,
+        SearchBackend,
+    )
+    from .backend import BatchSearchMixin  # noqa: F401
+    from .querit_search import QueritSearchBackend  # noqa: F401
+    from .router import (  # noqa: F401
+        CircuitBreaker,
+        SearchRouter,
+        reciprocal_rank_fusion,
+    )
+    from .ratelimit import TokenBucket  # noqa: F401
+    from .limiter import AdaptiveLimiter  # noqa: F401
+    from .retry import RetryPolicy, RetryStats  # noqa: F401
+    from .hedge import HedgePolicy  # noqa: F401
+    from .keys import KeyPool, KeyStats  # noqa: F401
+    from .cache import CacheStats, InMemoryCache, SearchCache, SQLiteCache  # noqa: F401
+    from .cache import CacheEntry  # noqa: F401
+    from .prefetch import CountMinSketch, Prefetcher  # noqa: F401
+    from .shared import RedisStore, SharedCache, SharedStore  # noqa: F401
+    from .shared import SharedTokenBucket, SQLiteStore  # noqa: F401
+    from .fetch import Page, PageCache, PageFetcher, extract_text  # noqa: F401
+    from .semantic import SemanticCache, VectorIndex, canonicalize  # noqa: F401
+    from .index import ResultIndex  # noqa: F401
+    from .pool import ConnectionPool, get_default_pool, set_default_pool  # noqa: F401
+    from .pool import Transport  # noqa: F401
+    from .replay import RecordingTransport, ReplayMiss, ReplayTransport  # noqa: F401
+    from .replay import TrafficArchive  # noqa: F401
+    from .instrumentation import FanoutSink, InMemorySink, MetricsSink  # noqa: F401
+
+# Public names and the submodule defining each. Submodules are imported on
+# first attribute access, so ``import langchain_websearch`` stays cheap and
+# LangChain, pydantic and the HTTP clients load only when something needs them.
+_EXPORTS = {
+    "WebSearchTool": "core",
+    "SearchResult": "core",
+    "CompactResult": "core",
+    "SearchBackend": "core",
+    "BatchSearchMixin": "backend",
+    "QueritSearchBackend": "querit_search",
+    "SearchRouter": "router",
+    "CircuitBreaker": "router",
+    "reciprocal_rank_fusion": "router",
+    "SearchCache": "cache",
+    "InMemoryCache": "cache",
+    "SQLiteCache": "cache",
+    "CacheStats": "cache",
+    "CacheEntry": "cache",
+    "Prefetcher": "prefetch",
+    "CountMinSketch": "prefetch",
+    "SharedStore": "shared",
+    "SQLiteStore": "shared",
+    "RedisStore": "shared",
+    "SharedCache": "shared",
+    "SharedTokenBucket": "shared",
+    "SemanticCache": "semantic",
+    "VectorIndex": "semantic",
+    "canonicalize": "semantic",
+    "ResultIndex": "index",
+    "TokenBucket": "ratelimit",
+    "AdaptiveLimiter": "limiter",
+    "RetryPolicy": "retry",
+    "RetryStats": "retry",
+    "HedgePolicy": "hedge",
+    "KeyPool": "keys",
+    "KeyStats": "keys",
+    "PageFetcher": "fetch",
+    "PageCache": "fetch",
+    "Page": "fetch",
+    "extract_text": "fetch",
+    "ConnectionPool": "pool",
+    "get_default_pool": "pool",
+    "set_default_pool": "pool",
+    "Transport": "pool",
+    "TrafficArchive": "replay",
+    "RecordingTransport": "replay",
+    "ReplayTransport": "replay",
+    "ReplayMiss": "replay",
+    "MetricsSink": "instrumentation",
+    "InMemorySink": "instrumentation",
+    "FanoutSink": "instrumentation",
+}
 
 __version__ = "0.0.2"
-__all__ = ["WebSearchTool", "SearchResult", "QueritSearchBackend"]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
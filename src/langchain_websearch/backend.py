@@ -0,0 +1,122 @@
+"""
+Shared behaviour for search backends.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Union, cast
+
+from .core import AnyResult, SearchBackend
+
+BatchOutcome = Union[List[AnyResult], Exception]
+
+
+class BatchSearchMixin(ABC):
+    """``search_many`` / ``asearch_many`` on top of ``search`` / ``asearch``."""
+
+    @abstractmethod
+    def search(
+        self, query: str, num_results: int = 10, **kwargs: Any
+    ) -> List[AnyResult]: ...
+
+    @abstractmethod
+    async def asearch(
+        self, query: str, num_results: int = 10, **kwargs: Any
+    ) -> List[AnyResult]: ...
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        num_results: int = 10,
+        max_concurrency: int = 8,
+        **kwargs,
+    ) -> List[BatchOutcome]:
+        """Run several searches in parallel on a thread pool.
+
+        Identical queries are sent once. The returned list follows the order of
+        ``queries``; a query that failed gets its exception instead of results.
+        """
+        _check_concurrency(max_concurrency)
+        unique = list(dict.fromkeys(queries))
+        if not unique:
+            return []
+
+        outcomes: Dict[str, BatchOutcome] = {}
+        workers = min(max_concurrency, len(unique))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                query: executor.submit(self.search, query, num_results, **kwargs)
+                for query in unique
+            }
+            for query, future in futures.items():
+                try:
+                    outcomes[query] = future.result()
+                except Exception as e:
+                    outcomes[query] = e
+
+        return [_copy_outcome(outcomes[query]) for query in queries]
+
+    async def asearch_many(
+        self,
+        queries: Sequence[str],
+        num_results: int = 10,
+        max_concurrency: int = 8,
+        **kwargs,
+    ) -> List[BatchOutcome]:
+        """Async version of ``search_many`` built on ``asyncio.gather``."""
+        _check_concurrency(max_concurrency)
+        unique = list(dict.fromkeys(queries))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(query: str) -> List[AnyResult]:
+            async with semaphore:
+                return await self.asearch(query, num_results, **kwargs)
+
+        gathered = await asyncio.gather(
+            *(run(query) for query in unique), return_exceptions=True
+        )
+        outcomes: Dict[str, BatchOutcome] = {}
+        for query, outcome in zip(unique, gathered):
+            # Cancellation and the like stop the batch; only errors are kept.
+            if not isinstance(outcome, Exception) and isinstance(
+                outcome, BaseException
+            ):
+                raise outcome
+            outcomes[query] = outcome
+
+        return [_copy_outcome(outcomes[query]) for query in queries]
+
+
+def _check_concurrency(max_concurrency: int) -> None:
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+
+def _copy_outcome(outcome: BatchOutcome) -> BatchOutcome:
+    # Duplicate queries share one outcome; give each position its own list.
+    if isinstance(outcome, list):
+        return list(outcome)
+    return outcome
+
+
+def batched(backend: SearchBackend) -> BatchSearchMixin:
+    """``backend``, given ``search_many`` / ``asearch_many`` if it lacks them."""
+    if hasattr(backend, "search_many") and hasattr(backend, "asearch_many"):
+        return cast(BatchSearchMixin, backend)
+    return _Batched(backend)
+
+
+class _Batched(BatchSearchMixin):
+    def __init__(self, backend: SearchBackend):
+        self.backend = backend
+
+    def search(
+        self, query: str, num_results: int = 10, **kwargs: Any
+    ) -> List[AnyResult]:
+        return self.backend.search(query, num_results, **kwargs)
+
+    async def asearch(
+        self, query: str, num_results: int = 10, **kwargs: Any
+    ) -> List[AnyResult]:
+        return await self.backend.asearch(query, num_results, **kwargs)
@@ -0,0 +1,285 @@
+"""
+Result caches for Querit searches.
+"""
+
+import json
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how a cache has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    # Hits served from an expired entry kept for stale-while-revalidate.
+    stale_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CacheEntry(NamedTuple):
+    """Cached results and the seconds left before they go stale.
+
+    ``expires_in`` is negative for a stale entry and None without a TTL.
+    """
+
+    results: List[Any]
+    expires_in: Optional[float]
+
+    @property
+    def stale(self) -> bool:
+        return self.expires_in is not None and self.expires_in < 0
+
+
+class SearchCache(ABC):
+    """Base class for caches of parsed ``SearchResult`` lists.
+
+    Subclasses implement ``get`` and ``set``, and ``lookup`` if they can serve
+    stale entries. Keys come from ``make_key`` so that equivalent searches
+    share an entry.
+    """
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    def make_key(
+        self, query: str, num_results: int, params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build a cache key from the normalized query and search parameters."""
+        normalized = " ".join(query.lower().split())
+        return json.dumps([normalized, num_results, params or {}], sort_keys=True)
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[List[Any]]:
+        """Return cached results for ``key``, or None on a miss."""
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Like ``get``, but may also return a stale entry, marked as such."""
+        results = self.get(key)
+        return None if results is None else CacheEntry(results, None)
+
+    @abstractmethod
+    def set(self, key: str, results: List[Any]) -> None:
+        """Store ``results`` under ``key``."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+
+class InMemoryCache(SearchCache):
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    With ``stale_ttl``, expired entries are kept that much longer and
+    ``lookup`` still returns them, marked stale, so a backend can answer
+    from them while it refreshes the entry in the background.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 300.0,
+        stale_ttl: Optional[float] = None,
+    ):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, List[Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        entry = self._find(key, stale_ok=False)
+        return None if entry is None else entry.results
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        return self._find(key, stale_ok=True)
+
+    def _find(self, key: str, stale_ok: bool) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            stored_at, results = entry
+            expires_in = remaining_ttl(stored_at, self.ttl, time.monotonic())
+            if expires_in is not None and expires_in < 0:
+                if -expires_in > (self.stale_ttl or 0):
+                    del self._entries[key]
+                    self.stats.evictions += 1
+                    self.stats.misses += 1
+                    return None
+                if not stale_ok:
+                    self.stats.misses += 1
+                    return None
+                self.stats.stale_hits += 1
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return CacheEntry(list(results), expires_in)
+
+    def set(self, key: str, results: List[Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(SearchCache):
+    """On-disk LRU cache that survives restarts.
+
+    Entries older than ``ttl`` seconds are treated as misses, and the least
+    recently used rows are deleted once the table holds more than ``maxsize``.
+    ``stale_ttl`` keeps expired rows for stale-while-revalidate, as in
+    ``InMemoryCache``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        maxsize: int = 10000,
+        ttl: Optional[float] = 86400.0,
+        stale_ttl: Optional[float] = None,
+    ):
+        super().__init__()
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "key TEXT PRIMARY KEY, results TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        entry = self._find(key, stale_ok=False)
+        return None if entry is None else entry.results
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        return self._find(key, stale_ok=True)
+
+    def _find(self, key: str, stale_ok: bool) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, stored_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            now = time.time()
+            expires_in = remaining_ttl(row[1], self.ttl, now)
+            if expires_in is not None and expires_in < 0:
+                if -expires_in > (self.stale_ttl or 0):
+                    self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.stats.evictions += 1
+                    self.stats.misses += 1
+                    return None
+                if not stale_ok:
+                    self.stats.misses += 1
+                    return None
+                self.stats.stale_hits += 1
+
+            self._conn.execute(
+                "UPDATE search_cache SET used_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.stats.hits += 1
+
+        return CacheEntry(decode_results(row[0]), expires_in)
+
+    def set(self, key: str, results: List[Any]) -> None:
+        encoded = encode_results(results)
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?)",
+                (key, encoded, now, now),
+            )
+            excess = self._conn.execute(
+                "SELECT COUNT(*) - ? FROM search_cache", (self.maxsize,)
+            ).fetchone()[0]
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM search_cache WHERE key IN ("
+                    "SELECT key FROM search_cache ORDER BY used_at LIMIT ?)",
+                    (excess,),
+                )
+                self.stats.evictions += excess
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def remaining_ttl(
+    stored_at: float, ttl: Optional[float], now: float
+) -> Optional[float]:
+    """Seconds until an entry stored at ``stored_at`` goes stale, or None."""
+    return None if ttl is None else stored_at + ttl - now
+
+
+def encode_results(results: List[Any]) -> str:
+    """Serialize results to JSON for a persistent cache.
+
+    The result type is stored too, so that hits come back as the type the
+    searching backend produced; CompactResults skip validation again.
+    """
+    compact = bool(results) and all(hasattr(r, "_replace") for r in results)
+    rows = [[r.title, r.link, r.snippet, r.display_link, r.position] for r in results]
+    return json.dumps({"compact": compact, "results": rows})
+
+
+def decode_results(encoded: str) -> List[Any]:
+    """Inverse of ``encode_results``."""
+    # 延迟导入以避免循环导入
+    from .core import CompactResult, SearchResult
+
+    data = json.loads(encoded)
+    if isinstance(data, list):
+        # Written before the result type was stored.
+        data = {"compact": False, "results": data}
+    if data["compact"]:
+        return [CompactResult(*row) for row in data["results"]]
+    return [
+        SearchResult(
+            title=title,
+            link=link,
+            snippet=snippet,
+            display_link=display_link,
+            position=position,
+        )
+        for title, link, snippet, display_link, position in data["results"]
+    ]
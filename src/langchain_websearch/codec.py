@@ -0,0 +1,62 @@
+"""
+Content negotiation and JSON decoding for Querit responses.
+"""
+
+import functools
+import importlib.util
+import json
+from typing import Any, Callable, Optional, Union
+
+JsonLoads = Callable[[Union[bytes, str]], Any]
+
+DECODERS = ("auto", "json", "orjson")
+
+
+@functools.lru_cache(maxsize=None)
+def accept_encoding() -> str:
+    """``Accept-Encoding`` value listing the codings this process can decode.
+
+    gzip and deflate are always available; Brotli is offered first when
+    ``brotli`` or ``brotlicffi`` is installed, since both requests and httpx
+    then decode it.
+    """
+    codings = ["gzip", "deflate"]
+    if _installed("brotli") or _installed("brotlicffi"):
+        codings.insert(0, "br")
+    return ", ".join(codings)
+
+
+def get_decoder(name: str = "auto") -> JsonLoads:
+    """Function decoding a JSON body for decoder ``name``.
+
+    ``"auto"`` uses orjson when it is installed and the standard library
+    otherwise; ``"orjson"`` requires it and ``"json"`` never uses it.
+    """
+    if name not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder {name!r}; expected one of {DECODERS}")
+    if name == "json":
+        return json.loads
+    try:
+        import orjson
+    except ImportError:
+        if name == "orjson":
+            raise ImportError(
+                "orjson decoding needs orjson: pip install 'langchain-querit[fast]'"
+            ) from None
+        return json.loads
+    return orjson.loads
+
+
+def wire_bytes(response: Any) -> Optional[int]:
+    """Body bytes received for ``response`` before content decoding, if known."""
+    # httpx counts them on the response; urllib3's raw response tracks the
+    # bytes read off the socket.
+    downloaded = getattr(response, "num_bytes_downloaded", None)
+    if downloaded is not None:
+        return downloaded
+    tell = getattr(getattr(response, "raw", None), "tell", None)
+    return tell() if tell is not None else None
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
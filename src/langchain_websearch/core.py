@@ -2,10 +2,35 @@
 Core components for LangChain WebSearch Tool.
 """
 
-from typing import List
+import asyncio
+import threading
+from typing import (
+    Any,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 
-from pydantic import BaseModel, Field
-from langchain.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+from langchain_core.tools import BaseTool
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+
+from .cache import SearchCache
+from .fetch import PageFetcher
+from .formatting import CHARS_PER_TOKEN, format_results
+from .hedge import HedgePolicy
+from .index import ResultIndex
+from .instrumentation import InMemorySink, MetricsSink, combine, stage
 
 
 class SearchResult(BaseModel):
@@ -18,6 +43,55 @@ class SearchResult(BaseModel):
     position: int
 
 
+class CompactResult(NamedTuple):
+    """Lightweight search result built without validation.
+
+    Has the same fields as ``SearchResult`` and no per-instance ``__dict__``;
+    use ``to_model`` to get the validated form.
+    """
+
+    title: str
+    link: str
+    snippet: str
+    display_link: str
+    position: int
+
+    def to_model(self) -> SearchResult:
+        """Return the validated ``SearchResult`` for this result."""
+        return SearchResult(
+            title=self.title,
+            link=self.link,
+            snippet=self.snippet,
+            display_link=self.display_link,
+            position=self.position,
+        )
+
+
+AnyResult = Union[SearchResult, CompactResult]
+
+
+@runtime_checkable
+class SearchBackend(Protocol):
+    """Interface shared by search providers and ``SearchRouter``.
+
+    Implementations must accept, and may ignore, extra keyword arguments
+    such as ``metrics`` and ``timeout``. ``WebSearchTool.batch_run`` uses a
+    backend's ``search_many`` / ``asearch_many`` if it has them, and
+    otherwise runs these two methods through ``BatchSearchMixin``.
+    """
+
+    def search(
+        self, query: str, num_results: int = 10, **kwargs: Any
+    ) -> List[AnyResult]: ...
+
+    async def asearch(
+        self, query: str, num_results: int = 10, **kwargs: Any
+    ) -> List[AnyResult]: ...
+
+
+_backend_lock = threading.Lock()
+
+
 class WebSearchTool(BaseTool):
     """LangChain tool for web search functionality using Querit Search API."""
 
@@ -29,45 +103,248 @@ class WebSearchTool(BaseTool):
     )
 
     num_results: int = Field(default=10, ge=1, le=50)
+    max_concurrency: int = Field(default=8, ge=1)
+    cache: Optional[SearchCache] = Field(default=None)
+    fast_results: bool = Field(default=False)
+    metrics: Optional[MetricsSink] = Field(default=None)
+    timeout: Optional[float] = Field(default=None, gt=0)
+    hedge: Optional[HedgePolicy] = Field(default=None)
+    backend: Optional[SearchBackend] = Field(default=None)
+    output_format: Literal["default", "compact", "jsonl", "markdown"] = Field(
+        default="default"
+    )
+    max_output_tokens: Optional[int] = Field(default=None, ge=1)
+    max_chars: Optional[int] = Field(default=None, ge=1)
+    fetch_top_k: int = Field(default=0, ge=0)
+    fetcher: Optional[PageFetcher] = Field(default=None)
+    local_index: Optional[ResultIndex] = Field(default=None)
     region: str = Field(default="en-US")  # 保留但不使用
     safe_search: bool = Field(default=True)  # 保留但不使用
 
     class Config:
         arbitrary_types_allowed = True
 
+    _backend: Optional[SearchBackend] = PrivateAttr(default=None)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        # 延迟导入以避免循环导入
-        from .querit_search import QueritSearchBackend
+        if self.backend is not None:
+            # These only configure the default backend; a given backend
+            # would silently ignore them.
+            ignored = [
+                name for name in ("cache", "hedge") if getattr(self, name) is not None
+            ]
+            if self.fast_results:
+                ignored.append("fast_results")
+            if ignored:
+                raise ValueError(
+                    f"{', '.join(ignored)} can't be combined with backend=; "
+                    "configure the backend itself instead"
+                )
+        if self.fetch_top_k and self.fetcher is None:
+            self.fetcher = PageFetcher(metrics=self.metrics)
+        self._backend = self.backend
+
+    @property
+    def _backend_instance(self) -> SearchBackend:
+        """The backend in use; the default one is created on first search."""
+        backend = self._backend
+        if backend is None:
+            with _backend_lock:
+                backend = self._backend
+                if backend is None:
+                    # 延迟导入以避免循环导入，也让创建工具时不加载 HTTP 客户端
+                    from .querit_search import QueritSearchBackend
+
+                    backend = self._backend = QueritSearchBackend(
+                        cache=self.cache,
+                        fast_results=self.fast_results,
+                        metrics=self.metrics,
+                        hedge=self.hedge,
+                    )
+        return backend
+
+    @_backend_instance.setter
+    def _backend_instance(self, backend: SearchBackend) -> None:
+        self._backend = backend
+
+    def _run(
+        self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Execute the search and return formatted results.
 
-        self._backend_instance = QueritSearchBackend()
+        When LangChain callbacks are attached, the run's metrics are emitted
+        to them as a ``querit_search`` custom event.
+        """
+        sink = self._run_sink(run_manager)
+        try:
+            results = self._search_local(query, sink)
+            if results is None:
+                results = self._backend_instance.search(
+                    query=query,
+                    num_results=self.num_results,
+                    metrics=sink,
+                    timeout=self.timeout,
+                )
+                self._remember(results)
+            results = self._enrich(results)
+            output = self._render(results, sink)
+        except Exception as e:
+            output = f"Search failed: {str(e)}"
+
+        if sink is not None and run_manager is not None:
+            run_manager.get_child().on_custom_event(
+                "querit_search", {"events": sink.as_dicts()}, run_id=run_manager.run_id
+            )
+        return output
 
-    def _run(self, query: str) -> str:
-        """Execute the search and return formatted results."""
+    async def _arun(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Async version of the search tool."""
+        sink = self._run_sink(run_manager)
         try:
-            results = self._backend_instance.search(
-                query=query, num_results=self.num_results
+            results = self._search_local(query, sink)
+            if results is None:
+                results = await self._backend_instance.asearch(
+                    query=query,
+                    num_results=self.num_results,
+                    metrics=sink,
+                    timeout=self.timeout,
+                )
+                self._remember(results)
+            results = await self._aenrich(results)
+            output = self._render(results, sink)
+        except Exception as e:
+            output = f"Search failed: {str(e)}"
+
+        if sink is not None and run_manager is not None:
+            await run_manager.get_child().on_custom_event(
+                "querit_search", {"events": sink.as_dicts()}, run_id=run_manager.run_id
             )
+        return output
 
-            if not results:
-                return "No search results found."
+    @staticmethod
+    def _run_sink(run_manager) -> Optional[InMemorySink]:
+        # Only collect per-run events when someone is listening for them.
+        if run_manager is None or not run_manager.handlers:
+            return None
+        return InMemorySink()
 
-            return self._format_results(results)
+    def batch_run(self, queries: Sequence[str]) -> List[str]:
+        """Search several queries in parallel and return one result per query."""
+        # 延迟导入以避免循环导入
+        from .backend import batched
 
-        except Exception as e:
-            return f"Search failed: {str(e)}"
+        local, misses = self._split_local(queries)
+        fetched = batched(self._backend_instance).search_many(
+            misses,
+            num_results=self.num_results,
+            max_concurrency=self.max_concurrency,
+            timeout=self.timeout,
+        )
+        for outcome in fetched:
+            self._remember(outcome)
+        outcomes = self._merge_local(queries, local, fetched)
+        if self.fetch_top_k:
+            outcomes = [self._enrich(outcome) for outcome in outcomes]
+        return [self._render_outcome(outcome) for outcome in outcomes]
 
-    def _format_results(self, results: List[SearchResult]) -> str:
-        """Format search results into a readable string."""
-        formatted = []
-        for i, result in enumerate(results, 1):
-            formatted.append(f"{i}. {result.title}")
-            formatted.append(f"   URL: {result.link}")
-            formatted.append(f"   Preview: {result.snippet}")
-            formatted.append("")
+    async def abatch_run(self, queries: Sequence[str]) -> List[str]:
+        """Async version of ``batch_run``."""
+        # 延迟导入以避免循环导入
+        from .backend import batched
 
-        return "\n".join(formatted)
+        local, misses = self._split_local(queries)
+        fetched = await batched(self._backend_instance).asearch_many(
+            misses,
+            num_results=self.num_results,
+            max_concurrency=self.max_concurrency,
+            timeout=self.timeout,
+        )
+        for outcome in fetched:
+            self._remember(outcome)
+        outcomes = self._merge_local(queries, local, fetched)
+        if self.fetch_top_k:
+            outcomes = await asyncio.gather(
+                *(self._aenrich(outcome) for outcome in outcomes)
+            )
+        return [self._render_outcome(outcome) for outcome in outcomes]
 
-    async def _arun(self, query: str) -> str:
-        """Async version of the search tool."""
-        return self._run(query)
+    def _search_local(
+        self, query: str, sink: Optional[MetricsSink]
+    ) -> Optional[List[AnyResult]]:
+        # Answer from results already seen this session when they cover the
+        # query well enough; None means go upstream.
+        if self.local_index is None:
+            return None
+        results = self.local_index.answer(query, self.num_results)
+        counters = combine(self.metrics, sink)
+        if counters is not None:
+            counters.increment("local_miss" if results is None else "local_hit")
+        return results
+
+    def _split_local(
+        self, queries: Sequence[str]
+    ) -> Tuple[Dict[str, List[AnyResult]], List[str]]:
+        # Results for the queries the local index can answer, and the queries
+        # still to search upstream.
+        local: Dict[str, List[AnyResult]] = {}
+        for query in dict.fromkeys(queries):
+            results = self._search_local(query, None)
+            if results is not None:
+                local[query] = results
+        return local, [query for query in queries if query not in local]
+
+    @staticmethod
+    def _merge_local(
+        queries: Sequence[str], local: Dict[str, List[AnyResult]], fetched: list
+    ) -> list:
+        # Put local answers and upstream outcomes back in ``queries`` order.
+        upstream = iter(fetched)
+        return [
+            list(local[query]) if query in local else next(upstream)
+            for query in queries
+        ]
+
+    def _remember(self, outcome) -> None:
+        if self.local_index is not None and not isinstance(outcome, BaseException):
+            self.local_index.add(outcome)
+
+    def _enrich(self, outcome):
+        # Swap snippets for page text when fetching is on; errors pass through.
+        if not self.fetch_top_k or isinstance(outcome, BaseException):
+            return outcome
+        return self.fetcher.enrich(outcome, self.fetch_top_k)
+
+    async def _aenrich(self, outcome):
+        if not self.fetch_top_k or isinstance(outcome, BaseException):
+            return outcome
+        return await self.fetcher.aenrich(outcome, self.fetch_top_k)
+
+    def _render_outcome(self, outcome) -> str:
+        if isinstance(outcome, BaseException):
+            return f"Search failed: {str(outcome)}"
+
+        return self._render(outcome)
+
+    def _render(
+        self, results: List[AnyResult], sink: Optional[MetricsSink] = None
+    ) -> str:
+        if not results:
+            return "No search results found."
+
+        with stage(combine(self.metrics, sink), "format"):
+            return self._format_results(results)
+
+    def _format_results(self, results: List[AnyResult]) -> str:
+        """Format search results into a readable string."""
+        return format_results(results, self.output_format, self._char_budget())
+
+    def _char_budget(self) -> Optional[int]:
+        budgets = [self.max_chars]
+        if self.max_output_tokens is not None:
+            budgets.append(self.max_output_tokens * CHARS_PER_TOKEN)
+        return min((b for b in budgets if b is not None), default=None)
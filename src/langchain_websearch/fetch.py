@@ -0,0 +1,410 @@
+"""
+Fetching result pages and extracting their main text.
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import functools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit
+
+from .cache import CacheStats
+from .instrumentation import MetricsSink, stage
+from .pool import ConnectionPool
+from .utils import replace_result, truncate
+
+# Elements that never hold article text.
+_NOISE = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "iframe",
+    "form",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+]
+
+_CHUNK_SIZE = 16384
+
+
+@dataclass
+class Page:
+    """Text extracted from a fetched page.
+
+    ``truncated`` is set when the body was cut at the fetcher's byte limit.
+    ``etag`` and ``last_modified`` come from the response and are sent back
+    to revalidate the cached copy.
+    """
+
+    url: str
+    status: int
+    title: str
+    text: str
+    truncated: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+class PageCache:
+    """LRU cache of fetched pages keyed by URL.
+
+    A page younger than ``ttl`` seconds is served as is. An older one is
+    kept and revalidated with ``If-None-Match`` / ``If-Modified-Since``, so
+    an unchanged page costs a 304 instead of a download and re-extraction.
+    ``revalidated`` counts pages refreshed that way.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self.revalidated = 0
+        self._pages: "OrderedDict[str, Page]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Page]:
+        """Cached page for ``url``, fresh or not."""
+        with self._lock:
+            page = self._pages.get(url)
+            if page is not None:
+                self._pages.move_to_end(url)
+            return page
+
+    def is_fresh(self, page: Page) -> bool:
+        return time.monotonic() - page.fetched_at < self.ttl
+
+    def set(self, page: Page) -> None:
+        with self._lock:
+            self._pages[page.url] = page
+            self._pages.move_to_end(page.url)
+            while len(self._pages) > self.maxsize:
+                self._pages.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def record(self, hit: bool, revalidated: bool = False) -> None:
+        """Count a lookup in ``stats``; the fetcher calls this per page."""
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            if revalidated:
+                self.revalidated += 1
+
+
+class PageFetcher:
+    """Download result pages concurrently and extract their main text.
+
+    Requests go through ``pool``; by default the fetcher gets its own, so
+    page downloads don't take connections from search requests. At
+    most ``max_concurrency`` pages are fetched at once and at most
+    ``per_host`` from any one host. Bodies are streamed and reading stops
+    after ``max_bytes``; the text kept per page is cut to ``max_chars``.
+    Only HTML and plain-text responses are accepted. Pages are cached in
+    ``cache`` (a ``PageCache`` by default) and revalidated once stale.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        cache: Optional[PageCache] = None,
+        max_bytes: int = 512 * 1024,
+        max_chars: int = 4000,
+        per_host: int = 2,
+        max_concurrency: int = 8,
+        timeout: float = 10.0,
+        parser: Optional[str] = None,
+        metrics: Optional[MetricsSink] = None,
+    ):
+        if per_host < 1 or max_concurrency < 1:
+            raise ValueError("per_host and max_concurrency must be at least 1")
+
+        self.pool = pool or ConnectionPool(pool_size=max_concurrency)
+        self.cache = cache if cache is not None else PageCache()
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.per_host = per_host
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.parser = parser
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_hosts: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def fetch(self, url: str) -> Page:
+        """Fetch ``url`` (or revalidate its cached copy) and extract its text."""
+        cached = self.cache.get(url)
+        if cached is not None and self.cache.is_fresh(cached):
+            self.cache.record(hit=True)
+            return cached
+
+        with self._host_slot(url), stage(self.metrics, "fetch"):
+            with self.pool.checkout() as session:
+                response = session.get(
+                    url,
+                    headers=_request_headers(cached),
+                    stream=True,
+                    timeout=self.timeout,
+                )
+                try:
+                    if response.status_code == 304 and cached is not None:
+                        return self._revalidated(cached, response.headers)
+                    response.raise_for_status()
+                    _check_content_type(response.headers)
+                    body, truncated = _read_capped(
+                        response.iter_content(_CHUNK_SIZE), self.max_bytes
+                    )
+                finally:
+                    response.close()
+
+        return self._store(url, response.status_code, response.headers, body, truncated)
+
+    async def afetch(self, url: str) -> Page:
+        """Async version of ``fetch``."""
+        cached = self.cache.get(url)
+        if cached is not None and self.cache.is_fresh(cached):
+            self.cache.record(hit=True)
+            return cached
+
+        client = self.pool.async_client()
+        async with self._async_host_slot(url):
+            with stage(self.metrics, "fetch"):
+                async with client.stream(
+                    "GET",
+                    url,
+                    headers=_request_headers(cached),
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                ) as response:
+                    if response.status_code == 304 and cached is not None:
+                        return self._revalidated(cached, response.headers)
+                    response.raise_for_status()
+                    _check_content_type(response.headers)
+                    body, truncated = await _aread_capped(
+                        response.aiter_bytes(_CHUNK_SIZE), self.max_bytes
+                    )
+
+        return self._store(url, response.status_code, response.headers, body, truncated)
+
+    def fetch_many(self, urls: Sequence[str]) -> List[Union[Page, Exception]]:
+        """Fetch ``urls`` concurrently; a failed fetch yields its exception."""
+        if not urls:
+            return []
+
+        def run(url: str) -> Union[Page, Exception]:
+            try:
+                return self.fetch(url)
+            except Exception as e:
+                return e
+
+        workers = min(self.max_concurrency, len(urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, urls))
+
+    async def afetch_many(self, urls: Sequence[str]) -> List[Union[Page, Exception]]:
+        """Async version of ``fetch_many``."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(url: str) -> Union[Page, Exception]:
+            async with semaphore:
+                try:
+                    return await self.afetch(url)
+                except Exception as e:
+                    return e
+
+        return list(await asyncio.gather(*(run(url) for url in urls)))
+
+    def enrich(self, results: Sequence[Any], top_k: int) -> List[Any]:
+        """``results`` with the snippets of the first ``top_k`` replaced by
+        the text of their pages; results whose page fails keep their snippet.
+        """
+        pages = self.fetch_many([result.link for result in results[:top_k]])
+        return _with_pages(results, pages)
+
+    async def aenrich(self, results: Sequence[Any], top_k: int) -> List[Any]:
+        """Async version of ``enrich``."""
+        pages = await self.afetch_many([result.link for result in results[:top_k]])
+        return _with_pages(results, pages)
+
+    @contextlib.contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._hosts.get(host)
+            if semaphore is None:
+                semaphore = self._hosts[host] = threading.BoundedSemaphore(
+                    self.per_host
+                )
+        with semaphore:
+            yield
+
+    @contextlib.asynccontextmanager
+    async def _async_host_slot(self, url: str) -> AsyncIterator[None]:
+        # asyncio semaphores belong to one event loop, so keep a set per loop.
+        loop = asyncio.get_running_loop()
+        host = urlsplit(url).netloc
+        with self._lock:
+            hosts = self._async_hosts.setdefault(loop, {})
+            semaphore = hosts.get(host)
+            if semaphore is None:
+                semaphore = hosts[host] = asyncio.Semaphore(self.per_host)
+        async with semaphore:
+            yield
+
+    def _revalidated(self, cached: Page, headers: Any) -> Page:
+        page = dataclasses.replace(
+            cached,
+            etag=headers.get("ETag") or cached.etag,
+            last_modified=headers.get("Last-Modified") or cached.last_modified,
+            fetched_at=time.monotonic(),
+        )
+        self.cache.set(page)
+        self.cache.record(hit=True, revalidated=True)
+        return page
+
+    def _store(
+        self, url: str, status: int, headers: Any, body: bytes, truncated: bool
+    ) -> Page:
+        with stage(self.metrics, "extract"):
+            title, text = extract_text(
+                body, headers.get("Content-Type", ""), self.parser
+            )
+        page = Page(
+            url=url,
+            status=status,
+            title=title,
+            text=truncate(text, self.max_chars),
+            truncated=truncated,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            fetched_at=time.monotonic(),
+        )
+        self.cache.set(page)
+        self.cache.record(hit=False)
+        return page
+
+
+def extract_text(
+    body: bytes, content_type: str = "text/html", parser: Optional[str] = None
+) -> Tuple[str, str]:
+    """``(title, text)`` of an HTML or plain-text body.
+
+    For HTML the text comes from ``<article>`` or ``<main>`` when the page
+    has one, otherwise from ``<body>``, without scripts, styles, navigation,
+    headers, footers, sidebars and forms. Whitespace is collapsed. ``parser``
+    defaults to lxml when installed and the standard library parser otherwise.
+    """
+    from bs4 import BeautifulSoup
+    from bs4.dammit import EncodingDetector
+
+    encoding = _charset(content_type)
+    is_html = "html" in content_type or not content_type
+    if encoding is None and is_html:
+        encoding = EncodingDetector.find_declared_encoding(body, is_html=True)
+    try:
+        markup = body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        markup = body.decode("utf-8", errors="replace")
+
+    if not is_html:
+        return "", " ".join(markup.split())
+
+    soup = BeautifulSoup(markup, parser or _default_parser())
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+    for tag in root.find_all(_NOISE):
+        tag.decompose()
+    return title, " ".join(root.get_text(" ").split())
+
+
+@functools.lru_cache(maxsize=None)
+def _default_parser() -> str:
+    from bs4.builder import builder_registry
+
+    # lxml is several times faster than the stdlib parser; use it when installed.
+    return "lxml" if builder_registry.lookup("lxml") else "html.parser"
+
+
+def _request_headers(cached: Optional[Page]) -> Dict[str, str]:
+    headers = {"Accept": "text/html,application/xhtml+xml,text/plain;q=0.9"}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+def _check_content_type(headers: Any) -> None:
+    content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type and not (
+        content_type.startswith("text/") or content_type.endswith("+xml")
+    ):
+        raise ValueError(f"Unsupported content type: {content_type}")
+
+
+def _charset(content_type: str) -> Optional[str]:
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            return value.strip().strip("\"'") or None
+    return None
+
+
+def _read_capped(chunks: Iterator[bytes], limit: int) -> Tuple[bytes, bool]:
+    """Body from ``chunks``, stopping once ``limit`` bytes have been read."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) > limit:
+            return bytes(buffer[:limit]), True
+    return bytes(buffer), False
+
+
+async def _aread_capped(chunks: AsyncIterator[bytes], limit: int) -> Tuple[bytes, bool]:
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) > limit:
+            return bytes(buffer[:limit]), True
+    return bytes(buffer), False
+
+
+def _with_pages(
+    results: Sequence[Any], pages: Sequence[Union[Page, Exception]]
+) -> List[Any]:
+    enriched = list(results)
+    for i, page in enumerate(pages):
+        if isinstance(page, Page) and page.text:
+            enriched[i] = replace_result(results[i], snippet=page.text)
+    return enriched
@@ -0,0 +1,104 @@
+"""
+Rendering search results as text for an LLM prompt.
+"""
+
+import json
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .utils import truncate
+
+# Rough characters per token for English text; used to turn a token budget
+# into a character budget without depending on a tokenizer.
+CHARS_PER_TOKEN = 4
+
+# A result is only kept if at least this much of its snippet fits.
+MIN_SNIPPET_CHARS = 40
+
+
+def _default(index: int, result, snippet: str) -> str:
+    return f"{index}. {result.title}\n   URL: {result.link}\n   Preview: {snippet}\n"
+
+
+def _compact(index: int, result, snippet: str) -> str:
+    return f"{index}. {result.title} ({result.link}) {snippet}"
+
+
+def _jsonl(index: int, result, snippet: str) -> str:
+    return json.dumps(
+        {"title": result.title, "url": result.link, "snippet": snippet},
+        ensure_ascii=False,
+    )
+
+
+def _markdown(index: int, result, snippet: str) -> str:
+    return f"{index}. [{result.title}]({result.link})\n   {snippet}"
+
+
+FORMATS: Dict[str, Callable[..., str]] = {
+    "default": _default,
+    "compact": _compact,
+    "jsonl": _jsonl,
+    "markdown": _markdown,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def format_results(
+    results: Sequence, mode: str = "default", max_chars: Optional[int] = None
+) -> str:
+    """Render ``results`` in ``mode``, fitting the output into ``max_chars``.
+
+    Results are rendered in rank order in one pass. Each one may use its fair
+    share of the budget left, or enough to show ``MIN_SNIPPET_CHARS`` of its
+    snippet if that is more; snippets are cut at a word boundary. Once a
+    result can't fit even that, it and every lower-ranked result are dropped.
+    The top result always keeps at least its title and link, even over a
+    budget too small for it, so that the output is never empty.
+    """
+    render = FORMATS[mode]
+    if max_chars is None:
+        return "\n".join(
+            render(i, result, result.snippet) for i, result in enumerate(results, 1)
+        )
+
+    lines: List[str] = []
+    remaining = max_chars
+    for i, result in enumerate(results, 1):
+        if lines:
+            remaining -= 1  # the newline joining it to the previous result
+        share = remaining // (len(results) - i + 1)
+        line = render(i, result, result.snippet)
+        if len(line) > share:
+            floor = len(render(i, result, "")) + MIN_SNIPPET_CHARS
+            fitted = _fit(render, i, result, min(remaining, max(share, floor)))
+            if fitted is None:
+                if not lines:
+                    lines.append(render(i, result, "").rstrip())
+                break
+            line = fitted
+        lines.append(line)
+        remaining -= len(line)
+    return "\n".join(lines)
+
+
+def _fit(render: Callable[..., str], index: int, result, budget: int) -> Optional[str]:
+    """``result`` rendered in at most ``budget`` characters, or None."""
+    line = render(index, result, result.snippet)
+    if len(line) <= budget:
+        return line
+
+    room = budget - len(render(index, result, ""))
+    if room < MIN_SNIPPET_CHARS:
+        return None
+    # Escaping (JSON lines) can make the rendered snippet longer than the raw
+    # one, so shrink until it fits.
+    while room > 0:
+        line = render(index, result, truncate(result.snippet, room))
+        if len(line) <= budget:
+            return line
+        room -= len(line) - budget
+    return None
@@ -0,0 +1,219 @@
+"""
+Hedged requests for tail-latency control.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class HedgeLeg:
+    """Cancellation handle for one request of a sync hedged call.
+
+    Threads can't be interrupted, so a leg that lost keeps running until its
+    request returns. ``cancel`` runs the callbacks registered with
+    ``on_cancel`` at once, so it can give back what it holds before then.
+    """
+
+    def __init__(self) -> None:
+        self.cancelled = False
+        self.started = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` on cancellation, or now if already cancelled."""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def check(self) -> None:
+        """Raise ``CancelledError`` if the leg has lost."""
+        if self.cancelled:
+            raise CancelledError("Another hedged request answered first")
+
+
+class HedgePolicy:
+    """Send a second identical request when the first one is slow.
+
+    The hedge fires once the first request has been outstanding for longer
+    than ``percentile`` of recently observed latencies (``initial_delay``
+    until ``min_samples`` have been seen, and never sooner than
+    ``min_delay``). The first successful response wins and the other request
+    is cancelled; an error only surfaces when both requests fail. Only the
+    winning request's own latency is recorded.
+
+    Sync calls run on a pool of ``max_workers`` threads owned by the policy.
+    A call waiting for a free thread is not hedged: the delay counts from
+    when its first request starts.
+    One policy can be shared by several backends so that they learn from the
+    same latency history. ``sent`` and ``won`` count hedges fired and hedges
+    that answered first.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.01,
+        min_samples: int = 20,
+        window: int = 256,
+        max_workers: int = 32,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.sent = 0
+        self.won = 0
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Seconds to wait for the first request before hedging."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def record(self, seconds: float) -> None:
+        """Add an observed request latency to the history."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def call(self, fn: Callable[[HedgeLeg], Any], can_hedge: Callable[[], bool]) -> Any:
+        """Run ``fn`` in a worker thread, hedging it with a second call.
+
+        ``fn`` is given its leg's ``HedgeLeg``, which is cancelled if the
+        other leg answers first. ``can_hedge`` is asked right before the hedge
+        is sent and may veto it, e.g. when no rate-limit token is available.
+        """
+        executor = self._pool()
+        legs: Dict["Future[Tuple[float, Any]]", HedgeLeg] = {}
+
+        def submit() -> "Future[Tuple[float, Any]]":
+            leg = HedgeLeg()
+            future = executor.submit(_timed, fn, leg)
+            legs[future] = leg
+            return future
+
+        hedge = None
+        first = submit()
+        pending = {first}
+        try:
+            # Time the hedge from when the first leg starts: waiting for a
+            # free worker is not a slow request, and hedging it would only
+            # queue one more.
+            legs[first].started.wait()
+            done, pending = wait(pending, timeout=self.delay())
+            if not done and can_hedge():
+                hedge = submit()
+                pending.add(hedge)
+                self._incr("sent")
+
+            while True:
+                succeeded = [future for future in done if future.exception() is None]
+                if succeeded:
+                    elapsed, result = succeeded[0].result()
+                    self._finish(elapsed, succeeded[0] is hedge)
+                    return result
+                if not pending:
+                    error = next(iter(done)).exception()
+                    assert error is not None
+                    raise error
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        finally:
+            # A losing request that is already running finishes in the
+            # background and its result is dropped; one still queued never
+            # starts.
+            for future in pending:
+                future.cancel()
+                legs[future].cancel()
+
+    async def acall(
+        self, fn: Callable[[], Awaitable[Any]], can_hedge: Callable[[], bool]
+    ) -> Any:
+        """Async version of ``call``; the losing request is cancelled."""
+        hedge = None
+        pending = {asyncio.ensure_future(_atimed(fn))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.delay())
+            if not done and can_hedge():
+                hedge = asyncio.ensure_future(_atimed(fn))
+                pending.add(hedge)
+                self._incr("sent")
+
+            while True:
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    elapsed, result = succeeded[0].result()
+                    self._finish(elapsed, succeeded[0] is hedge)
+                    return result
+                if not pending:
+                    error = next(iter(done)).exception()
+                    assert error is not None
+                    raise error
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="querit-hedge"
+                )
+            return self._executor
+
+    def _finish(self, elapsed: float, hedge_won: bool) -> None:
+        self.record(elapsed)
+        if hedge_won:
+            self._incr("won")
+
+    def _incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+def _timed(fn: Callable[[HedgeLeg], Any], leg: HedgeLeg) -> Tuple[float, Any]:
+    # Timed from when the leg starts, not from the start of the call: the
+    # hedge's latency must not include the wait before it was sent.
+    leg.started.set()
+    started = time.monotonic()
+    result = fn(leg)
+    return time.monotonic() - started, result
+
+
+async def _atimed(fn: Callable[[], Awaitable[Any]]) -> Tuple[float, Any]:
+    started = time.monotonic()
+    result = await fn()
+    return time.monotonic() - started, result
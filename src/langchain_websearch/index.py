@@ -0,0 +1,163 @@
+"""
+Local BM25 index over search results already fetched in a session.
+"""
+
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from .semantic import DEFAULT_STOPWORDS
+from .utils import replace_result, tokenize
+
+
+class _Document(NamedTuple):
+    result: Any
+    terms: Counter
+    length: int
+
+
+class ResultIndex:
+    """Inverted index with BM25 ranking over results seen in one session.
+
+    ``add`` indexes the title (counted ``title_weight`` times) and snippet of
+    each result, keyed on its normalized URL so a page found by several
+    searches is stored once, in its most recent form. Updates are
+    incremental; once ``capacity`` pages are held the least recently seen
+    are dropped, postings included.
+
+    ``answer`` returns local results when they look good enough to skip the
+    API: at least ``min_results`` pages (or ``num_results`` if fewer) match,
+    and together they contain ``min_coverage`` of the query's terms.
+    ``hits`` and ``misses`` count its outcomes.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 2000,
+        min_coverage: float = 0.8,
+        min_results: int = 3,
+        k1: float = 1.2,
+        b: float = 0.75,
+        title_weight: int = 2,
+        stopwords: FrozenSet[str] = DEFAULT_STOPWORDS,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.min_coverage = min_coverage
+        self.min_results = min_results
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.stopwords = stopwords
+        self.hits = 0
+        self.misses = 0
+        self._docs: "OrderedDict[int, _Document]" = OrderedDict()
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, results: Sequence[Any]) -> None:
+        """Index ``results``, replacing earlier copies of the same URLs."""
+        with self._lock:
+            for result in results:
+                url = normalize_url(result.link)
+                old = self._ids.pop(url, None)
+                if old is not None:
+                    self._remove(old)
+
+                terms = Counter(self._tokens(result.snippet or ""))
+                for term in self._tokens(result.title or ""):
+                    terms[term] += self.title_weight
+                doc_id = self._next_id
+                self._next_id += 1
+                length = sum(terms.values())
+                self._docs[doc_id] = _Document(result, terms, length)
+                self._ids[url] = doc_id
+                self._total_length += length
+                for term, count in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = count
+
+            while len(self._docs) > self.capacity:
+                doc_id = next(iter(self._docs))
+                self._ids.pop(normalize_url(self._docs[doc_id].result.link), None)
+                self._remove(doc_id)
+
+    def search(self, query: str, num_results: int = 10) -> List[Tuple[Any, float]]:
+        """Best ``num_results`` matches for ``query`` with their BM25 scores."""
+        return [(doc.result, score) for doc, score in self._rank(query, num_results)]
+
+    def answer(self, query: str, num_results: int = 10) -> Optional[List[Any]]:
+        """Local results for ``query``, renumbered, or None to go upstream."""
+        ranked = self._rank(query, num_results)
+        terms = set(self._tokens(query))
+        covered = set().union(*(doc.terms.keys() & terms for doc, _ in ranked))
+        enough = len(ranked) >= min(self.min_results, num_results)
+        hit = terms and enough and len(covered) >= self.min_coverage * len(terms)
+        with self._lock:
+            if not hit:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return [
+            replace_result(doc.result, position=position)
+            for position, (doc, _) in enumerate(ranked, 1)
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._ids.clear()
+            self._postings.clear()
+            self._total_length = 0
+
+    def _rank(self, query: str, num_results: int) -> List[Tuple[_Document, float]]:
+        terms = set(self._tokens(query))
+        with self._lock:
+            count = len(self._docs)
+            if not count or not terms:
+                return []
+            average = self._total_length / count
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self._docs[doc_id].length / average
+                    )
+                    score = idf * tf * (self.k1 + 1) / (tf + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+            best = sorted(scores.items(), key=lambda item: -item[1])[:num_results]
+            return [(self._docs[doc_id], score) for doc_id, score in best]
+
+    def _remove(self, doc_id: int) -> None:
+        doc = self._docs.pop(doc_id)
+        self._total_length -= doc.length
+        for term in doc.terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def _tokens(self, text: str) -> List[str]:
+        return tokenize(text, self.stopwords)
+
+
+def normalize_url(url: str) -> str:
+    """URL with case-insensitive parts lowercased, no fragment or trailing /."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, parts.query, "")
+    )
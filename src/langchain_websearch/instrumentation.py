@@ -0,0 +1,160 @@
+"""
+Metrics hooks for the search path.
+
+Backends and tools report to an optional ``MetricsSink``. Each search emits:
+
+* timings: ``search`` (whole call), ``throttle`` (rate-limit wait),
+  ``connect`` and ``tls`` (new connections, async path only), ``request``
+  (send until response headers, which includes connecting on the sync path),
+  ``read`` (body transfer), ``decode`` (JSON), ``parse`` (result
+  construction) and ``format`` (tool output);
+* observations: ``response_bytes`` (decompressed), ``wire_bytes`` (as
+  received) and ``results``;
+* counters: ``cache_hit``, ``cache_miss``, ``cache_stale`` (a hit on an
+  expired entry), ``retry``, ``hedge`` and ``error``, tagged with the HTTP
+  status or exception class where relevant.
+
+Background work is reported to the backend's own sink: ``revalidate`` counts
+stale entries refreshed after a ``cache_stale`` hit and ``prefetch`` counts
+searches refreshed by a ``Prefetcher``. An ``AdaptiveLimiter`` observes
+``concurrency_limit`` whenever its limit changes; the wait for a slot is
+timed as ``throttle``.
+
+A ``WebSearchTool`` with a ``local_index`` counts ``local_hit`` and
+``local_miss`` for queries answered from, or passed over by, the index.
+
+A ``PageFetcher`` given a sink also times ``fetch`` (download) and
+``extract`` (HTML to text) for each page it retrieves.
+
+With no sink configured, instrumented code only pays for a None check.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+Tags = Optional[Dict[str, Any]]
+
+
+class MetricsSink:
+    """Base class for metrics receivers; every method is a no-op by default."""
+
+    def timing(self, name: str, seconds: float, tags: Tags = None) -> None:
+        """Record how long stage ``name`` took."""
+
+    def observe(self, name: str, value: float, tags: Tags = None) -> None:
+        """Record a measured value such as a byte or result count."""
+
+    def increment(self, name: str, value: int = 1, tags: Tags = None) -> None:
+        """Add ``value`` to counter ``name``."""
+
+
+class MetricEvent(NamedTuple):
+    kind: str
+    name: str
+    value: float
+    tags: Dict[str, Any]
+
+
+class InMemorySink(MetricsSink):
+    """Thread-safe sink that keeps every event, for tests and debugging."""
+
+    def __init__(self) -> None:
+        self.events: List[MetricEvent] = []
+        self._lock = threading.Lock()
+
+    def timing(self, name: str, seconds: float, tags: Tags = None) -> None:
+        self._add("timing", name, seconds, tags)
+
+    def observe(self, name: str, value: float, tags: Tags = None) -> None:
+        self._add("observe", name, value, tags)
+
+    def increment(self, name: str, value: int = 1, tags: Tags = None) -> None:
+        self._add("increment", name, value, tags)
+
+    def _add(self, kind: str, name: str, value: float, tags: Tags) -> None:
+        with self._lock:
+            self.events.append(MetricEvent(kind, name, value, tags or {}))
+
+    def names(self, kind: Optional[str] = None) -> List[str]:
+        """Names of the recorded events, optionally of one kind."""
+        return [e.name for e in self.events if kind is None or e.kind == kind]
+
+    def total(self, name: str) -> float:
+        """Sum of the values recorded under ``name``."""
+        return sum(e.value for e in self.events if e.name == name)
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """Events as plain dicts, e.g. for a LangChain callback payload."""
+        return [e._asdict() for e in self.events]
+
+
+class FanoutSink(MetricsSink):
+    """Forward every event to several sinks."""
+
+    def __init__(self, *sinks: MetricsSink):
+        self.sinks = sinks
+
+    def timing(self, name: str, seconds: float, tags: Tags = None) -> None:
+        for sink in self.sinks:
+            sink.timing(name, seconds, tags)
+
+    def observe(self, name: str, value: float, tags: Tags = None) -> None:
+        for sink in self.sinks:
+            sink.observe(name, value, tags)
+
+    def increment(self, name: str, value: int = 1, tags: Tags = None) -> None:
+        for sink in self.sinks:
+            sink.increment(name, value, tags)
+
+
+def combine(*sinks: Optional[MetricsSink]) -> Optional[MetricsSink]:
+    """Merge optional sinks, returning None when all of them are None."""
+    present = [sink for sink in sinks if sink is not None]
+    if not present:
+        return None
+    if len(present) == 1:
+        return present[0]
+    return FanoutSink(*present)
+
+
+class _Stage:
+    __slots__ = ("sink", "name", "tags", "start")
+
+    def __init__(self, sink: MetricsSink, name: str, tags: Tags):
+        self.sink = sink
+        self.name = name
+        self.tags = tags
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.sink.timing(self.name, time.perf_counter() - self.start, self.tags)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoStage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(sink: Optional[MetricsSink], name: str, tags: Tags = None) -> Any:
+    """Context manager timing the enclosed block as stage ``name``."""
+    if sink is None:
+        return _NO_STAGE
+    return _Stage(sink, name, tags)
+
+
+def record_error(sink: Optional[MetricsSink], error: BaseException) -> None:
+    """Count ``error`` against ``sink``, tagged with its class name."""
+    if sink is not None:
+        sink.increment("error", tags={"error": type(error).__name__})
@@ -0,0 +1,221 @@
+"""
+API key pool with per-key quota accounting.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+from .retry import retry_after_seconds
+
+# Header values above this are absolute epoch seconds rather than a delay.
+_EPOCH_THRESHOLD = 1e9
+
+
+@dataclass
+class KeyStats:
+    """Usage of one pooled key; ``key`` is masked to its last four characters."""
+
+    key: str
+    requests: int
+    rate_limited: int
+    used: int
+    limit: Optional[int]
+    remaining: Optional[int]
+    utilization: Optional[float]
+    benched_for: float
+
+
+class _KeyState:
+    def __init__(self, key: str, limit: Optional[int]):
+        self.key = key
+        self.limit = limit
+        # Remaining calls reported by the API for the current window.
+        self.remaining: Optional[int] = None
+        self.used = 0
+        self.window_end = 0.0
+        self.benched_until = 0.0
+        self.requests = 0
+        self.rate_limited = 0
+
+    def budget(self) -> float:
+        if self.remaining is not None:
+            return self.remaining
+        if self.limit is not None:
+            return self.limit - self.used
+        return float("inf")
+
+    def available_at(self, now: float) -> float:
+        if self.budget() <= 0:
+            return max(self.benched_until, self.window_end)
+        return max(self.benched_until, now)
+
+
+class KeyPool:
+    """Spread requests over several API keys by remaining budget.
+
+    Each request takes the key with the most calls left in its quota window,
+    known from ``X-RateLimit-Limit`` / ``-Remaining`` / ``-Reset`` response
+    headers or, failing that, from ``limit`` calls per ``window`` seconds
+    counted locally. A 429 benches its key until ``Retry-After`` (or the end
+    of the window); an exhausted key sits out until its window resets. When
+    no key is free, ``acquire`` waits for the first one to come back.
+    """
+
+    def __init__(
+        self, keys: Sequence[str], limit: Optional[int] = None, window: float = 60.0
+    ):
+        keys = [key for key in dict.fromkeys(keys) if key]
+        if not keys:
+            raise ValueError("KeyPool needs at least one API key")
+
+        self.window = window
+        self._states = {key: _KeyState(key, limit) for key in keys}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str = "QUERIT_API_KEYS", **kwargs) -> Optional["KeyPool"]:
+        """Pool built from a comma-separated environment variable, if set."""
+        keys = [key.strip() for key in os.getenv(name, "").split(",")]
+        if not any(keys):
+            return None
+        return cls(keys, **kwargs)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Return the key to use for the next request.
+
+        Waits for a benched or exhausted key to come back when none is free,
+        returning None if that would take longer than ``timeout`` seconds.
+        """
+        while True:
+            key, wait = self._reserve(timeout)
+            if key is not None or wait is None:
+                return key
+            time.sleep(wait)
+            if timeout is not None:
+                timeout -= wait
+
+    async def aacquire(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Async version of ``acquire``."""
+        while True:
+            key, wait = self._reserve(timeout)
+            if key is not None or wait is None:
+                return key
+            await asyncio.sleep(wait)
+            if timeout is not None:
+                timeout -= wait
+
+    def available(self) -> bool:
+        """Whether some key can be used right now."""
+        with self._lock:
+            now = time.monotonic()
+            return any(
+                self._refresh(state, now).available_at(now) <= now
+                for state in self._states.values()
+            )
+
+    def record(self, key: str, status: int, headers: Mapping[str, Any]) -> None:
+        """Update ``key``'s quota from a response's status and headers."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            now = time.monotonic()
+            self._refresh(state, now)
+
+            limit = _int_header(headers, "X-RateLimit-Limit")
+            if limit is not None:
+                state.limit = limit
+            remaining = _int_header(headers, "X-RateLimit-Remaining")
+            if remaining is not None:
+                state.remaining = remaining
+            reset = _reset_seconds(headers.get("X-RateLimit-Reset"))
+            if reset is not None:
+                state.window_end = now + reset
+
+            if status == 429:
+                state.rate_limited += 1
+                wait = retry_after_seconds(headers.get("Retry-After"))
+                if wait is None:
+                    wait = state.window_end - now
+                    if wait <= 0:
+                        wait = self.window
+                state.benched_until = now + wait
+
+    def stats(self) -> List[KeyStats]:
+        """Per-key usage in the current window, for sizing the pool."""
+        with self._lock:
+            now = time.monotonic()
+            stats = []
+            for state in self._states.values():
+                self._refresh(state, now)
+                budget = state.budget()
+                remaining = None if budget == float("inf") else max(0, int(budget))
+                limit = state.limit
+                stats.append(
+                    KeyStats(
+                        key="..." + state.key[-4:],
+                        requests=state.requests,
+                        rate_limited=state.rate_limited,
+                        used=state.used,
+                        limit=limit,
+                        remaining=remaining,
+                        utilization=state.used / limit if limit else None,
+                        benched_for=max(0.0, state.available_at(now) - now),
+                    )
+                )
+            return stats
+
+    def _reserve(
+        self, timeout: Optional[float]
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """``(key, 0)`` for a free key, ``(None, wait)`` or ``(None, None)``."""
+        with self._lock:
+            now = time.monotonic()
+            states = [self._refresh(state, now) for state in self._states.values()]
+            free = [state for state in states if state.available_at(now) <= now]
+            if not free:
+                wait = min(state.available_at(now) for state in states) - now
+                if timeout is not None and wait > timeout:
+                    return None, None
+                return None, wait
+
+            state = max(free, key=lambda s: (s.budget(), -s.used))
+            state.used += 1
+            state.requests += 1
+            if state.remaining is not None:
+                state.remaining -= 1
+            return state.key, 0.0
+
+    def _refresh(self, state: _KeyState, now: float) -> _KeyState:
+        # Start a new quota window once the previous one has ended.
+        if now >= state.window_end:
+            state.window_end = now + self.window
+            state.used = 0
+            state.remaining = None
+        return state
+
+
+def _int_header(headers: Mapping[str, Any], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_seconds(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    if reset > _EPOCH_THRESHOLD:
+        reset -= time.time()
+    return max(0.0, reset)
@@ -0,0 +1,176 @@
+"""
+Adaptive concurrency limit for Querit requests.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .instrumentation import MetricsSink
+
+ALGORITHMS = ("gradient", "aimd")
+
+
+class AdaptiveLimiter:
+    """Cap requests in flight at a limit that follows observed latency.
+
+    Each request holds a slot from ``acquire`` until ``release`` reports its
+    latency, and whether it was dropped: rejected with 429/5xx or timed out.
+    The limit then moves between ``min_limit`` and ``max_limit``:
+
+    * ``"gradient"`` (as in Netflix's Gradient2) compares a slow moving
+      average of latency with a fast one. While they agree, the limit grows
+      by about its square root per sample. When recent latency rises above
+      the long-term average, the limit shrinks in proportion, down to half
+      per sample. The change is smoothed by ``smoothing``.
+    * ``"aimd"`` adds one per sample while the limit is in use and latency
+      stays under ``tolerance`` times the long-term average. Otherwise it
+      multiplies the limit by ``backoff``.
+
+    Drops always multiply the limit by ``backoff``. One limiter can be
+    shared by threads, async tasks and several backends. Each change is
+    reported to ``metrics`` as a ``concurrency_limit`` observation.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        algorithm: str = "gradient",
+        backoff: float = 0.9,
+        tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        long_window: int = 100,
+        short_window: int = 10,
+        metrics: Optional[MetricsSink] = None,
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm!r}; expected {ALGORITHMS}")
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Need 1 <= min_limit <= initial_limit <= max_limit")
+        self.algorithm = algorithm
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.metrics = metrics
+        self.dropped = 0
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._long_alpha = 2.0 / (long_window + 1)
+        self._short_alpha = 2.0 / (short_window + 1)
+        self._long_rtt: Optional[float] = None
+        self._short_rtt: Optional[float] = None
+        self._waiters: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a slot is free; False if none frees up in ``timeout``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            event = threading.Event()
+            if self._take(event.set):
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            event.wait(remaining)
+
+    async def aacquire(self, timeout: Optional[float] = None) -> bool:
+        """Async version of ``acquire``."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            woken = loop.create_future()
+
+            def wake() -> None:
+                try:
+                    loop.call_soon_threadsafe(_resolve, woken)
+                except RuntimeError:
+                    pass  # the waiting loop has been closed
+
+            if self._take(wake):
+                return True
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(woken, remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, latency: Optional[float], dropped: bool = False) -> None:
+        """Free a slot and adapt the limit to the request's outcome.
+
+        ``latency`` None frees the slot without adapting, for failures that
+        say nothing about load (a bad request, say).
+        """
+        with self._lock:
+            in_flight = self._in_flight
+            self._in_flight -= 1
+            old = self.limit
+            if dropped:
+                self.dropped += 1
+                self._set_limit(self._limit * self.backoff)
+            elif latency is not None:
+                self._sample(latency, in_flight)
+            changed = self.limit != old
+            waiters, self._waiters = self._waiters, []
+
+        for wake in waiters:
+            wake()
+        if changed and self.metrics is not None:
+            self.metrics.observe("concurrency_limit", self.limit)
+
+    def _take(self, wake: Callable[[], None]) -> bool:
+        # Either take a slot or register ``wake`` to be called on the next
+        # release; every waiter then tries again.
+        with self._lock:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            self._waiters.append(wake)
+            return False
+
+    def _sample(self, latency: float, in_flight: int) -> None:
+        if self._long_rtt is None or self._short_rtt is None:
+            self._long_rtt = self._short_rtt = latency
+            return
+        short_rtt = self._short_rtt + self._short_alpha * (latency - self._short_rtt)
+        long_rtt = self._long_rtt + self._long_alpha * (latency - self._long_rtt)
+        self._short_rtt, self._long_rtt = short_rtt, long_rtt
+
+        if self.algorithm == "aimd":
+            if latency > self.tolerance * long_rtt:
+                self._set_limit(self._limit * self.backoff)
+            elif in_flight * 2 >= self.limit:
+                # Only grow a limit that is actually being used.
+                self._set_limit(self._limit + 1)
+            return
+
+        gradient = max(0.5, min(1.0, long_rtt / short_rtt))
+        target = self._limit * gradient + math.sqrt(self._limit)
+        if in_flight * 2 < self.limit:
+            target = min(target, self._limit)
+        self._set_limit(self._limit + self.smoothing * (target - self._limit))
+
+    def _set_limit(self, limit: float) -> None:
+        self._limit = max(float(self.min_limit), min(float(self.max_limit), limit))
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,170 @@
+"""
+Shared, keep-alive HTTP connections for Querit requests.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+    from requests.adapters import BaseAdapter
+
+
+class Transport:
+    """Where a ``ConnectionPool`` sends its requests.
+
+    Provides the requests adapter used by the sync session and the httpx
+    transport used by async clients. This default talks to the network;
+    ``RecordingTransport`` and ``ReplayTransport`` in ``replay`` record
+    traffic to an archive and serve it back offline.
+    """
+
+    def adapter(self, pool_size: int) -> "BaseAdapter":
+        from requests.adapters import HTTPAdapter
+
+        return HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def async_transport(self, limits: "httpx.Limits") -> "httpx.AsyncBaseTransport":
+        import httpx
+
+        return httpx.AsyncHTTPTransport(limits=limits)
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP connections.
+
+    Sync requests go through a single ``requests.Session`` whose adapter keeps
+    up to ``pool_size`` connections per host. Async requests use one
+    ``httpx.AsyncClient`` per event loop that keeps as many alive. Neither
+    caps requests in flight: busier moments open extra connections, which
+    are closed afterwards. ``max_connections`` sets a hard cap for async
+    clients if one is wanted. Connections
+    idle for longer than ``idle_timeout`` seconds are dropped, but never
+    while a request holds the session through ``checkout``. Requests go
+    through ``transport`` (the network by default).
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        idle_timeout: float = 60.0,
+        transport: Optional[Transport] = None,
+        max_connections: Optional[int] = None,
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        if max_connections is not None and max_connections < pool_size:
+            raise ValueError("max_connections must be at least pool_size")
+
+        self.pool_size = pool_size
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.transport = transport or Transport()
+        self._lock = threading.Lock()
+        self._session: Optional["requests.Session"] = None
+        self._last_used = 0.0
+        self._in_flight = 0
+        self._async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def session(self) -> "requests.Session":
+        """Return the shared session, replacing it if it has been idle too long.
+
+        The session is not held: prefer ``checkout`` for a request, so that
+        idle eviction can't close it while the request runs.
+        """
+        with self._lock:
+            return self._current_session()
+
+    @contextmanager
+    def checkout(self) -> Iterator["requests.Session"]:
+        """The shared session, held open until the block exits."""
+        with self._lock:
+            session = self._current_session()
+            self._in_flight += 1
+        try:
+            yield session
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._last_used = time.monotonic()
+
+    def async_client(self) -> "httpx.AsyncClient":
+        """Return the shared async client for the running event loop."""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                limits = httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.idle_timeout,
+                )
+                client = httpx.AsyncClient(
+                    transport=self.transport.async_transport(limits)
+                )
+                self._async_clients[loop] = client
+            return client
+
+    def close(self) -> None:
+        """Close the sync session. Async clients are closed with ``aclose``."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    async def aclose(self) -> None:
+        """Close the async client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def _current_session(self) -> "requests.Session":
+        # Called with the lock held.
+        now = time.monotonic()
+        idle = now - self._last_used > self.idle_timeout
+        if self._session is not None and idle and not self._in_flight:
+            self._session.close()
+            self._session = None
+        if self._session is None:
+            self._session = self._new_session()
+        self._last_used = now
+        return self._session
+
+    def _new_session(self) -> "requests.Session":
+        # HTTP clients are imported on first use to keep package import cheap.
+        import requests
+
+        session = requests.Session()
+        adapter = self.transport.adapter(self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+
+_default_pool: Optional[ConnectionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> ConnectionPool:
+    """Return the process-wide pool shared by backends created without one."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+        return _default_pool
+
+
+def set_default_pool(pool: ConnectionPool) -> None:
+    """Replace the process-wide pool, e.g. to change its size."""
+    global _default_pool
+    with _default_pool_lock:
+        _default_pool = pool
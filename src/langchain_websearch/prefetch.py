@@ -0,0 +1,186 @@
+"""
+Keeping frequently searched queries warm in the cache.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class CountMinSketch:
+    """Approximate frequency counts in fixed memory.
+
+    ``depth`` rows of ``width`` counters; an item's estimate is the smallest
+    of its counters, so it never undercounts and overcounts by at most about
+    ``2 / width`` of the total with high probability.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive")
+        self.width = width
+        self.depth = depth
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def add(self, item: Hashable, count: int = 1) -> int:
+        """Count ``item`` and return its new estimate."""
+        counts = []
+        for row, column in zip(self._rows, self._columns(item)):
+            row[column] += count
+            counts.append(row[column])
+        return min(counts)
+
+    def estimate(self, item: Hashable) -> int:
+        return min(row[c] for row, c in zip(self._rows, self._columns(item)))
+
+    def decay(self) -> None:
+        """Halve every counter so that old popularity fades."""
+        for row in self._rows:
+            row[:] = [count >> 1 for count in row]
+
+    def _columns(self, item: Hashable) -> List[int]:
+        # Double hashing: two independent 64-bit hashes give every row's
+        # column. ``hash`` is salted per process, so use a stable digest.
+        digest = hashlib.blake2b(repr(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+
+class Prefetcher:
+    """Refresh the ``top_n`` most searched queries before they expire.
+
+    A backend given a prefetcher records every search it serves. Every
+    ``interval`` seconds a daemon thread refreshes the hottest searches that
+    have not been fetched from the API for ``refresh_after`` seconds, which
+    should be a little below the cache TTL. At most ``budget`` refreshes are
+    made per ``window`` seconds; once per window the counts are halved so
+    that queries that stop being searched drop out.
+
+    The thread starts on the first recorded search; ``run_once`` does one
+    round synchronously, e.g. from an existing scheduler.
+    """
+
+    def __init__(
+        self,
+        top_n: int = 20,
+        budget: int = 100,
+        window: float = 3600.0,
+        interval: float = 30.0,
+        refresh_after: float = 240.0,
+        width: int = 2048,
+        depth: int = 4,
+    ):
+        if top_n < 1 or budget < 1:
+            raise ValueError("top_n and budget must be positive")
+        self.top_n = top_n
+        self.budget = budget
+        self.window = window
+        self.interval = interval
+        self.refresh_after = refresh_after
+        self.sketch = CountMinSketch(width, depth)
+        self.prefetched = 0
+        self.errors = 0
+        self._candidates: Dict[Hashable, int] = {}
+        self._fetched_at: Dict[Hashable, float] = {}
+        self._refresh: Optional[Callable[[Any], None]] = None
+        self._spent = 0
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def bind(self, refresh: Callable[[Any], None]) -> None:
+        """Use ``refresh(entry)`` to fetch a recorded search again."""
+        self._refresh = refresh
+
+    def record(self, entry: Hashable) -> None:
+        """Count one search for ``entry``."""
+        with self._lock:
+            estimate = self.sketch.add(entry)
+            self._candidates[entry] = estimate
+            # Keep a few times top_n candidates so that rising queries can
+            # overtake the current top without tracking every query seen.
+            if len(self._candidates) > self.top_n * 4:
+                cutoff = sorted(self._candidates.values())[-self.top_n * 2]
+                self._candidates = {
+                    e: n for e, n in self._candidates.items() if n >= cutoff
+                }
+                self._fetched_at = {
+                    e: t for e, t in self._fetched_at.items() if e in self._candidates
+                }
+        if self._thread is None and self._refresh and not self._stop.is_set():
+            self.start()
+
+    def fetched(self, entry: Hashable) -> None:
+        """Note that ``entry`` was just fetched from the API."""
+        with self._lock:
+            if entry in self._candidates:
+                self._fetched_at[entry] = time.monotonic()
+
+    def hot(self) -> List[Hashable]:
+        """The ``top_n`` most searched entries, most searched first."""
+        with self._lock:
+            ranked = sorted(self._candidates.items(), key=lambda item: -item[1])
+        return [entry for entry, _ in ranked[: self.top_n]]
+
+    def run_once(self) -> int:
+        """Refresh due hot entries within the budget; returns how many."""
+        if self._refresh is None:
+            return 0
+        self._roll_window()
+        refreshed = 0
+        for entry in self.hot():
+            with self._lock:
+                fetched_at = self._fetched_at.get(entry)
+                if fetched_at is not None:
+                    if time.monotonic() - fetched_at < self.refresh_after:
+                        continue
+                if self._spent >= self.budget:
+                    break
+                self._spent += 1
+            try:
+                self._refresh(entry)
+            except Exception:
+                # The cached entry stays until a search or the next round
+                # replaces it.
+                self.errors += 1
+                continue
+            self.fetched(entry)
+            self.prefetched += 1
+            refreshed += 1
+        return refreshed
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="querit-prefetch", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def _roll_window(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start < self.window:
+                return
+            self._window_start = now
+            self._spent = 0
+            self.sketch.decay()
+            self._candidates = {
+                e: n >> 1 for e, n in self._candidates.items() if n >> 1
+            }
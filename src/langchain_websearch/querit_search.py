@@ -2,60 +2,949 @@
 Querit Search backend implementation.
 """
 
+import asyncio
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import httpx
 import requests
-from typing import List, Optional
 
-from .core import SearchResult
+from .backend import BatchSearchMixin
+from .cache import SearchCache
+from .codec import JsonLoads, accept_encoding, get_decoder, wire_bytes
+from .core import AnyResult, CompactResult, SearchResult
+from .hedge import HedgeLeg, HedgePolicy
+from .instrumentation import MetricsSink, combine, record_error, stage
+from .keys import KeyPool
+from .limiter import AdaptiveLimiter
+from .pool import ConnectionPool, Transport, get_default_pool
+from .prefetch import Prefetcher
+from .ratelimit import TokenBucket
+from .retry import RetryPolicy, RetryStats
+from .singleflight import SingleFlight
+from .streaming import ResultStreamParser
+
+# Shared by all backends, so that agents with separate tools still send one
+# request for a search they all make at once.
+_flights = SingleFlight()
+
+
+class QueritSearchBackend(BatchSearchMixin):
+    """Querit Search API backend.
+
+    Results are validated ``SearchResult`` models unless ``fast_results`` is
+    set, in which case they are ``CompactResult`` tuples built without
+    validation.
+
+    Requests use ``api_key``, or a key from ``key_pool`` when one is given.
+    Without either, ``QUERIT_API_KEYS`` (comma-separated) builds a pool and
+    ``QUERIT_API_KEY`` supplies a single key.
+
+    Responses are requested compressed (Brotli too when it is installed) and
+    decoded with ``json_decoder``: ``"auto"`` (orjson when installed),
+    ``"orjson"``, ``"json"`` or any function taking the body bytes.
 
+    ``transport`` gives the backend its own pool sending through that
+    transport, e.g. a ``ReplayTransport`` to serve recorded traffic offline.
 
-class QueritSearchBackend:
-    """Querit Search API backend."""
+    When ``cache`` returns a stale entry (see ``InMemoryCache.stale_ttl``)
+    the search is answered from it and the entry is refreshed in a
+    background thread. ``prefetch`` keeps the most searched queries in
+    ``cache`` fresh ahead of time.
+
+    ``limiter`` caps requests in flight, across the sync, async and batch
+    paths, at a limit adapted to observed latency and overload errors.
+    Streamed searches hold their slot only until the response headers
+    arrive, not while the body is read.
+    """
 
     BASE_URL = "https://api.querit.ai/v1/search"
+    TIMEOUT = 30
+    PAGE_SIZE = 10
+    CHUNK_SIZE = 8192
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool: Optional[ConnectionPool] = None,
+        cache: Optional[SearchCache] = None,
+        coalesce: bool = True,
+        rate_limiter: Optional[TokenBucket] = None,
+        retry: Optional[RetryPolicy] = None,
+        fast_results: bool = False,
+        base_url: Optional[str] = None,
+        metrics: Optional[MetricsSink] = None,
+        hedge: Optional[HedgePolicy] = None,
+        key_pool: Optional[KeyPool] = None,
+        json_decoder: Union[str, JsonLoads] = "auto",
+        transport: Optional[Transport] = None,
+        prefetch: Optional[Prefetcher] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        if pool is not None and transport is not None:
+            raise ValueError("Pass either pool or transport, not both")
+        if prefetch is not None and cache is None:
+            raise ValueError("prefetch needs a cache to keep warm")
+        if key_pool is None and api_key is None:
+            key_pool = KeyPool.from_env()
+        self.key_pool = key_pool
         self.api_key = api_key or os.getenv("QUERIT_API_KEY")
+        self.base_url = base_url or os.getenv("QUERIT_BASE_URL") or self.BASE_URL
+        if transport is not None:
+            pool = ConnectionPool(transport=transport)
+        self.pool = pool or get_default_pool()
+        self.cache = cache
+        self.coalesce = coalesce
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        self.stats = RetryStats()
+        self.fast_results = fast_results
+        self.metrics = metrics
+        self.hedge = hedge
+        self.json_decoder = json_decoder
+        self._loads = (
+            json_decoder if callable(json_decoder) else get_decoder(json_decoder)
+        )
+        self.prefetch = prefetch
+        self.limiter = limiter
+        if limiter is not None and limiter.metrics is None:
+            limiter.metrics = metrics
+        if prefetch is not None:
+            prefetch.bind(self._prefetch)
+        self._lock = threading.Lock()
+        self._revalidating: Set[str] = set()
+        self._background: Optional[ThreadPoolExecutor] = None
 
     def validate_credentials(self) -> bool:
         """Validate Querit API credentials."""
-        return bool(self.api_key)
+        return self.key_pool is not None or bool(self.api_key)
+
+    def search(
+        self,
+        query: str,
+        num_results: int = 10,
+        metrics: Optional[MetricsSink] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> List[AnyResult]:
+        """Perform search using Querit Search API.
+
+        ``metrics`` receives this call's events in addition to the backend's
+        own sink. ``timeout`` is this call's deadline in seconds, covering
+        every page, retry and wait; it defaults to ``retry.deadline``.
+        """
+        sink = combine(self.metrics, metrics)
+        expires_at = self._expires_at(timeout)
+        with stage(sink, "search"):
+            try:
+                return self._search(query, num_results, kwargs, sink, expires_at)
+            except Exception as e:
+                record_error(sink, e)
+                raise
+
+    async def asearch(
+        self,
+        query: str,
+        num_results: int = 10,
+        metrics: Optional[MetricsSink] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> List[AnyResult]:
+        """Perform search using Querit Search API without blocking the event loop.
+
+        Unlike the sync path, where only each socket operation is bounded, the
+        whole call is cancelled once its deadline passes.
+        """
+        sink = combine(self.metrics, metrics)
+        expires_at = self._expires_at(timeout)
+        with stage(sink, "search"):
+            try:
+                search = self._asearch(query, num_results, kwargs, sink, expires_at)
+                if expires_at is None:
+                    return await search
+                try:
+                    return await asyncio.wait_for(search, self._remaining(expires_at))
+                except asyncio.TimeoutError:
+                    raise TimeoutError("Search deadline exceeded") from None
+            except Exception as e:
+                record_error(sink, e)
+                raise
+
+    def _search(
+        self,
+        query: str,
+        num_results: int,
+        params: Dict[str, Any],
+        sink: Optional[MetricsSink],
+        expires_at: Optional[float],
+    ) -> List[AnyResult]:
+        self._check_credentials()
+
+        key = self._cache_key(query, num_results, params)
+        if key is not None:
+            if self.prefetch is not None:
+                self.prefetch.record(_prefetch_entry(query, num_results, params))
+            cached = self._cache_get(key, sink, query, num_results, params)
+            if cached is not None:
+                return cached
+
+        def load() -> List[AnyResult]:
+            results = self._fetch(query, num_results, sink, expires_at)
+            if key is not None:
+                self._cache_set(key, results, query, num_results, params)
+            return results
+
+        if not self.coalesce:
+            return load()
+        flight_key = self._flight_key(query, num_results, params)
+        return list(_flights.do(flight_key, load, self._remaining(expires_at)))
+
+    async def _asearch(
+        self,
+        query: str,
+        num_results: int,
+        params: Dict[str, Any],
+        sink: Optional[MetricsSink],
+        expires_at: Optional[float],
+    ) -> List[AnyResult]:
+        self._check_credentials()
+
+        key = self._cache_key(query, num_results, params)
+        if key is not None:
+            if self.prefetch is not None:
+                self.prefetch.record(_prefetch_entry(query, num_results, params))
+            cached = self._cache_get(key, sink, query, num_results, params)
+            if cached is not None:
+                return cached
+
+        async def load() -> List[AnyResult]:
+            results = await self._afetch(query, num_results, sink, expires_at)
+            if key is not None:
+                self._cache_set(key, results, query, num_results, params)
+            return results
+
+        if not self.coalesce:
+            return await load()
+        flight_key = self._flight_key(query, num_results, params)
+        return list(await _flights.ado(flight_key, load))
+
+    def iter_search(
+        self, query: str, num_results: int = 10, **kwargs
+    ) -> Iterator[AnyResult]:
+        """Yield results as they are decoded from the response stream.
+
+        Pages are requested one after another and results already seen on an
+        earlier page are skipped. Stops reading once ``num_results`` results
+        have been produced. Streamed searches are not coalesced; the cache is
+        read, and filled only when the caller consumes every result.
+        """
+        self._check_credentials()
+
+        cache = self.cache
+        if cache is not None:
+            key = cache.make_key(query, num_results, kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                cached = self._as_configured(cached)
+                yield from cached
+                return
+
+        collector = _ResultCollector(self, num_results)
+        for count, offset in self._pages(num_results):
+            received = 0
+            parser = ResultStreamParser()
+            payload = self._build_payload(query, count, offset)
+            response = self._send(
+                payload, self._expires_at(), self.metrics, stream=True
+            )
+            try:
+                for chunk in self._iter_chunks(response):
+                    for item in parser.feed(chunk):
+                        received += 1
+                        result = collector.add(item)
+                        if result is not None:
+                            yield result
+                        if collector.full:
+                            break
+                    if parser.done or collector.full:
+                        break
+                else:
+                    parser.close()
+            finally:
+                response.close()
+
+            if collector.full or received < count:
+                break
+
+        if cache is not None:
+            cache.set(key, collector.results)
+
+    async def aiter_search(
+        self, query: str, num_results: int = 10, **kwargs
+    ) -> AsyncIterator[AnyResult]:
+        """Async version of ``iter_search``."""
+        self._check_credentials()
+
+        cache = self.cache
+        if cache is not None:
+            key = cache.make_key(query, num_results, kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                cached = self._as_configured(cached)
+                for hit in cached:
+                    yield hit
+                return
+
+        collector = _ResultCollector(self, num_results)
+        for count, offset in self._pages(num_results):
+            received = 0
+            parser = ResultStreamParser()
+            payload = self._build_payload(query, count, offset)
+            response = await self._asend(
+                payload, self._expires_at(), self.metrics, stream=True
+            )
+            try:
+                async for chunk in response.aiter_bytes():
+                    for item in parser.feed(chunk):
+                        received += 1
+                        result = collector.add(item)
+                        if result is not None:
+                            yield result
+                        if collector.full:
+                            break
+                    if parser.done or collector.full:
+                        break
+                else:
+                    parser.close()
+            finally:
+                await response.aclose()
+
+            if collector.full or received < count:
+                break
+
+        if cache is not None:
+            cache.set(key, collector.results)
+
+    def _iter_chunks(self, response: requests.Response) -> Iterator[bytes]:
+        # iter_content blocks until a full chunk arrives; read1 on urllib3 2.x
+        # returns whatever is already available instead.
+        read1 = getattr(response.raw, "read1", None)
+        if read1 is None:
+            yield from response.iter_content(chunk_size=self.CHUNK_SIZE)
+            return
+        while True:
+            chunk = read1(self.CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+
+    def _fetch(
+        self,
+        query: str,
+        num_results: int,
+        sink: Optional[MetricsSink] = None,
+        expires_at: Optional[float] = None,
+    ) -> List[AnyResult]:
+        payloads = [
+            self._build_payload(query, count, offset)
+            for count, offset in self._pages(num_results)
+        ]
+
+        def fetch_page(payload: Dict[str, Any]) -> Dict[str, Any]:
+            return self._decode(self._send(payload, expires_at, sink), sink)
+
+        if len(payloads) == 1:
+            pages = [fetch_page(payloads[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+                pages = list(executor.map(fetch_page, payloads))
+
+        return self._parse_pages(pages, num_results, sink)
+
+    async def _afetch(
+        self,
+        query: str,
+        num_results: int,
+        sink: Optional[MetricsSink] = None,
+        expires_at: Optional[float] = None,
+    ) -> List[AnyResult]:
+        responses = await asyncio.gather(
+            *(
+                self._asend(self._build_payload(query, count, offset), expires_at, sink)
+                for count, offset in self._pages(num_results)
+            )
+        )
+        pages = [self._decode(response, sink) for response in responses]
+        return self._parse_pages(pages, num_results, sink)
+
+    def _decode(self, response: Any, sink: Optional[MetricsSink]) -> Dict[str, Any]:
+        content = response.content
+        if sink is not None:
+            sink.observe("response_bytes", len(content))
+            wire = wire_bytes(response)
+            if wire is not None:
+                sink.observe("wire_bytes", wire)
+        with stage(sink, "decode"):
+            return self._loads(content)
+
+    def _parse_pages(
+        self,
+        pages: List[Dict[str, Any]],
+        num_results: int,
+        sink: Optional[MetricsSink],
+    ) -> List[AnyResult]:
+        with stage(sink, "parse"):
+            results = self._parse_results(pages, num_results)
+        if sink is not None:
+            sink.observe("results", len(results))
+        return results
+
+    def _pages(self, num_results: int) -> List[Tuple[int, int]]:
+        """Split ``num_results`` into ``(count, offset)`` page requests."""
+        return [
+            (min(self.PAGE_SIZE, num_results - offset), offset)
+            for offset in range(0, num_results, self.PAGE_SIZE)
+        ]
+
+    def _send(
+        self,
+        payload: Dict[str, Any],
+        expires_at: Optional[float],
+        sink: Optional[MetricsSink] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """POST ``payload``, applying rate limiting, hedging and retries.
+
+        Unless ``stream`` is set the body is read here, so that failures while
+        reading it are retried too. Streamed requests are never hedged.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                with stage(sink, "throttle"):
+                    acquired = self.rate_limiter.acquire(
+                        timeout=self._remaining(expires_at)
+                    )
+                if not acquired:
+                    raise TimeoutError("Rate limit wait exceeds the search deadline")
+            try:
+                if self.hedge is None or stream:
+                    return self._limited_post(payload, expires_at, sink, stream)
+                return self.hedge.call(
+                    lambda leg: self._limited_post(
+                        payload, expires_at, sink, stream, leg
+                    ),
+                    lambda: self._can_hedge(sink),
+                )
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, expires_at, sink)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    def _limited_post(
+        self,
+        payload: Dict[str, Any],
+        expires_at: Optional[float],
+        sink: Optional[MetricsSink],
+        stream: bool,
+        leg: Optional[HedgeLeg] = None,
+    ) -> requests.Response:
+        """``_post`` holding a slot from ``limiter`` for the attempt.
+
+        A hedge ``leg`` that loses gives its slot back straight away.
+        """
+        limiter = self.limiter
+        if limiter is None:
+            return self._post(payload, expires_at, sink, stream, leg)
+        with stage(sink, "throttle"):
+            acquired = limiter.acquire(timeout=self._remaining(expires_at))
+        if not acquired:
+            raise TimeoutError("Concurrency limit wait exceeds the search deadline")
+        slot = _Slot(limiter, self.retry)
+        if leg is not None:
+            leg.on_cancel(slot.abandon)
+        try:
+            response = self._post(payload, expires_at, sink, stream, leg)
+        except BaseException as e:
+            slot.release(e)
+            raise
+        slot.release()
+        return response
+
+    def _post(
+        self,
+        payload: Dict[str, Any],
+        expires_at: Optional[float],
+        sink: Optional[MetricsSink],
+        stream: bool,
+        leg: Optional[HedgeLeg] = None,
+    ) -> requests.Response:
+        if leg is not None:
+            leg.check()
+        key = self._take_key(expires_at, sink)
+        with self.pool.checkout() as session:
+            with stage(sink, "request"):
+                response = session.post(
+                    self.base_url,
+                    headers=self._build_headers(key),
+                    json=payload,
+                    timeout=self._attempt_timeout(expires_at),
+                    stream=True,
+                )
+            if self.key_pool is not None and key is not None:
+                self.key_pool.record(key, response.status_code, response.headers)
+            if not response.ok:
+                response.close()
+            response.raise_for_status()
+            if leg is not None and leg.cancelled:
+                # Lost the race: don't spend time reading a body nobody wants.
+                response.close()
+                leg.check()
+            if not stream:
+                with stage(sink, "read"):
+                    response.content  # loads and caches the body
+        return response
+
+    async def _asend(
+        self,
+        payload: Dict[str, Any],
+        expires_at: Optional[float],
+        sink: Optional[MetricsSink] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """Async version of ``_send``."""
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                with stage(sink, "throttle"):
+                    acquired = await self.rate_limiter.aacquire(
+                        timeout=self._remaining(expires_at)
+                    )
+                if not acquired:
+                    raise TimeoutError("Rate limit wait exceeds the search deadline")
+            try:
+                if self.hedge is None or stream:
+                    return await self._alimited_post(payload, expires_at, sink, stream)
+                return await self.hedge.acall(
+                    lambda: self._alimited_post(payload, expires_at, sink, stream),
+                    lambda: self._can_hedge(sink),
+                )
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, expires_at, sink)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _alimited_post(
+        self,
+        payload: Dict[str, Any],
+        expires_at: Optional[float],
+        sink: Optional[MetricsSink],
+        stream: bool,
+    ) -> httpx.Response:
+        """Async version of ``_limited_post``."""
+        limiter = self.limiter
+        if limiter is None:
+            return await self._apost(payload, expires_at, sink, stream)
+        with stage(sink, "throttle"):
+            acquired = await limiter.aacquire(timeout=self._remaining(expires_at))
+        if not acquired:
+            raise TimeoutError("Concurrency limit wait exceeds the search deadline")
+        slot = _Slot(limiter, self.retry)
+        try:
+            response = await self._apost(payload, expires_at, sink, stream)
+        except BaseException as e:
+            # Includes cancellation, e.g. of the losing hedge leg.
+            slot.release(e)
+            raise
+        slot.release()
+        return response
+
+    async def _apost(
+        self,
+        payload: Dict[str, Any],
+        expires_at: Optional[float],
+        sink: Optional[MetricsSink],
+        stream: bool,
+    ) -> httpx.Response:
+        key = await self._atake_key(expires_at, sink)
+        client = self.pool.async_client()
+        request = client.build_request(
+            "POST",
+            self.base_url,
+            headers=self._build_headers(key),
+            json=payload,
+            timeout=self._attempt_timeout(expires_at),
+            extensions={} if sink is None else {"trace": _connect_trace(sink)},
+        )
+        with stage(sink, "request"):
+            response = await client.send(request, stream=True)
+        if self.key_pool is not None and key is not None:
+            self.key_pool.record(key, response.status_code, response.headers)
+        if response.is_error:
+            await response.aclose()
+        response.raise_for_status()
+        if not stream:
+            with stage(sink, "read"):
+                await response.aread()
+        return response
+
+    def _take_key(
+        self, expires_at: Optional[float], sink: Optional[MetricsSink]
+    ) -> Optional[str]:
+        if self.key_pool is None:
+            return self.api_key
+        with stage(sink, "throttle"):
+            key = self.key_pool.acquire(timeout=self._remaining(expires_at))
+        if key is None:
+            raise TimeoutError("No API key is free before the search deadline")
+        return key
+
+    async def _atake_key(
+        self, expires_at: Optional[float], sink: Optional[MetricsSink]
+    ) -> Optional[str]:
+        if self.key_pool is None:
+            return self.api_key
+        with stage(sink, "throttle"):
+            key = await self.key_pool.aacquire(timeout=self._remaining(expires_at))
+        if key is None:
+            raise TimeoutError("No API key is free before the search deadline")
+        return key
+
+    def _can_hedge(self, sink: Optional[MetricsSink]) -> bool:
+        # A hedge is a real request: it must not wait for, or overdraw, the
+        # rate limit.
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=0):
+            return False
+        if sink is not None:
+            sink.increment("hedge")
+        return True
+
+    def _expires_at(self, timeout: Optional[float] = None) -> Optional[float]:
+        deadline = self.retry.deadline if timeout is None else timeout
+        if deadline is None:
+            return None
+        return time.monotonic() + deadline
+
+    def _remaining(self, expires_at: Optional[float]) -> Optional[float]:
+        if expires_at is None:
+            return None
+        return max(0.0, expires_at - time.monotonic())
+
+    def _attempt_timeout(self, expires_at: Optional[float]) -> float:
+        remaining = self._remaining(expires_at)
+        if remaining is None:
+            return self.TIMEOUT
+        if remaining <= 0:
+            raise TimeoutError("Search deadline exceeded")
+        return min(self.TIMEOUT, remaining)
+
+    def _retry_delay(
+        self,
+        error: Exception,
+        attempt: int,
+        expires_at: Optional[float],
+        sink: Optional[MetricsSink] = None,
+    ) -> Optional[float]:
+        """Seconds to sleep before the next attempt, or None to give up."""
+        rate_limited = (
+            getattr(getattr(error, "response", None), "status_code", None) == 429
+        )
+        if rate_limited:
+            self.stats.incr("rate_limited")
+
+        if attempt + 1 >= self.retry.max_attempts or not self.retry.is_retryable(error):
+            return None
+
+        if rate_limited and self.key_pool is not None and self.key_pool.available():
+            # The limited key is benched; another one can retry right away.
+            delay = 0.0
+        else:
+            delay = self.retry.backoff(attempt, error)
+        remaining = self._remaining(expires_at)
+        if remaining is not None and delay >= remaining:
+            return None
+
+        self.stats.incr("retried")
+        if sink is not None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+            sink.increment("retry", tags={"reason": status or type(error).__name__})
+        return delay
+
+    def _cache_get(
+        self,
+        key: str,
+        sink: Optional[MetricsSink],
+        query: str,
+        num_results: int,
+        params: Dict[str, Any],
+    ) -> Optional[List[AnyResult]]:
+        cache = self.cache
+        if cache is None:
+            return None
+        entry = cache.lookup(key)
+        if sink is not None:
+            sink.increment("cache_miss" if entry is None else "cache_hit")
+        if entry is None:
+            return None
+        if entry.stale:
+            if sink is not None:
+                sink.increment("cache_stale")
+            self._revalidate(key, query, num_results, params)
+        return self._as_configured(entry.results)
+
+    def _as_configured(self, results: List[Any]) -> List[AnyResult]:
+        """``results`` as the result type this backend is configured for.
+
+        A cache shared with a differently configured backend, or persisted
+        by one, may hold the other type.
+        """
+        if self.fast_results:
+            return [
+                r if isinstance(r, CompactResult) else CompactResult(*_fields(r))
+                for r in results
+            ]
+        return [r.to_model() if isinstance(r, CompactResult) else r for r in results]
+
+    def _cache_set(
+        self,
+        key: str,
+        results: List[AnyResult],
+        query: str,
+        num_results: int,
+        params: Dict[str, Any],
+    ) -> None:
+        cache = self.cache
+        if cache is None:
+            return
+        cache.set(key, results)
+        if self.prefetch is not None:
+            self.prefetch.fetched(_prefetch_entry(query, num_results, params))
+
+    def _revalidate(
+        self, key: str, query: str, num_results: int, params: Dict[str, Any]
+    ) -> None:
+        """Refresh a stale cache entry in the background, once per key."""
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            if self._background is None:
+                self._background = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="querit-revalidate"
+                )
+        self._background.submit(self._refresh, key, query, num_results, params)
+
+    def _refresh(
+        self, key: str, query: str, num_results: int, params: Dict[str, Any]
+    ) -> None:
+        try:
+            results = self._fetch(query, num_results, self.metrics, self._expires_at())
+            self._cache_set(key, results, query, num_results, params)
+            if self.metrics is not None:
+                self.metrics.increment("revalidate")
+        except Exception as e:
+            # The stale entry keeps being served until it ages out.
+            record_error(self.metrics, e)
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _prefetch(self, entry: Tuple[str, int, str]) -> None:
+        cache = self.cache
+        if cache is None:
+            return
+        query, num_results, params_json = entry
+        params = json.loads(params_json)
+        results = self._fetch(query, num_results, self.metrics, self._expires_at())
+        cache.set(cache.make_key(query, num_results, params), results)
+        if self.metrics is not None:
+            self.metrics.increment("prefetch")
 
-    def search(self, query: str, num_results: int = 10, **kwargs) -> List[SearchResult]:
-        """Perform search using Querit Search API."""
+    def _cache_key(
+        self, query: str, num_results: int, params: Dict[str, Any]
+    ) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(query, num_results, params)
+
+    def _flight_key(self, query: str, num_results: int, params: Dict[str, Any]) -> str:
+        # Flights are shared by every backend in the process, so the key also
+        # names whatever makes one backend's results unfit for another: the
+        # pool (and with it the transport), the cache and the result type.
+        return json.dumps(
+            [
+                self.base_url,
+                self.api_key,
+                id(self.key_pool),
+                id(self.pool),
+                id(self.cache),
+                self.fast_results,
+                query,
+                num_results,
+                params,
+            ],
+            sort_keys=True,
+        )
+
+    def _check_credentials(self) -> None:
         if not self.validate_credentials():
             raise ValueError(
                 "Querit API key not found. "
                 "Please set QUERIT_API_KEY environment variable."
             )
 
-        headers = {
+    def _build_headers(self, api_key: Optional[str]) -> Dict[str, str]:
+        return {
             "Accept": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
+            "Accept-Encoding": accept_encoding(),
+            "Authorization": f"Bearer {api_key}",
         }
 
-        payload = {"query": query}
+    def _build_payload(self, query: str, count: int, offset: int = 0) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"query": query, "count": count}
+        if offset:
+            payload["offset"] = offset
+        return payload
+
+    def _parse_results(
+        self, pages: List[Dict[str, Any]], num_results: int
+    ) -> List[AnyResult]:
+        collector = _ResultCollector(self, num_results)
 
-        response = requests.post(
-            self.BASE_URL, headers=headers, json=payload, timeout=30
+        for data in pages:
+            if "results" in data and "result" in data["results"]:
+                for item in data["results"]["result"]:
+                    collector.add(item)
+                    if collector.full:
+                        # Ensure we return only requested number of results
+                        return collector.results
+
+        return collector.results
+
+    def _to_result(self, item: Dict[str, Any], position: int) -> AnyResult:
+        if self.fast_results:
+            # Trusted path: decoded JSON goes straight into the tuple.
+            return CompactResult(
+                item.get("title", ""),
+                item.get("url", ""),
+                item.get("snippet", ""),
+                item.get("site_name", ""),
+                position,
+            )
+        return SearchResult(
+            title=item.get("title", ""),
+            link=item.get("url", ""),
+            snippet=item.get("snippet", ""),
+            display_link=item.get("site_name", ""),
+            position=position,
         )
-        response.raise_for_status()
 
-        data = response.json()
 
-        results = []
+def _prefetch_entry(
+    query: str, num_results: int, params: Dict[str, Any]
+) -> Tuple[str, int, str]:
+    return (query, num_results, json.dumps(params, sort_keys=True))
 
-        if "results" in data and "result" in data["results"]:
-            for i, item in enumerate(data["results"]["result"]):
-                result = SearchResult(
-                    title=item.get("title", ""),
-                    link=item.get("url", ""),
-                    snippet=item.get("snippet", ""),
-                    display_link=item.get("site_name", ""),
-                    position=i + 1,
-                )
-                results.append(result)
 
-        return results[
-            :num_results
-        ]  # Ensure we return only requested number of results
+def _connect_trace(sink: MetricsSink) -> Any:
+    """httpx trace hook timing new TCP connections and TLS handshakes."""
+    started: Dict[str, float] = {}
+    stages = {"connection.connect_tcp": "connect", "connection.start_tls": "tls"}
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        step, _, phase = event_name.rpartition(".")
+        if step not in stages:
+            return
+        if phase == "started":
+            started[step] = time.perf_counter()
+        elif phase == "complete" and step in started:
+            sink.timing(stages[step], time.perf_counter() - started.pop(step))
+
+    return trace
+
+
+def _fields(result: Any) -> Tuple[str, str, str, str, int]:
+    return (
+        result.title,
+        result.link,
+        result.snippet,
+        result.display_link,
+        result.position,
+    )
+
+
+class _Slot:
+    """A slot taken from an ``AdaptiveLimiter``, given back exactly once."""
+
+    def __init__(self, limiter: AdaptiveLimiter, retry: RetryPolicy):
+        self._limiter = limiter
+        self._retry = retry
+        self._start = time.perf_counter()
+        self._held = True
+        self._lock = threading.Lock()
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        # Overload errors shrink the limit; other failures say nothing about
+        # load, so they only free the slot.
+        if not self._give_back():
+            return
+        latency = time.perf_counter() - self._start
+        if error is None:
+            self._limiter.release(latency)
+        elif isinstance(error, Exception) and self._retry.is_retryable(error):
+            self._limiter.release(latency, dropped=True)
+        else:
+            self._limiter.release(None)
+
+    def abandon(self) -> None:
+        """Free the slot without adapting, for a request nobody waits for."""
+        if self._give_back():
+            self._limiter.release(None)
+
+    def _give_back(self) -> bool:
+        with self._lock:
+            held, self._held = self._held, False
+        return held
+
+
+class _ResultCollector:
+    """Build positioned results from raw items, skipping repeated URLs."""
+
+    def __init__(self, backend: QueritSearchBackend, num_results: int):
+        self.results: List[AnyResult] = []
+        self._backend = backend
+        self._num_results = num_results
+        self._seen: Set[str] = set()
+
+    @property
+    def full(self) -> bool:
+        return len(self.results) >= self._num_results
+
+    def add(self, item: Dict[str, Any]) -> Optional[AnyResult]:
+        url = item.get("url", "")
+        if url:
+            if url in self._seen:
+                return None
+            self._seen.add(url)
+
+        result = self._backend._to_result(item, len(self.results) + 1)
+        self.results.append(result)
+        return result
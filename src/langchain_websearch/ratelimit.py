@@ -0,0 +1,70 @@
+"""
+Client-side rate limiting for Querit requests.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by threads and async tasks.
+
+    Tokens refill at ``rate`` per second up to ``capacity``. Acquiring reserves
+    a token up front and then sleeps until it becomes available, so sync and
+    async callers draw from the same budget and the lock is never held while
+    waiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.throttled = 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until ``tokens`` are available.
+
+        Returns False without consuming anything if that would take longer
+        than ``timeout`` seconds.
+        """
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(
+        self, tokens: float = 1.0, timeout: Optional[float] = None
+    ) -> bool:
+        """Async version of ``acquire``."""
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def _reserve(self, tokens: float, timeout: Optional[float]) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return None
+
+            self._tokens -= tokens
+            if wait > 0:
+                self.throttled += 1
+            return wait
@@ -0,0 +1,373 @@
+"""
+Recording HTTP traffic to an archive and replaying it offline.
+"""
+
+import asyncio
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+from .pool import Transport
+
+MAGIC = b"QRPL\x01"
+
+# Per record: metadata length, body length, HTTP status, latency in seconds.
+_HEADER = struct.Struct("<IIHd")
+
+# Response headers that describe the original transfer rather than the body
+# as stored (which is already decompressed).
+_TRANSFER_HEADERS = frozenset(
+    ["content-encoding", "content-length", "transfer-encoding", "connection"]
+)
+
+
+class ReplayMiss(LookupError):
+    """A replayed request has no recorded response."""
+
+
+class Exchange(NamedTuple):
+    """One recorded request and its response."""
+
+    key: str
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    latency: float
+
+    @property
+    def request(self) -> Dict[str, Any]:
+        """Method, path and decoded JSON body of the recorded request."""
+        method, path, body = json.loads(self.key)
+        return {"method": method, "path": path, "body": body}
+
+
+class TrafficArchive:
+    """Append-only file of request/response pairs.
+
+    Each record is a fixed binary header followed by a small JSON header
+    block and the response body, so a file is written with one ``write`` per
+    exchange and read back through ``mmap`` without loading bodies up front.
+    Requests are keyed on method, path and JSON body; API keys and the host
+    are not stored, so an archive recorded against one endpoint replays
+    against any other. Repeated requests replay their responses in recorded
+    order, starting over after the last one.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._file: Optional[io.BufferedWriter] = None
+        self._map: Optional[mmap.mmap] = None
+        self._index: Optional[Dict[str, List[int]]] = None
+        self._cursors: Dict[str, int] = {}
+
+    def append(
+        self,
+        key: str,
+        status: int,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        latency: float,
+    ) -> None:
+        """Add one exchange to the end of the archive."""
+        meta = json.dumps({"key": key, "headers": headers}).encode()
+        record = _HEADER.pack(len(meta), len(body), status, latency) + meta + body
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+                if self._file.tell() == 0:
+                    self._file.write(MAGIC)
+            self._file.write(record)
+            self._file.flush()
+
+    def lookup(self, key: str) -> Optional[Exchange]:
+        """Next recorded response for ``key``, or None if it was never seen."""
+        with self._lock:
+            offsets = self._load_index().get(key)
+            if not offsets:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = (cursor + 1) % len(offsets)
+            return self._read(offsets[cursor])
+
+    def __iter__(self) -> Iterator[Exchange]:
+        with self._lock:
+            index = self._load_index()
+            offsets = sorted(o for group in index.values() for o in group)
+            exchanges = [self._read(offset) for offset in offsets]
+        return iter(exchanges)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(group) for group in self._load_index().values())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._index = None
+
+    def _load_index(self) -> Dict[str, List[int]]:
+        # Map the file once; records appended later are not seen until close.
+        if self._index is not None:
+            return self._index
+
+        self._index = {}
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return self._index
+        with open(self.path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a traffic archive")
+
+        offset = len(MAGIC)
+        end = len(self._map)
+        while offset + _HEADER.size <= end:
+            meta_len, body_len, _, _ = _HEADER.unpack_from(self._map, offset)
+            size = _HEADER.size + meta_len + body_len
+            if offset + size > end:
+                break  # a record cut short by a crash while writing
+            start = offset + _HEADER.size
+            key = json.loads(self._map[start : start + meta_len])["key"]
+            self._index.setdefault(key, []).append(offset)
+            offset += size
+        return self._index
+
+    def _read(self, offset: int) -> Exchange:
+        # Offsets only come from the index, which is built over the map.
+        data = self._map
+        assert data is not None
+        meta_len, body_len, status, latency = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        meta = json.loads(data[start : start + meta_len])
+        body = data[start + meta_len : start + meta_len + body_len]
+        headers = [(name, value) for name, value in meta["headers"]]
+        return Exchange(meta["key"], status, headers, body, latency)
+
+
+def request_key(method: str, url: str, body: Optional[bytes]) -> str:
+    """Archive key for a request: method, path with query, canonical body."""
+    parts = urlsplit(url)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    payload: Any = None
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = body.decode("latin-1")
+    return json.dumps([method.upper(), path, payload], sort_keys=True)
+
+
+class RecordingTransport(Transport):
+    """Send requests over the network and append every exchange to ``archive``.
+
+    Response bodies are read in full before they are handed back, so
+    streamed searches only start once the whole response has arrived.
+    """
+
+    def __init__(self, archive: Union[str, TrafficArchive]):
+        self.archive = _archive(archive)
+
+    def adapter(self, pool_size: int) -> HTTPAdapter:
+        return _RecordingAdapter(
+            self.archive, pool_connections=pool_size, pool_maxsize=pool_size
+        )
+
+    def async_transport(self, limits: httpx.Limits) -> httpx.AsyncBaseTransport:
+        return _AsyncRecordingTransport(
+            self.archive, httpx.AsyncHTTPTransport(limits=limits)
+        )
+
+
+class ReplayTransport(Transport):
+    """Answer requests from ``archive`` without touching the network.
+
+    Responses are served at full speed by default. With ``speed`` each one
+    waits its recorded latency divided by ``speed``, so ``1.0`` reproduces
+    the original timing and ``10.0`` runs ten times faster. A request with no
+    recorded response raises ``ReplayMiss``.
+    """
+
+    def __init__(
+        self, archive: Union[str, TrafficArchive], speed: Optional[float] = None
+    ):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self.archive = _archive(archive)
+        self.speed = speed
+
+    def adapter(self, pool_size: int) -> HTTPAdapter:
+        return _ReplayAdapter(self)
+
+    def async_transport(self, limits: httpx.Limits) -> httpx.AsyncBaseTransport:
+        return _AsyncReplayTransport(self)
+
+    def _lookup(self, key: str) -> Exchange:
+        exchange = self.archive.lookup(key)
+        if exchange is None:
+            raise ReplayMiss(f"No recorded response for {key}")
+        return exchange
+
+    def _delay(self, exchange: Exchange) -> float:
+        return 0.0 if self.speed is None else exchange.latency / self.speed
+
+
+class _RecordingAdapter(HTTPAdapter):
+    def __init__(self, archive: TrafficArchive, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> Response:
+        start = time.perf_counter()
+        response = super().send(request, stream, timeout, verify, cert, proxies)
+        try:
+            body = response.content
+        finally:
+            response.close()
+        headers = _stored_headers(response.headers.items())
+        self.archive.append(
+            _prepared_key(request),
+            response.status_code,
+            headers,
+            body,
+            time.perf_counter() - start,
+        )
+        return _requests_response(self, request, response.status_code, headers, body)
+
+
+class _ReplayAdapter(HTTPAdapter):
+    def __init__(self, transport: ReplayTransport):
+        super().__init__()
+        self.transport = transport
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> Response:
+        exchange = self.transport._lookup(_prepared_key(request))
+        delay = self.transport._delay(exchange)
+        if delay:
+            time.sleep(delay)
+        return _requests_response(
+            self, request, exchange.status, exchange.headers, exchange.body
+        )
+
+
+class _AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, archive: TrafficArchive, inner: httpx.AsyncBaseTransport):
+        self.archive = archive
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        headers = _stored_headers(response.headers.multi_items())
+        self.archive.append(
+            request_key(request.method, str(request.url), request.content),
+            response.status_code,
+            headers,
+            body,
+            time.perf_counter() - start,
+        )
+        return httpx.Response(
+            response.status_code, headers=headers, content=body, request=request
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class _AsyncReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: ReplayTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        exchange = self.transport._lookup(
+            request_key(request.method, str(request.url), request.content)
+        )
+        delay = self.transport._delay(exchange)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            exchange.status,
+            headers=exchange.headers,
+            content=exchange.body,
+            request=request,
+        )
+
+
+def _archive(archive: Union[str, TrafficArchive]) -> TrafficArchive:
+    return archive if isinstance(archive, TrafficArchive) else TrafficArchive(archive)
+
+
+def _prepared_key(request: PreparedRequest) -> str:
+    body = request.body
+    return request_key(
+        request.method or "GET",
+        request.url or "",
+        body.encode() if isinstance(body, str) else body,
+    )
+
+
+def _stored_headers(headers: Any) -> List[Tuple[str, str]]:
+    return [
+        (name, value)
+        for name, value in headers
+        if name.lower() not in _TRANSFER_HEADERS
+    ]
+
+
+def _requests_response(
+    adapter: HTTPAdapter,
+    request: PreparedRequest,
+    status: int,
+    headers: List[Tuple[str, str]],
+    body: bytes,
+) -> Response:
+    # A urllib3 response over an in-memory body, so streamed reads (read1,
+    # iter_content) behave exactly as they do on a live connection.
+    raw_headers = HTTPHeaderDict()
+    for name, value in headers:
+        raw_headers.add(name, value)
+    raw_headers["Content-Length"] = str(len(body))
+    raw = HTTPResponse(
+        body=io.BytesIO(body),
+        headers=raw_headers,
+        status=status,
+        preload_content=False,
+        decode_content=False,
+    )
+    return adapter.build_response(request, raw)
@@ -0,0 +1,95 @@
+"""
+Retry policy for transient Querit failures.
+"""
+
+import random
+import threading
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import FrozenSet, Optional
+
+import httpx
+import requests
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff bounded by a per-call deadline.
+
+    ``deadline`` caps the total seconds a single search may spend across all
+    attempts and waits; None leaves only ``max_attempts`` as the bound.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: Optional[float] = 30.0
+    retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Whether ``error`` is a transient failure worth retrying."""
+        status = _status_code(error)
+        if status is not None:
+            return status in self.retry_statuses
+        return isinstance(
+            error, (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+        )
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (starting at 0).
+
+        A ``Retry-After`` header on the failed response takes precedence over
+        the computed full-jitter delay.
+        """
+        retry_after = _retry_after(error) if error is not None else None
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+@dataclass
+class RetryStats:
+    """Counters for retried and rate-limited calls."""
+
+    retried: int = 0
+    rate_limited: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    return retry_after_seconds(response.headers.get("Retry-After"))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a ``Retry-After`` header value."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        # "-0000" dates parse as naive; RFC 5322 still means UTC by them.
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,301 @@
+"""
+Routing searches across several backends.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import requests
+
+from .backend import BatchSearchMixin
+from .core import AnyResult, SearchBackend
+from .utils import replace_result
+
+# Statuses that say the backend (or its key) is unhealthy rather than that the
+# query was bad.
+FAILURE_STATUSES = frozenset({401, 403, 429})
+
+# Errors without an HTTP status that show a backend is unreachable or slow.
+OUTAGE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    httpx.TransportError,
+    TimeoutError,
+    asyncio.TimeoutError,
+)
+
+
+class CircuitBreaker:
+    """Take a backend out of rotation after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow`` refuses calls for ``reset_timeout`` seconds. It then lets a
+    single probe through (half-open): success closes the breaker, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.trips = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            # Also re-admits a half-open probe that never reported back.
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._state = self.HALF_OPEN
+            self._opened_at = time.monotonic()
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.trips += 1
+
+
+class SearchRouter(BatchSearchMixin):
+    """Spread searches over several backends.
+
+    ``mode`` is one of:
+
+    * ``"round_robin"``: each search goes to the next backend in turn;
+    * ``"least_loaded"``: each search goes to the backend with the fewest
+      searches in flight;
+    * ``"fanout"``: every backend is searched in parallel and the results are
+      merged with URL dedupe and reciprocal-rank fusion.
+
+    Each backend has a ``CircuitBreaker``. Transport errors, timeouts, 5xx,
+    401, 403 and 429 count as failures; other errors are the query's fault
+    and are raised as-is. In the single-backend modes a failed search moves
+    on to the next healthy backend.
+    """
+
+    MODES = ("round_robin", "least_loaded", "fanout")
+
+    def __init__(
+        self,
+        backends: Sequence[SearchBackend],
+        mode: str = "round_robin",
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        rrf_k: int = 60,
+    ):
+        if not backends:
+            raise ValueError("SearchRouter needs at least one backend")
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {', '.join(self.MODES)}")
+
+        self.backends = list(backends)
+        self.mode = mode
+        self.rrf_k = rrf_k
+        self.breakers = [
+            CircuitBreaker(failure_threshold, reset_timeout) for _ in self.backends
+        ]
+        self._in_flight = [0] * len(self.backends)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def healthy(self) -> List[SearchBackend]:
+        """Backends whose circuit breaker is closed."""
+        return [
+            backend
+            for backend, breaker in zip(self.backends, self.breakers)
+            if breaker.state == CircuitBreaker.CLOSED
+        ]
+
+    def search(self, query: str, num_results: int = 10, **kwargs) -> List[AnyResult]:
+        """Search through one backend, or all of them in fan-out mode."""
+        if self.mode == "fanout":
+            return self._fanout(query, num_results, kwargs)
+
+        error: Optional[Exception] = None
+        for index in self._candidates():
+            if not self.breakers[index].allow():
+                continue
+            self._enter(index)
+            try:
+                results = self.backends[index].search(query, num_results, **kwargs)
+            except Exception as e:
+                if not self._record_error(index, e):
+                    raise
+                error = e
+                continue
+            finally:
+                self._leave(index)
+            self.breakers[index].record_success()
+            return results
+
+        raise error or RuntimeError("No healthy search backends")
+
+    async def asearch(
+        self, query: str, num_results: int = 10, **kwargs
+    ) -> List[AnyResult]:
+        """Async version of ``search``."""
+        if self.mode == "fanout":
+            return await self._afanout(query, num_results, kwargs)
+
+        error: Optional[Exception] = None
+        for index in self._candidates():
+            if not self.breakers[index].allow():
+                continue
+            self._enter(index)
+            try:
+                backend = self.backends[index]
+                results = await backend.asearch(query, num_results, **kwargs)
+            except Exception as e:
+                if not self._record_error(index, e):
+                    raise
+                error = e
+                continue
+            finally:
+                self._leave(index)
+            self.breakers[index].record_success()
+            return results
+
+        raise error or RuntimeError("No healthy search backends")
+
+    def _fanout(
+        self, query: str, num_results: int, kwargs: Dict[str, Any]
+    ) -> List[AnyResult]:
+        indexes = self._allowed()
+        if not indexes:
+            raise RuntimeError("No healthy search backends")
+
+        def run(index: int) -> Any:
+            try:
+                return self.backends[index].search(query, num_results, **kwargs)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=len(indexes)) as executor:
+            outcomes = list(executor.map(run, indexes))
+        return self._merge(indexes, outcomes, num_results)
+
+    async def _afanout(
+        self, query: str, num_results: int, kwargs: Dict[str, Any]
+    ) -> List[AnyResult]:
+        indexes = self._allowed()
+        if not indexes:
+            raise RuntimeError("No healthy search backends")
+
+        outcomes = await asyncio.gather(
+            *(
+                self.backends[index].asearch(query, num_results, **kwargs)
+                for index in indexes
+            ),
+            return_exceptions=True,
+        )
+        return self._merge(indexes, outcomes, num_results)
+
+    def _merge(
+        self, indexes: List[int], outcomes: List[Any], num_results: int
+    ) -> List[AnyResult]:
+        rankings = []
+        errors = []
+        for index, outcome in zip(indexes, outcomes):
+            if isinstance(outcome, BaseException):
+                self._record_error(index, outcome)
+                errors.append(outcome)
+            else:
+                self.breakers[index].record_success()
+                rankings.append(outcome)
+
+        if not rankings:
+            raise errors[0]
+        return reciprocal_rank_fusion(rankings, num_results, self.rrf_k)
+
+    def _candidates(self) -> List[int]:
+        """Backend indexes in the order they should be tried."""
+        with self._lock:
+            start = self._next
+            self._next = (start + 1) % len(self.backends)
+            count = len(self.backends)
+            order = [(start + i) % count for i in range(count)]
+            if self.mode == "least_loaded":
+                order.sort(key=lambda index: self._in_flight[index])
+        return order
+
+    def _allowed(self) -> List[int]:
+        return [i for i, breaker in enumerate(self.breakers) if breaker.allow()]
+
+    def _enter(self, index: int) -> None:
+        with self._lock:
+            self._in_flight[index] += 1
+
+    def _leave(self, index: int) -> None:
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def _record_error(self, index: int, error: BaseException) -> bool:
+        """Report ``error`` to backend ``index``'s breaker.
+
+        Returns whether it counted as a failure; a rejected query shows the
+        backend is up, and other errors (a bad argument, an unparsable
+        response) say nothing about its health.
+        """
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is None:
+            if not isinstance(error, OUTAGE_ERRORS):
+                return False
+        elif status < 500 and status not in FAILURE_STATUSES:
+            self.breakers[index].record_success()
+            return False
+        self.breakers[index].record_failure()
+        return True
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[AnyResult]], num_results: int = 10, k: int = 60
+) -> List[AnyResult]:
+    """Merge ranked result lists, scoring each URL by ``sum(1 / (k + rank))``.
+
+    A URL returned by several rankings is kept once, in the form of its best
+    ranked occurrence. Results are renumbered from position 1.
+    """
+    scores: Dict[Any, float] = {}
+    best: Dict[Any, AnyResult] = {}
+    best_rank: Dict[Any, int] = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, 1):
+            # Results without a URL can't be matched across rankings.
+            key = result.link or id(result)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            if rank < best_rank.get(key, rank + 1):
+                best[key] = result
+                best_rank[key] = rank
+
+    ordered = sorted(scores, key=lambda key: -scores[key])[:num_results]
+    return [
+        replace_result(best[key], position=position)
+        for position, key in enumerate(ordered, 1)
+    ]
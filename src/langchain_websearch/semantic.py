@@ -0,0 +1,231 @@
+"""
+Approximate cache for near-duplicate queries.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from .cache import CacheEntry, InMemoryCache, SearchCache
+from .utils import tokenize
+
+DEFAULT_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it me my of on or "
+    "please show tell the to was what when where which who why with".split()
+)
+
+
+def canonicalize(query: str, stopwords: FrozenSet[str] = DEFAULT_STOPWORDS) -> str:
+    """Lowercase, tokenize, drop stopwords and repeats, and sort the tokens.
+
+    "Latest Python news" and "python news, latest" both become
+    "latest news python". A query made only of stopwords keeps them.
+    """
+    return " ".join(sorted(set(tokenize(query, stopwords))))
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Embedding lookup needs NumPy: pip install 'langchain-querit[semantic]'"
+        ) from None
+    return numpy
+
+
+class VectorIndex:
+    """Fixed-capacity cosine-similarity index over unit vectors.
+
+    Vectors live in one preallocated NumPy matrix, so memory stays at
+    ``capacity`` rows and a lookup is a single matrix-vector product. Once
+    full, each insert overwrites the oldest row. Every vector carries an
+    integer scope and lookups only match vectors in the same scope.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._np = _numpy()
+        self.capacity = capacity
+        self._matrix: Any = None
+        self._scopes = self._np.full(capacity, -1, dtype=self._np.int64)
+        self._keys: List[Optional[str]] = [None] * capacity
+        self._slots: Dict[str, int] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, key: str, vector: Any, scope: int) -> Optional[str]:
+        """Index ``vector`` under ``key``; returns the key it evicted, if any."""
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = self._np.zeros(
+                    (self.capacity, len(vector)), dtype=self._np.float32
+                )
+
+            evicted = None
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._next
+                self._next = (slot + 1) % self.capacity
+                evicted = self._keys[slot]
+                if evicted is not None:
+                    del self._slots[evicted]
+
+            self._matrix[slot] = vector
+            self._scopes[slot] = scope
+            self._keys[slot] = key
+            self._slots[key] = slot
+            return evicted
+
+    def search(self, vector: Any, scope: int) -> Tuple[Optional[str], float]:
+        """Closest key in ``scope`` and its cosine similarity."""
+        with self._lock:
+            if self._matrix is None:
+                return None, 0.0
+            scores = self._matrix @ vector
+            scores[self._scopes != scope] = -self._np.inf
+            best = int(scores.argmax())
+            if self._keys[best] is None or scores[best] == -self._np.inf:
+                return None, 0.0
+            return self._keys[best], float(scores[best])
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is not None:
+                self._keys[slot] = None
+                self._scopes[slot] = -1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots.clear()
+            self._keys = [None] * self.capacity
+            self._scopes[:] = -1
+
+
+class SemanticCache(SearchCache):
+    """Cache that also answers rephrasings of a cached query.
+
+    Keys use ``canonicalize``, so case, spacing, punctuation, word order and
+    stopwords don't matter. With ``embed`` (a function from text to a
+    vector, e.g. a LangChain ``Embeddings.embed_query``) a lookup that misses
+    falls back to the most similar cached query with the same parameters,
+    accepted when cosine similarity reaches ``threshold``; ``embed`` is given
+    the canonical form of the query. Results live in ``store`` (an
+    ``InMemoryCache`` by default) and at most ``capacity`` vectors are
+    indexed. ``near_hits`` counts hits served by similarity.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SearchCache] = None,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        threshold: float = 0.9,
+        capacity: int = 1024,
+        stopwords: FrozenSet[str] = DEFAULT_STOPWORDS,
+    ):
+        super().__init__()
+        self.store = store or InMemoryCache(maxsize=capacity)
+        self.embed = embed
+        self.threshold = threshold
+        self.stopwords = stopwords
+        self.index = VectorIndex(capacity) if embed is not None else None
+        self.near_hits = 0
+        self._scopes: Dict[str, int] = {}
+        self._vectors: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(
+        self, query: str, num_results: int, params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        canonical = canonicalize(query, self.stopwords)
+        return json.dumps([canonical, num_results, params or {}], sort_keys=True)
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        results = self.store.get(key)
+        if results is None:
+            results = self._nearest(key)
+        self._count(results is not None, False)
+        return results
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        # Stale entries come from the store for exact matches only.
+        entry = self.store.lookup(key)
+        if entry is None:
+            results = self._nearest(key)
+            entry = None if results is None else CacheEntry(results, None)
+        self._count(entry is not None, entry is not None and entry.stale)
+        return entry
+
+    def set(self, key: str, results: List[Any]) -> None:
+        self.store.set(key, results)
+        index = self.index
+        if index is not None:
+            text, scope = self._split(key)
+            if index.add(key, self._vector(text), scope) is not None:
+                with self._lock:
+                    self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self.store.clear()
+        if self.index is not None:
+            self.index.clear()
+
+    def _count(self, hit: bool, stale: bool) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+                self.stats.stale_hits += stale
+            else:
+                self.stats.misses += 1
+
+    def _nearest(self, key: str) -> Optional[List[Any]]:
+        index = self.index
+        if index is None:
+            return None
+        text, scope = self._split(key)
+        match, score = index.search(self._vector(text), scope)
+        if match is None or score < self.threshold:
+            return None
+
+        results = self.store.get(match)
+        if results is None:
+            # The store expired or evicted it; stop matching against it.
+            index.remove(match)
+            return None
+        with self._lock:
+            self.near_hits += 1
+        return results
+
+    def _split(self, key: str) -> Tuple[str, int]:
+        """Canonical query and scope id (one per set of search parameters)."""
+        text, *rest = json.loads(key)
+        scope = json.dumps(rest, sort_keys=True)
+        with self._lock:
+            return text, self._scopes.setdefault(scope, len(self._scopes))
+
+    def _vector(self, text: str) -> Any:
+        # A search embeds its query on the miss and again on the store; keep
+        # recent vectors so the second call is free.
+        with self._lock:
+            vector = self._vectors.get(text)
+            if vector is not None:
+                self._vectors.move_to_end(text)
+                return vector
+
+        embed = self.embed
+        assert embed is not None, "only called when there is an index"
+        np = _numpy()
+        vector = np.asarray(embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        with self._lock:
+            self._vectors[text] = vector
+            while len(self._vectors) > 256:
+                self._vectors.popitem(last=False)
+        return vector
@@ -0,0 +1,349 @@
+"""
+Cache and rate-limit state shared by every process on a node.
+"""
+
+import os
+import sqlite3
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+
+from .cache import (
+    CacheEntry,
+    SearchCache,
+    decode_results,
+    encode_results,
+    remaining_ttl,
+)
+from .ratelimit import TokenBucket
+
+# A cached value is its store time followed by the encoded results.
+_STORED_AT = struct.Struct("<d")
+
+
+class SharedStore(ABC):
+    """Key-value store and token buckets visible to several processes.
+
+    Implementations must make ``reserve`` atomic across processes; ``get``
+    and ``set`` only need last-writer-wins semantics.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store ``value``, dropping it after ``ttl`` seconds if given."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self, prefix: str = "") -> None:
+        """Delete every key starting with ``prefix``."""
+
+    @abstractmethod
+    def reserve(
+        self,
+        bucket: str,
+        tokens: float,
+        rate: float,
+        capacity: float,
+        timeout: Optional[float],
+    ) -> Optional[float]:
+        """Take ``tokens`` from token bucket ``bucket``.
+
+        Same contract as ``TokenBucket._reserve``: returns how long the
+        caller must wait before using them, or None without taking anything
+        if that would be longer than ``timeout``.
+        """
+
+
+class SQLiteStore(SharedStore):
+    """``SharedStore`` in a local SQLite file.
+
+    The database runs in WAL mode, so reads don't block each other and the
+    OS page cache is what processes actually share. Token buckets are
+    updated in ``BEGIN IMMEDIATE`` transactions. Each process opens its own
+    connection, including after a fork, so a store created before gunicorn
+    or celery fork their workers is safe to inherit.
+    """
+
+    # Expired rows are purged on every this many writes.
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT value FROM shared_kv WHERE key = ? "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, time.time()),
+                )
+                .fetchone()
+            )
+        return None if row is None else bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_kv VALUES (?, ?, ?)",
+                (key, value, None if ttl is None else now + ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM shared_kv WHERE expires_at <= ?", (now,))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM shared_kv WHERE key = ?", (key,))
+
+    def clear(self, prefix: str = "") -> None:
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM shared_kv WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+
+    def reserve(
+        self,
+        bucket: str,
+        tokens: float,
+        rate: float,
+        capacity: float,
+        timeout: Optional[float],
+    ) -> Optional[float]:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated FROM shared_buckets WHERE name = ?",
+                    (bucket,),
+                ).fetchone()
+                available, updated = row if row is not None else (capacity, now)
+                available = min(capacity, available + max(0.0, now - updated) * rate)
+
+                wait = max(0.0, (tokens - available) / rate)
+                if timeout is not None and wait > timeout:
+                    conn.execute("ROLLBACK")
+                    return None
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO shared_buckets VALUES (?, ?, ?)",
+                    (bucket, available - tokens, now),
+                )
+                conn.execute("COMMIT")
+                return wait
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection inherited through fork must not be used by the child.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_kv ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+
+# Token bucket update, run atomically by the server. Numbers are returned as
+# strings because Redis truncates Lua numbers to integers.
+_RESERVE_SCRIPT = """
+local wanted = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local timeout = tonumber(ARGV[4])
+local now = tonumber(ARGV[5])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local available = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+available = math.min(capacity, available + math.max(0, now - updated) * rate)
+local wait = math.max(0, (wanted - available) / rate)
+if timeout >= 0 and wait > timeout then
+    return '-1'
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(available - wanted))
+redis.call('HSET', KEYS[1], 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisStore(SharedStore):
+    """``SharedStore`` on a Redis-compatible server.
+
+    ``client`` is a ``redis.Redis`` or any object with the same ``get``,
+    ``set``, ``delete``, ``scan_iter`` and ``eval`` methods, such as a
+    client for Valkey, KeyDB or a local stand-in. Keys are namespaced with
+    ``prefix``.
+    """
+
+    def __init__(self, client: Any, prefix: str = "querit:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        px = None if ttl is None else max(1, int(ttl * 1000))
+        self.client.set(self.prefix + key, value, px=px)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self, prefix: str = "") -> None:
+        keys = list(self.client.scan_iter(match=_glob_escape(self.prefix + prefix)))
+        if keys:
+            self.client.delete(*keys)
+
+    def reserve(
+        self,
+        bucket: str,
+        tokens: float,
+        rate: float,
+        capacity: float,
+        timeout: Optional[float],
+    ) -> Optional[float]:
+        wait = float(
+            self.client.eval(
+                _RESERVE_SCRIPT,
+                1,
+                self.prefix + "bucket:" + bucket,
+                repr(float(tokens)),
+                repr(float(rate)),
+                repr(float(capacity)),
+                repr(-1.0 if timeout is None else float(timeout)),
+                repr(time.time()),
+            )
+        )
+        return None if wait < 0 else wait
+
+
+class SharedCache(SearchCache):
+    """Search cache kept in a ``SharedStore``, so processes share entries.
+
+    Entries expire after ``ttl`` seconds; ``stale_ttl`` keeps them that much
+    longer for stale-while-revalidate, as in ``InMemoryCache``. The store
+    drops entries once both have passed. ``stats`` counts this process's
+    lookups only.
+    """
+
+    def __init__(
+        self,
+        store: SharedStore,
+        ttl: Optional[float] = 300.0,
+        stale_ttl: Optional[float] = None,
+        prefix: str = "cache:",
+    ):
+        super().__init__()
+        self.store = store
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        entry = self._find(key, stale_ok=False)
+        return None if entry is None else entry.results
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        return self._find(key, stale_ok=True)
+
+    def set(self, key: str, results: List[Any]) -> None:
+        value = _STORED_AT.pack(time.time()) + encode_results(results).encode()
+        keep = None if self.ttl is None else self.ttl + (self.stale_ttl or 0)
+        self.store.set(self.prefix + key, value, keep)
+
+    def clear(self) -> None:
+        self.store.clear(self.prefix)
+
+    def _find(self, key: str, stale_ok: bool) -> Optional[CacheEntry]:
+        value = self.store.get(self.prefix + key)
+        expires_in = None
+        if value is not None:
+            (stored_at,) = _STORED_AT.unpack_from(value)
+            expires_in = remaining_ttl(stored_at, self.ttl, time.time())
+            if expires_in is not None and expires_in < 0:
+                if -expires_in > (self.stale_ttl or 0) or not stale_ok:
+                    value = None
+
+        with self._lock:
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            if expires_in is not None and expires_in < 0:
+                self.stats.stale_hits += 1
+
+        encoded = value[_STORED_AT.size :].decode()
+        return CacheEntry(decode_results(encoded), expires_in)
+
+
+class SharedTokenBucket(TokenBucket):
+    """``TokenBucket`` whose tokens live in a ``SharedStore``.
+
+    Every bucket created with the same ``store`` and ``name``, in any
+    process, draws from one budget. ``throttled`` counts this process's
+    waits only.
+    """
+
+    def __init__(
+        self,
+        store: SharedStore,
+        rate: float,
+        capacity: Optional[float] = None,
+        name: str = "querit",
+    ):
+        super().__init__(rate, capacity)
+        self.store = store
+        self.name = name
+
+    def _reserve(self, tokens: float, timeout: Optional[float]) -> Optional[float]:
+        wait = self.store.reserve(self.name, tokens, self.rate, self.capacity, timeout)
+        if wait:
+            with self._lock:
+                self.throttled += 1
+        return wait
+
+
+def _glob_escape(text: str) -> str:
+    escaped = "".join("\\" + c if c in "*?[]\\" else c for c in text)
+    return escaped + "*"
@@ -0,0 +1,82 @@
+"""
+Coalescing of identical in-flight calls.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its outcome.
+
+    Callers that arrive while a call for the same key is running wait for it
+    and receive its result, or have its exception raised, instead of starting
+    their own. Sync callers (``do``) and async callers (``ado``) are tracked
+    separately; async calls are shared only within one event loop.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[Any, Hashable], "asyncio.Future"] = {}
+
+    def do(
+        self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None
+    ) -> Any:
+        """Call ``fn`` unless a call for ``key`` is already running.
+
+        A caller waiting on another's call gives up with ``TimeoutError``
+        after ``timeout`` seconds; the shared call keeps running.
+        """
+        with self._lock:
+            existing = self._calls.get(key)
+            leader = existing is None
+            call = _Call() if existing is None else existing
+            if leader:
+                self._calls[key] = call
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(timeout):
+            raise TimeoutError("Timed out waiting for a coalesced search")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn()`` unless a call for ``key`` is already running."""
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = self._tasks[task_key] = asyncio.ensure_future(fn(), loop=loop)
+                task.add_done_callback(lambda _: self._forget(task_key))
+
+        # Shield so that one cancelled caller doesn't cancel the shared call.
+        return await asyncio.shield(task)
+
+    def _forget(self, task_key: Tuple[Any, Hashable]) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
+
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        with self._lock:
+            return len(self._calls) + len(self._tasks)
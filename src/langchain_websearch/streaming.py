@@ -0,0 +1,123 @@
+"""
+Incremental parsing of Querit responses.
+"""
+
+import codecs
+import json
+from typing import Any, Dict, List, Optional
+
+# Location of the result items in a Querit response body.
+RESULT_PATH = ("results", "result")
+
+_WHITESPACE = " \t\r\n"
+
+
+class ResultStreamParser:
+    """Extract items of the ``results.result`` array from a response body.
+
+    Feed the body in chunks as it arrives; each call to ``feed`` returns the
+    items completed so far. Only the array items are decoded: the rest of the
+    document is scanned just far enough to find the array.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self.done = False
+
+        # Structural scan state used until the array is found.
+        self._found = False
+        self._path: List[Optional[str]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """Consume ``chunk`` and return the newly completed items."""
+        if self.done:
+            return []
+
+        self._buffer += self._decoder.decode(chunk)
+        if not self._found and not self._seek():
+            return []
+        return self._read_items()
+
+    def close(self) -> None:
+        """Signal the end of the body; raise if the array was left incomplete."""
+        self._buffer += self._decoder.decode(b"", final=True)
+        if self._found and not self.done:
+            self._read_items()
+            if not self.done:
+                raise ValueError("Truncated Querit response: result array not closed")
+
+    def _seek(self) -> bool:
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = json.loads(buffer[self._string_start : i + 1])
+            elif char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":" and self._path:
+                self._path[-1] = self._last_string
+            elif char in "{[":
+                if char == "[" and tuple(self._path) == RESULT_PATH:
+                    self._found = True
+                    # Drop the scanned prefix; items are decoded from here on.
+                    self._buffer = buffer[i + 1 :]
+                    self._pos = 0
+                    return True
+                self._path.append(None)
+            elif char in "}]":
+                if self._path:
+                    self._path.pop()
+                if not self._path:
+                    # Document closed without a result array.
+                    self.done = True
+                    self._pos = i + 1
+                    return False
+            i += 1
+
+        if self._in_string:
+            # Rescan the partial string once more data arrives.
+            self._in_string = False
+            self._escape = False
+            i = self._string_start
+        self._pos = i
+        return False
+
+    def _read_items(self) -> List[Dict[str, Any]]:
+        items = []
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE + ",":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                break
+            if buffer.find("}", pos) == -1:
+                break
+            try:
+                item, pos = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            items.append(item)
+
+        # Keep only the undecoded tail so the buffer doesn't grow unbounded.
+        self._buffer = buffer[pos:]
+        self._pos = 0
+        return items
@@ -0,0 +1,40 @@
+"""
+Helpers shared by several modules.
+"""
+
+import re
+from typing import Any, FrozenSet, List
+
+TOKEN = re.compile(r"\w+")
+
+RESULT_FIELDS = ("title", "link", "snippet", "display_link", "position")
+
+ELLIPSIS = "…"
+
+
+def tokenize(text: str, stopwords: FrozenSet[str] = frozenset()) -> List[str]:
+    """Lowercased word tokens of ``text`` without ``stopwords``.
+
+    Text made only of stopwords keeps them, so it still has some tokens.
+    """
+    tokens = TOKEN.findall(text.lower())
+    return [token for token in tokens if token not in stopwords] or tokens
+
+
+def truncate(text: str, limit: int) -> str:
+    """``text`` cut to at most ``limit`` characters at a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text[: limit - len(ELLIPSIS)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:.-") + ELLIPSIS
+
+
+def replace_result(result: Any, **changes: Any) -> Any:
+    """Copy of a ``SearchResult`` or ``CompactResult`` with ``changes`` applied."""
+    if hasattr(result, "_replace"):
+        return result._replace(**changes)
+    fields = {name: getattr(result, name) for name in RESULT_FIELDS}
+    fields.update(changes)
+    return type(result)(**fields)
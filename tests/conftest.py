@@ -0,0 +1,35 @@
+"""
+Shared fixtures: the benchmark stub of the Querit search endpoint and
+backends pointed at it.
+"""
+
+import pytest
+
+from benchmarks.stub_server import start_stub
+from langchain_websearch import QueritSearchBackend
+
+
+@pytest.fixture
+def querit_stub():
+    server = start_stub()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_backend(querit_stub):
+    """Factory for ``QueritSearchBackend``s that search ``querit_stub``.
+
+    Keyword arguments go to the backend; ``api_key`` and ``base_url`` default
+    to a test key and the stub.
+    """
+
+    def make(**kwargs):
+        kwargs.setdefault("api_key", "test-key")
+        kwargs.setdefault("base_url", querit_stub.url)
+        return QueritSearchBackend(**kwargs)
+
+    return make
@@ -0,0 +1,43 @@
+"""
+Async search path against a local Querit stub.
+"""
+
+import asyncio
+import time
+
+from langchain_websearch import WebSearchTool
+
+
+def make_tool(stub, **kwargs):
+    tool = WebSearchTool(**kwargs)
+    tool._backend_instance.api_key = "test-key"
+    tool._backend_instance.base_url = stub.url
+    return tool
+
+
+def test_arun_returns_formatted_results(querit_stub):
+    tool = make_tool(querit_stub, num_results=3)
+
+    result = asyncio.run(tool._arun("python"))
+
+    assert result.startswith("1. python result 0")
+    assert "3. python result 2" in result
+    assert "4." not in result
+
+
+def test_concurrent_arun_calls_overlap(querit_stub):
+    querit_stub.latency = 0.3
+    tool = make_tool(querit_stub)
+    n = 100  # ten times the default pool_size
+
+    async def run_all():
+        return await asyncio.gather(*(tool._arun(f"q{i}") for i in range(n)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    assert len(querit_stub.requests) == n
+    assert all(r.startswith("1. q") for r in results)
+    # Capping requests in flight at pool_size would take n / 10 * delay = 3s.
+    assert elapsed < querit_stub.latency * 3
@@ -0,0 +1,87 @@
+"""
+Batch search against a local Querit stub.
+"""
+
+import asyncio
+
+import pytest
+import requests
+
+from langchain_websearch import WebSearchTool
+
+
+def test_search_many_dedupes_and_keeps_order(querit_stub, make_backend):
+    backend = make_backend()
+    queries = ["b", "a", "b", "c", "a"]
+
+    outcomes = backend.search_many(queries, num_results=2, max_concurrency=2)
+
+    assert [o[0].title for o in outcomes] == [f"{q} result 0" for q in queries]
+    assert sorted(p["query"] for p in querit_stub.requests) == ["a", "b", "c"]
+    assert outcomes[0] is not outcomes[2]
+
+
+def test_search_many_returns_per_query_errors(querit_stub, make_backend):
+    querit_stub.statuses["bad"] = 400
+    backend = make_backend()
+
+    outcomes = backend.search_many(["good", "bad", "good"])
+
+    assert isinstance(outcomes[1], requests.HTTPError)
+    assert outcomes[0][0].title == "good result 0"
+    assert outcomes[2][0].title == "good result 0"
+
+
+def test_asearch_many_returns_per_query_errors(querit_stub, make_backend):
+    querit_stub.statuses["bad"] = 400
+    backend = make_backend()
+
+    outcomes = asyncio.run(backend.asearch_many(["bad", "x", "y"], max_concurrency=1))
+
+    assert isinstance(outcomes[0], Exception)
+    assert [o[0].title for o in outcomes[1:]] == ["x result 0", "y result 0"]
+
+
+def test_tool_batch_run(querit_stub, make_backend):
+    querit_stub.statuses["bad"] = 400
+    tool = WebSearchTool(num_results=1)
+    tool._backend_instance = make_backend()
+
+    results = tool.batch_run(["one", "bad"])
+    async_results = asyncio.run(tool.abatch_run(["one", "bad"]))
+
+    assert results[0] == async_results[0]
+    assert results[0] == (
+        "1. one result 0\n"
+        "   URL: https://example.com/0\n"
+        "   Preview: Snippet 0 for one\n"
+    )
+    assert results[1].startswith("Search failed: ")
+    assert async_results[1].startswith("Search failed: ")
+
+
+def test_tool_batch_run_with_plain_backend(make_backend):
+    class PlainBackend:
+        def __init__(self, backend):
+            self.backend = backend
+
+        def search(self, query, num_results=10, **kwargs):
+            return self.backend.search(query, num_results, **kwargs)
+
+        async def asearch(self, query, num_results=10, **kwargs):
+            return await self.backend.asearch(query, num_results, **kwargs)
+
+    tool = WebSearchTool(num_results=1)
+    tool._backend_instance = PlainBackend(make_backend())
+
+    assert tool.batch_run(["one"]) == asyncio.run(tool.abatch_run(["one"]))
+    assert tool.batch_run(["one"])[0].startswith("1. one result 0")
+
+
+def test_search_many_rejects_zero_concurrency(make_backend):
+    backend = make_backend()
+
+    with pytest.raises(ValueError):
+        backend.search_many(["one"], max_concurrency=0)
+    with pytest.raises(ValueError):
+        asyncio.run(backend.asearch_many(["one"], max_concurrency=0))
@@ -0,0 +1,100 @@
+"""
+Benchmark stub server, runner and report comparison.
+"""
+
+import json
+
+import pytest
+import requests
+
+from benchmarks import compare, load, run
+from benchmarks.stub_server import start_stub
+from langchain_websearch import QueritSearchBackend, RetryPolicy
+
+
+@pytest.fixture
+def stub():
+    server = start_stub(snippet_size=100)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_base_url_can_come_from_environment(stub, monkeypatch):
+    monkeypatch.setenv("QUERIT_BASE_URL", stub.url)
+
+    results = QueritSearchBackend(api_key="test-key").search("python", num_results=2)
+
+    assert len(stub.requests) == 1
+    assert [len(r.snippet) for r in results] == [100, 100]
+
+
+def test_stub_error_rate(stub):
+    stub.error_rate = 1.0
+    backend = QueritSearchBackend(
+        api_key="test-key", base_url=stub.url, retry=RetryPolicy(max_attempts=1)
+    )
+
+    with pytest.raises(requests.HTTPError):
+        backend.search("python")
+
+    assert stub.errors == 1
+
+
+def test_runner_writes_machine_readable_report(tmp_path):
+    output = tmp_path / "report.json"
+
+    run.main(
+        ["--quick", "--latency", "0", "--suite", "latency", "--output", str(output)]
+    )
+    report = json.loads(output.read_text())
+
+    assert report["package_version"]
+    assert set(report["results"]) == {"latency"}
+    assert report["results"]["latency"]["p50_ms"] > 0
+
+
+def test_compare_flags_regressions():
+    baseline = {
+        "results": {
+            "latency": {"p50_ms": 10.0},
+            "throughput": [{"concurrency": 4, "sync_searches_per_s": 100.0}],
+        }
+    }
+    candidate = {
+        "results": {
+            "latency": {"p50_ms": 10.5},
+            "throughput": [{"concurrency": 4, "sync_searches_per_s": 50.0}],
+        }
+    }
+
+    rows, regressions = compare.compare(baseline, candidate, threshold=10)
+
+    assert [row[0] for row in rows] == [
+        "latency.p50_ms",
+        "throughput.4.sync_searches_per_s",
+    ]
+    assert regressions == ["throughput.4.sync_searches_per_s"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--mode", "closed", "--api", "sync"],
+        ["--mode", "poisson", "--api", "async", "--rate", "100"],
+    ],
+)
+def test_load_generator_reports(tmp_path, options):
+    output = tmp_path / "load.json"
+
+    load.main(
+        options
+        + ["--duration", "0.3", "--concurrency", "4", "--latency", "0"]
+        + ["--error-rate", "0.5", "--output", str(output)]
+    )
+    (result,) = json.loads(output.read_text())["results"].values()
+
+    assert result["calls"] > 0 and result["calls_per_s"] > 0
+    assert 0 < result["error_rate"] < 1
+    assert result["p99_ms"] >= result["p50_ms"] > 0
+    assert result["peak_threads"] >= 1
@@ -0,0 +1,165 @@
+"""
+Result caching against a local Querit stub.
+"""
+
+import asyncio
+import time
+
+from langchain_websearch import (
+    CompactResult,
+    InMemoryCache,
+    InMemorySink,
+    SearchResult,
+    SQLiteCache,
+    WebSearchTool,
+)
+
+
+def test_repeated_query_is_served_from_cache(querit_stub, make_backend):
+    cache = InMemoryCache()
+    backend = make_backend(cache=cache)
+
+    first = backend.search("Python  News", num_results=3)
+    second = backend.search("python news", num_results=3)
+    third = asyncio.run(backend.asearch("python news", num_results=3))
+
+    assert len(querit_stub.requests) == 1
+    assert [r.title for r in second] == [r.title for r in first]
+    assert [r.title for r in third] == [r.title for r in first]
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+
+def test_parameters_are_part_of_the_key(querit_stub, make_backend):
+    backend = make_backend(cache=InMemoryCache())
+
+    backend.search("python", num_results=3)
+    backend.search("python", num_results=5)
+
+    assert len(querit_stub.requests) == 2
+
+
+def test_lru_eviction_and_ttl_expiry():
+    cache = InMemoryCache(maxsize=2, ttl=0.05)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    cache.get("a")
+    cache.set("c", [3])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1]
+
+    time.sleep(0.1)
+    assert cache.get("c") is None
+    assert cache.stats.evictions == 2
+
+
+def test_sqlite_cache_survives_restart(querit_stub, tmp_path, make_backend):
+    path = str(tmp_path / "cache.db")
+    make_backend(cache=SQLiteCache(path)).search("python", num_results=2)
+
+    cache = SQLiteCache(path)
+    results = make_backend(cache=cache).search("python", num_results=2)
+
+    assert len(querit_stub.requests) == 1
+    assert cache.stats.hits == 1
+    assert [(r.title, r.position) for r in results] == [
+        ("python result 0", 1),
+        ("python result 1", 2),
+    ]
+
+
+def test_persisted_hits_match_the_backend_result_type(
+    querit_stub, tmp_path, make_backend
+):
+    path = str(tmp_path / "cache.db")
+
+    def backend(fast_results):
+        return make_backend(cache=SQLiteCache(path), fast_results=fast_results)
+
+    fast = backend(True)
+    miss = fast.search("python", num_results=2)
+    hit = fast.search("python", num_results=2)
+    # A model backend reading the same file still gets models.
+    models = backend(False).search("python", num_results=2)
+
+    assert len(querit_stub.requests) == 1
+    assert all(type(r) is CompactResult for r in miss + hit)
+    assert hit == miss
+    assert all(type(r) is SearchResult for r in models)
+    assert [r.link for r in models] == [r.link for r in hit]
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), maxsize=2)
+    cache.set("a", [])
+    cache.set("b", [])
+    cache.get("a")
+    cache.set("c", [])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == []
+    assert cache.stats.evictions == 1
+
+
+def test_tool_opts_in_through_constructor():
+    cache = InMemoryCache()
+
+    assert WebSearchTool(cache=cache)._backend_instance.cache is cache
+    assert WebSearchTool()._backend_instance.cache is None
+
+
+def test_stale_entry_is_served_while_revalidating(querit_stub, make_backend):
+    cache = InMemoryCache(ttl=0.05, stale_ttl=60)
+    sink = InMemorySink()
+    backend = make_backend(cache=cache)
+    backend.metrics = sink
+    backend.search("python", num_results=3)
+    time.sleep(0.1)
+
+    querit_stub.latency = 0.2
+    start = time.perf_counter()
+    stale = backend.search("python", num_results=3)
+    backend.search("python", num_results=3)
+
+    assert time.perf_counter() - start < 0.15
+    assert len(stale) == 3
+    assert cache.stats.stale_hits == 2
+    assert sink.total("cache_stale") == 2
+
+    deadline = time.monotonic() + 2
+    while sink.total("revalidate") == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sink.total("revalidate") == 1
+    assert len(querit_stub.requests) == 2
+    assert cache.lookup(cache.make_key("python", 3)).stale is False
+
+
+def test_stale_entries_are_misses_for_get():
+    cache = InMemoryCache(ttl=0.05, stale_ttl=0.1)
+    cache.set("a", [1])
+    time.sleep(0.07)
+
+    assert cache.get("a") is None
+    assert cache.lookup("a").results == [1]
+
+    time.sleep(0.1)
+    assert cache.lookup("a") is None
+    assert cache.stats.evictions == 1
+
+
+def test_sqlite_cache_serves_stale_entries(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=0.05, stale_ttl=60)
+    cache.set(
+        "a",
+        [
+            SearchResult(
+                title="t", link="https://t", snippet="s", display_link="t", position=1
+            )
+        ],
+    )
+    time.sleep(0.07)
+
+    entry = cache.lookup("a")
+
+    assert entry.stale and entry.expires_in < 0
+    assert cache.get("a") is None
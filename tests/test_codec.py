@@ -0,0 +1,85 @@
+"""
+Compressed responses and pluggable JSON decoding.
+"""
+
+import asyncio
+import functools
+import json
+
+import pytest
+
+from langchain_websearch import InMemorySink
+from langchain_websearch.codec import accept_encoding, get_decoder
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(make_backend, coalesce=False)
+
+
+def test_requests_compressed_responses(querit_stub, make_backend):
+    make_backend().search("python")
+
+    offered = querit_stub.accept_encodings[0]
+    assert offered == accept_encoding()
+    assert "gzip" in offered
+
+
+def test_gzip_response_is_decoded_and_measured(querit_stub, make_backend):
+    querit_stub.compression = True
+    sink = InMemorySink()
+
+    results = make_backend().search("python", metrics=sink)
+
+    assert [r.title for r in results][:2] == ["python result 0", "python result 1"]
+    assert sink.total("wire_bytes") < sink.total("response_bytes")
+
+
+def test_async_gzip_response_is_decoded_and_measured(querit_stub, make_backend):
+    querit_stub.compression = True
+    sink = InMemorySink()
+
+    results = asyncio.run(make_backend().asearch("python", metrics=sink))
+
+    assert len(results) == 10
+    assert sink.total("wire_bytes") < sink.total("response_bytes")
+
+
+def test_streamed_gzip_response(querit_stub, make_backend):
+    querit_stub.compression = True
+
+    results = list(make_backend().iter_search("python", num_results=3))
+
+    assert [r.position for r in results] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("decoder", ["auto", "json"])
+def test_named_decoders(decoder, make_backend):
+    results = make_backend(json_decoder=decoder).search("python")
+
+    assert len(results) == 10
+
+
+def test_orjson_decoder(make_backend):
+    pytest.importorskip("orjson")
+
+    results = make_backend(json_decoder="orjson").search("python")
+
+    assert results[0].link == "https://example.com/0"
+
+
+def test_custom_decoder_receives_body(make_backend):
+    bodies = []
+
+    def loads(body):
+        bodies.append(body)
+        return json.loads(body)
+
+    make_backend(json_decoder=loads).search("python")
+
+    assert len(bodies) == 1 and isinstance(bodies[0], bytes)
+
+
+def test_unknown_decoder_is_rejected():
+    with pytest.raises(ValueError):
+        get_decoder("simdjson")
@@ -0,0 +1,260 @@
+"""
+Fetching result pages and extracting their text.
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from langchain_websearch import (
+    CompactResult,
+    ConnectionPool,
+    PageCache,
+    PageFetcher,
+    WebSearchTool,
+    SearchResult,
+    extract_text,
+    get_default_pool,
+)
+
+ARTICLE = b"""<html><head><title>Release notes</title>
+<style>body { color: red }</style><script>var tracking = 1;</script></head>
+<body><nav>Home | Docs</nav><header>Site header</header>
+<article><h1>Version 2.0</h1><p>Faster   parsing and
+ smaller wheels.</p><aside>Related posts</aside></article>
+<footer>Copyright</footer></body></html>"""
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            self._respond(server)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _respond(self, server):
+        if server.delay:
+            time.sleep(server.delay)
+        if self.path == "/big":
+            # Far more than any test's byte limit, sent in small chunks.
+            body = b"<p>" + b"word " * 200000 + b"</p>"
+            self._send(200, body, "text/html")
+        elif self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304, b"", None, {"ETag": '"v1"'})
+            else:
+                self._send(200, ARTICLE, "text/html", {"ETag": '"v1"'})
+        elif self.path == "/pdf":
+            self._send(200, b"%PDF-1.4", "application/pdf")
+        elif self.path == "/latin1":
+            body = "<p>café</p>".encode("latin-1")
+            self._send(200, body, "text/html; charset=iso-8859-1")
+        elif self.path.startswith("/article"):
+            self._send(200, ARTICLE, "text/html; charset=utf-8")
+        else:
+            self._send(404, b"", None)
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            for start in range(0, len(body), 8192):
+                self.wfile.write(body[start : start + 8192])
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _PageHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+        self.delay = 0.0
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+@pytest.fixture
+def page_server():
+    server = PageServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_fetcher(**kwargs):
+    return PageFetcher(pool=ConnectionPool(), **kwargs)
+
+
+def make_result(url, position=1):
+    return CompactResult("Title", url, "Original snippet", "127.0.0.1", position)
+
+
+def test_extracts_main_text_without_boilerplate():
+    title, text = extract_text(ARTICLE)
+
+    assert title == "Release notes"
+    assert text == "Version 2.0 Faster parsing and smaller wheels."
+
+
+def test_extract_falls_back_to_body_and_plain_text():
+    assert extract_text(b"<p>a</p><nav>menu</nav><p>b</p>")[1] == "a b"
+    assert extract_text(b"one\n  two", "text/plain") == ("", "one two")
+
+
+def test_fetch_extracts_page(page_server):
+    page = make_fetcher().fetch(page_server.url("/article"))
+
+    assert page.status == 200
+    assert page.title == "Release notes"
+    assert page.text.startswith("Version 2.0")
+    assert not page.truncated
+
+
+def test_fetch_uses_declared_charset(page_server):
+    assert make_fetcher().fetch(page_server.url("/latin1")).text == "café"
+
+
+def test_body_is_cut_at_byte_limit(page_server):
+    page = make_fetcher(max_bytes=10000, max_chars=100000).fetch(
+        page_server.url("/big")
+    )
+
+    assert page.truncated
+    assert len(page.text) < 10000
+
+
+def test_non_html_is_rejected(page_server):
+    with pytest.raises(ValueError):
+        make_fetcher().fetch(page_server.url("/pdf"))
+
+
+def test_cached_page_is_revalidated_with_etag(page_server):
+    cache = PageCache(ttl=0)
+    fetcher = make_fetcher(cache=cache)
+
+    first = fetcher.fetch(page_server.url("/etag"))
+    second = fetcher.fetch(page_server.url("/etag"))
+
+    assert second.text == first.text
+    assert len(page_server.requests) == 2
+    assert cache.revalidated == 1
+    assert cache.stats.hits == 1
+
+
+def test_fresh_page_is_served_from_cache(page_server):
+    fetcher = make_fetcher()
+
+    fetcher.fetch(page_server.url("/article"))
+    fetcher.fetch(page_server.url("/article"))
+
+    assert len(page_server.requests) == 1
+
+
+def test_per_host_limit_bounds_concurrency(page_server):
+    page_server.delay = 0.1
+    fetcher = make_fetcher(per_host=2, max_concurrency=8)
+    urls = [page_server.url(f"/article/{i}") for i in range(6)]
+
+    pages = fetcher.fetch_many(urls)
+
+    assert [page.url for page in pages] == urls
+    assert page_server.peak == 2
+
+
+def test_async_fetch_respects_limits(page_server):
+    page_server.delay = 0.1
+    fetcher = make_fetcher(per_host=3, max_bytes=10000)
+    urls = [page_server.url(f"/article/{i}") for i in range(6)]
+    urls.append(page_server.url("/big"))
+
+    pages = asyncio.run(fetcher.afetch_many(urls))
+
+    assert all(page.title == "Release notes" for page in pages[:6])
+    assert pages[6].truncated
+    assert page_server.peak == 3
+
+
+def test_enrich_replaces_snippets_of_top_results(page_server):
+    results = [
+        make_result(page_server.url("/article"), 1),
+        make_result(page_server.url("/missing"), 2),
+        make_result(page_server.url("/article/3"), 3),
+    ]
+
+    enriched = make_fetcher().enrich(results, top_k=2)
+
+    assert enriched[0].snippet.startswith("Version 2.0")
+    assert enriched[1].snippet == "Original snippet"
+    assert enriched[2] is results[2]
+    assert sorted(page_server.requests) == ["/article", "/missing"]
+
+
+def test_enrich_keeps_the_result_type(page_server):
+    url = page_server.url("/article")
+    model = SearchResult(title="t", link=url, snippet="s", display_link="d", position=1)
+
+    (enriched,) = make_fetcher().enrich([model], top_k=1)
+
+    assert isinstance(enriched, SearchResult)
+    assert enriched.snippet.startswith("Version 2.0")
+    assert enriched.position == 1
+
+
+def test_fetcher_has_its_own_pool_by_default():
+    assert PageFetcher().pool is not get_default_pool()
+
+
+class StaticBackend:
+    def __init__(self, results):
+        self.results = results
+
+    def search(self, query, num_results=10, **kwargs):
+        return self.results
+
+    async def asearch(self, query, num_results=10, **kwargs):
+        return self.results
+
+
+def test_tool_fetches_top_k_pages(page_server):
+    results = [make_result(page_server.url("/article"))]
+    tool = WebSearchTool(
+        backend=StaticBackend(results),
+        fetch_top_k=1,
+        fetcher=make_fetcher(),
+        output_format="compact",
+    )
+
+    assert "Faster parsing" in tool._run("release notes")
+    assert "Faster parsing" in asyncio.run(tool._arun("release notes"))
+    assert "Original snippet" in WebSearchTool(backend=StaticBackend(results))._run(
+        "release notes"
+    )
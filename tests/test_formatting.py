@@ -0,0 +1,107 @@
+"""
+Output formats and character budgets for tool output.
+"""
+
+import json
+
+import pytest
+
+from langchain_websearch import CompactResult, WebSearchTool
+from langchain_websearch.formatting import MIN_SNIPPET_CHARS, format_results
+
+
+def make_results(count=5, snippet_words=40):
+    return [
+        CompactResult(
+            f"Title {i}",
+            f"https://example.com/{i}",
+            " ".join(f"word{j}" for j in range(snippet_words)),
+            "example.com",
+            i,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def test_modes_render_every_result():
+    results = make_results(2, snippet_words=2)
+
+    assert format_results(results, "compact") == (
+        "1. Title 1 (https://example.com/1) word0 word1\n"
+        "2. Title 2 (https://example.com/2) word0 word1"
+    )
+    assert format_results(results, "markdown").startswith(
+        "1. [Title 1](https://example.com/1)\n   word0 word1\n2. "
+    )
+    lines = format_results(results, "jsonl").splitlines()
+    assert [json.loads(line)["url"] for line in lines] == [
+        "https://example.com/1",
+        "https://example.com/2",
+    ]
+
+
+@pytest.mark.parametrize("mode", ["default", "compact", "jsonl", "markdown"])
+def test_budget_is_respected(mode):
+    output = format_results(make_results(), mode, max_chars=600)
+
+    assert 0 < len(output) <= 600
+
+
+def test_tight_budget_truncates_snippets_at_word_boundaries():
+    output = format_results(make_results(), "compact", max_chars=600)
+    lines = output.split("\n")
+
+    assert len(lines) == 5
+    assert all(line.endswith("…") for line in lines)
+    assert all(line[:-1].split()[-1].startswith("word") for line in lines)
+
+
+def test_low_ranked_results_are_dropped_first():
+    output = format_results(make_results(), "compact", max_chars=200)
+    lines = output.split("\n")
+
+    assert [line.split(".")[0] for line in lines] == ["1", "2"]
+    assert len(output) <= 200
+
+
+def test_result_that_cannot_show_enough_snippet_is_dropped():
+    header = len("1. Title 1 (https://example.com/1) ")
+
+    output = format_results(make_results(1), "compact", header + 10)
+
+    assert output == "1. Title 1 (https://example.com/1)"
+    assert format_results(make_results(1), "compact", header + MIN_SNIPPET_CHARS)
+
+
+@pytest.mark.parametrize("mode", ["default", "compact", "jsonl", "markdown"])
+def test_top_result_title_and_link_survive_any_budget(mode):
+    output = format_results(make_results(), mode, max_chars=10)
+
+    assert "Title 1" in output
+    assert "https://example.com/1" in output
+    assert "word0" not in output
+    assert "Title 2" not in output
+
+
+def test_jsonl_escaping_stays_within_budget():
+    results = [CompactResult("t", "u", '"quoted" ' * 40, "d", 1)]
+
+    output = format_results(results, "jsonl", max_chars=150)
+
+    assert len(output) <= 150
+    assert json.loads(output)["snippet"].endswith("…")
+
+
+def test_tool_budget_from_tokens_or_chars():
+    results = make_results()
+
+    by_tokens = WebSearchTool(output_format="compact", max_output_tokens=100)
+    by_chars = WebSearchTool(output_format="compact", max_chars=400)
+
+    assert by_tokens._format_results(results) == by_chars._format_results(results)
+    assert len(by_chars._format_results(results)) <= 400
+
+
+def test_tool_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        WebSearchTool(output_format="yaml")
@@ -0,0 +1,177 @@
+"""
+Hedged requests and per-call deadlines against a local Querit stub.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+
+import pytest
+import requests
+
+from langchain_websearch import (
+    AdaptiveLimiter,
+    HedgePolicy,
+    RetryPolicy,
+    TokenBucket,
+    WebSearchTool,
+)
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(
+        make_backend, coalesce=False, retry=RetryPolicy(max_attempts=1)
+    )
+
+
+def test_delay_follows_recorded_percentile():
+    policy = HedgePolicy(percentile=90, initial_delay=2.0, min_samples=10)
+    assert policy.delay() == 2.0
+
+    for ms in range(1, 101):
+        policy.record(ms / 1000)
+
+    assert policy.delay() == pytest.approx(0.091)
+
+
+def test_slow_request_is_hedged(querit_stub, make_backend):
+    querit_stub.delays = [1.0]
+    policy = HedgePolicy(initial_delay=0.05)
+    backend = make_backend(hedge=policy)
+
+    start = time.perf_counter()
+    results = backend.search("slow")
+    elapsed = time.perf_counter() - start
+
+    assert results[0].title == "slow result 0"
+    assert elapsed < 0.5
+    assert len(querit_stub.requests) == 2
+    assert (policy.sent, policy.won) == (1, 1)
+
+
+def test_only_the_winning_leg_latency_is_recorded(querit_stub, make_backend):
+    querit_stub.delays = [1.0]
+    policy = HedgePolicy(initial_delay=0.2)
+    backend = make_backend(hedge=policy)
+
+    backend.search("slow")
+
+    # The hedge answered almost at once; the 0.2s before it was sent is not
+    # part of its latency.
+    assert list(policy._samples) == [pytest.approx(0.0, abs=0.15)]
+
+
+def test_losing_leg_frees_its_limiter_slot(querit_stub, make_backend):
+    querit_stub.delays = [1.0]
+    limiter = AdaptiveLimiter(initial_limit=2)
+    backend = make_backend(hedge=HedgePolicy(initial_delay=0.05), limiter=limiter)
+
+    start = time.perf_counter()
+    backend.search("slow")
+
+    assert time.perf_counter() - start < 0.5
+    assert limiter.in_flight == 0
+
+
+def test_saturated_pool_does_not_trigger_hedges(querit_stub, make_backend):
+    querit_stub.latency = 0.2
+    policy = HedgePolicy(initial_delay=0.3, max_workers=4)
+    backend = make_backend(hedge=policy)
+
+    threads = [
+        threading.Thread(target=backend.search, args=(f"q{i}",)) for i in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(querit_stub.requests) == 16
+    assert policy.sent == 0
+
+
+def test_fast_request_is_not_hedged(querit_stub, make_backend):
+    policy = HedgePolicy(initial_delay=0.5)
+    backend = make_backend(hedge=policy)
+
+    backend.search("fast")
+
+    assert len(querit_stub.requests) == 1
+    assert policy.sent == 0
+
+
+def test_async_slow_request_is_hedged(querit_stub, make_backend):
+    querit_stub.delays = [1.0]
+    policy = HedgePolicy(initial_delay=0.05)
+    backend = make_backend(hedge=policy)
+
+    async def run():
+        start = time.perf_counter()
+        results = await backend.asearch("slow")
+        elapsed = time.perf_counter() - start
+        await backend.pool.aclose()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+
+    assert results[0].title == "slow result 0"
+    assert elapsed < 0.5
+    assert (policy.sent, policy.won) == (1, 1)
+
+
+def test_error_surfaces_only_when_both_requests_fail(querit_stub, make_backend):
+    querit_stub.delays = [0.2]
+    querit_stub.statuses["broken"] = 404
+    backend = make_backend(hedge=HedgePolicy(initial_delay=0.05))
+
+    with pytest.raises(requests.HTTPError):
+        backend.search("broken")
+
+    assert len(querit_stub.requests) == 2
+
+
+def test_hedge_respects_rate_limit(querit_stub, make_backend):
+    querit_stub.delays = [0.3]
+    policy = HedgePolicy(initial_delay=0.05)
+    limiter = TokenBucket(rate=0.01, capacity=1)
+    backend = make_backend(hedge=policy, rate_limiter=limiter)
+
+    backend.search("limited")
+
+    assert len(querit_stub.requests) == 1
+    assert policy.sent == 0
+
+
+def test_tool_timeout_bounds_a_slow_search(querit_stub):
+    querit_stub.latency = 1.0
+    tool = WebSearchTool(timeout=0.2)
+    tool._backend_instance.api_key = "test-key"
+    tool._backend_instance.base_url = querit_stub.url
+
+    start = time.perf_counter()
+    result = tool._run("slow")
+    async_result = asyncio.run(tool._arun("slow async"))
+    elapsed = time.perf_counter() - start
+
+    assert result.startswith("Search failed")
+    assert async_result.startswith("Search failed")
+    assert elapsed < 1.0
+
+
+def test_coalesced_caller_keeps_its_own_deadline(querit_stub, make_backend):
+    querit_stub.latency = 0.5
+    backend = make_backend(coalesce=True)
+    leader = threading.Thread(target=backend.search, args=("shared",))
+    leader.start()
+    time.sleep(0.1)
+
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        backend.search("shared", timeout=0.1)
+    elapsed = time.perf_counter() - start
+    leader.join()
+
+    assert elapsed < 0.3
+    assert len(querit_stub.requests) == 1
@@ -0,0 +1,53 @@
+"""
+Import-time behaviour: heavy dependencies load on first use.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+import langchain_websearch
+
+HEAVY = ("langchain_core", "pydantic", "requests", "httpx", "bs4", "numpy")
+
+
+def loaded_after(code):
+    """Modules from ``HEAVY`` imported by running ``code`` in a new interpreter."""
+    check = (
+        f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", check], capture_output=True, text=True, check=True
+    ).stdout
+    return set(output.split())
+
+
+def test_package_import_loads_no_heavy_dependencies():
+    assert loaded_after("import langchain_websearch") == set()
+
+
+def test_light_helpers_stay_light():
+    code = "from langchain_websearch import InMemoryCache, MetricsSink, TokenBucket"
+
+    assert loaded_after(code) == set()
+
+
+def test_tool_creates_backend_on_first_use():
+    code = (
+        "import sys\n"
+        "from langchain_websearch import WebSearchTool\n"
+        "tool = WebSearchTool()\n"
+        "assert 'langchain_websearch.querit_search' not in sys.modules\n"
+        "tool._backend_instance\n"
+        "assert 'langchain_websearch.querit_search' in sys.modules\n"
+    )
+
+    assert {"langchain_core", "pydantic"} <= loaded_after(code)
+
+
+def test_lazy_exports():
+    assert set(langchain_websearch.__all__) <= set(dir(langchain_websearch))
+    assert langchain_websearch.SearchRouter.__name__ == "SearchRouter"
+    with pytest.raises(AttributeError):
+        langchain_websearch.NoSuchThing
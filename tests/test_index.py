@@ -0,0 +1,134 @@
+"""
+Session-local BM25 index over results already fetched.
+"""
+
+import asyncio
+
+import pytest
+
+from langchain_websearch import (
+    InMemorySink,
+    ResultIndex,
+    SearchResult,
+    WebSearchTool,
+)
+
+
+def result(link, title, snippet=""):
+    return SearchResult(
+        title=title, link=link, snippet=snippet, display_link="", position=9
+    )
+
+
+def test_bm25_ranks_by_term_rarity_and_frequency():
+    index = ResultIndex()
+    index.add(
+        [
+            result("https://a.com", "Python asyncio tutorial", "asyncio event loop"),
+            result("https://b.com", "Python packaging", "wheels and sdists"),
+            result("https://c.com", "Rust async", "tokio runtime"),
+        ]
+    )
+
+    ranked = index.search("python asyncio")
+
+    assert [r.link for r, _ in ranked] == ["https://a.com", "https://b.com"]
+    assert ranked[0][1] > ranked[1][1] > 0
+
+
+def test_urls_are_deduplicated():
+    index = ResultIndex()
+    index.add([result("https://a.com/page", "old title")])
+    index.add([result("HTTPS://A.com/page/#top", "new title")])
+
+    assert len(index) == 1
+    assert index.search("title")[0][0].title == "new title"
+    assert index.search("old") == []
+
+
+def test_capacity_drops_least_recently_seen():
+    index = ResultIndex(capacity=2)
+    index.add([result("https://a.com", "alpha"), result("https://b.com", "beta")])
+    index.add([result("https://a.com", "alpha"), result("https://c.com", "gamma")])
+
+    assert len(index) == 2
+    assert index.search("beta") == []
+    assert index._postings.keys() == {"alpha", "gamma"}
+
+
+def test_answer_requires_coverage_and_enough_results():
+    index = ResultIndex(min_results=2, min_coverage=1.0)
+    index.add(
+        [
+            result("https://a.com", "python asyncio"),
+            result("https://b.com", "python threads"),
+        ]
+    )
+
+    answer = index.answer("python")
+    assert [r.position for r in answer] == [1, 2]
+    assert index.answer("python kubernetes") is None
+    assert index.answer("asyncio") is None  # only one match
+    assert (index.hits, index.misses) == (1, 2)
+
+
+@pytest.fixture
+def make_tool(make_backend):
+    def make(index, **kwargs):
+        backend = make_backend(coalesce=False)
+        return WebSearchTool(backend=backend, local_index=index, **kwargs)
+
+    return make
+
+
+def test_tool_answers_follow_ups_locally(querit_stub, make_tool):
+    sink = InMemorySink()
+    tool = make_tool(ResultIndex(), num_results=5, metrics=sink)
+
+    tool._run("python asyncio")
+    follow_up = tool._run("asyncio in python?")
+    asyncio.run(tool._arun("golang generics"))
+
+    assert [r["query"] for r in querit_stub.requests] == [
+        "python asyncio",
+        "golang generics",
+    ]
+    assert "python asyncio result" in follow_up
+    assert (sink.total("local_hit"), sink.total("local_miss")) == (1, 2)
+
+
+def test_batch_results_are_indexed(make_tool):
+    index = ResultIndex()
+    tool = make_tool(index)
+
+    tool.batch_run(["python"])
+
+    assert len(index) == 10
+
+
+def test_batch_answers_covered_queries_locally(querit_stub, make_tool):
+    sink = InMemorySink()
+    tool = make_tool(ResultIndex(), num_results=5, metrics=sink)
+    tool._run("python asyncio")
+
+    outputs = tool.batch_run(["asyncio in python?", "golang generics"])
+    # The stub returns the same URLs for every query, so by now the golang
+    # results have replaced the python ones in the index.
+    async_outputs = asyncio.run(tool.abatch_run(["generics in golang", "rust traits"]))
+
+    assert [r["query"] for r in querit_stub.requests] == [
+        "python asyncio",
+        "golang generics",
+        "rust traits",
+    ]
+    assert "python asyncio result" in outputs[0]
+    assert "golang generics result" in outputs[1]
+    assert "golang generics result" in async_outputs[0]
+    assert "rust traits result" in async_outputs[1]
+    assert sink.total("local_hit") == 2
+
+
+@pytest.mark.parametrize("capacity", [0, -1])
+def test_capacity_must_be_positive(capacity):
+    with pytest.raises(ValueError):
+        ResultIndex(capacity=capacity)
@@ -0,0 +1,146 @@
+"""
+Metrics sinks and LangChain callback events against a local Querit stub.
+"""
+
+import asyncio
+import functools
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+
+from langchain_websearch import (
+    InMemoryCache,
+    InMemorySink,
+    RetryPolicy,
+    WebSearchTool,
+)
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(
+        make_backend, coalesce=False, retry=RetryPolicy(base_delay=0.01)
+    )
+
+
+def make_tool(stub, **kwargs):
+    tool = WebSearchTool(**kwargs)
+    tool._backend_instance.api_key = "test-key"
+    tool._backend_instance.base_url = stub.url
+    return tool
+
+
+def test_search_records_each_stage(make_backend):
+    sink = InMemorySink()
+    backend = make_backend(metrics=sink)
+
+    backend.search("stages")
+
+    assert sink.names("timing") == ["request", "read", "decode", "parse", "search"]
+    assert sink.total("results") == 10
+    assert sink.total("response_bytes") > 0
+
+
+def test_async_search_records_connect(make_backend):
+    sink = InMemorySink()
+    backend = make_backend(metrics=sink)
+
+    async def run():
+        await backend.asearch("stages")
+        await backend.pool.aclose()
+
+    asyncio.run(run())
+
+    timings = sink.names("timing")
+    assert timings[0] == "connect"
+    assert timings[1:] == ["request", "read", "decode", "parse", "search"]
+
+
+def test_call_sink_is_combined_with_backend_sink(make_backend):
+    own, call = InMemorySink(), InMemorySink()
+    backend = make_backend(metrics=own)
+
+    backend.search("both", metrics=call)
+    backend.search("own only")
+
+    assert own.names("timing").count("search") == 2
+    assert call.names("timing").count("search") == 1
+
+
+def test_cache_and_retry_counters(querit_stub, make_backend):
+    querit_stub.statuses["flaky"] = [503, 200]
+    sink = InMemorySink()
+    backend = make_backend(metrics=sink, cache=InMemoryCache())
+
+    backend.search("flaky")
+    backend.search("flaky")
+
+    assert sink.total("cache_miss") == 1
+    assert sink.total("cache_hit") == 1
+    [retry] = [e for e in sink.events if e.name == "retry"]
+    assert retry.tags == {"reason": 503}
+
+
+def test_errors_are_counted(querit_stub, make_backend):
+    querit_stub.statuses["broken"] = 404
+    sink = InMemorySink()
+    backend = make_backend(metrics=sink)
+
+    with pytest.raises(Exception):
+        backend.search("broken")
+
+    [error] = [e for e in sink.events if e.name == "error"]
+    assert error.tags == {"error": "HTTPError"}
+    assert "search" in sink.names("timing")
+
+
+def test_tool_records_format_stage(querit_stub):
+    sink = InMemorySink()
+    tool = make_tool(querit_stub, metrics=sink)
+
+    tool.run("format")
+
+    assert sink.names("timing")[-2:] == ["search", "format"]
+
+
+class _Recorder(BaseCallbackHandler):
+    def __init__(self):
+        self.events = []
+
+    def on_custom_event(self, name, data, **kwargs):
+        self.events.append((name, data))
+
+
+class _AsyncRecorder(AsyncCallbackHandler):
+    def __init__(self):
+        self.events = []
+
+    async def on_custom_event(self, name, data, **kwargs):
+        self.events.append((name, data))
+
+
+def test_tool_dispatches_callback_event(querit_stub):
+    tool = make_tool(querit_stub)
+    recorder = _Recorder()
+
+    tool.run("callbacks", callbacks=[recorder])
+
+    [(name, data)] = recorder.events
+    assert name == "querit_search"
+    names = [event["name"] for event in data["events"]]
+    assert "request" in names and "format" in names
+
+
+def test_async_tool_dispatches_callback_event(querit_stub):
+    tool = make_tool(querit_stub)
+    recorder = _AsyncRecorder()
+
+    async def run():
+        await tool.arun("callbacks", callbacks=[recorder])
+        await tool._backend_instance.pool.aclose()
+
+    asyncio.run(run())
+
+    [(name, data)] = recorder.events
+    assert name == "querit_search"
+    assert any(event["name"] == "connect" for event in data["events"])
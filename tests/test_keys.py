@@ -0,0 +1,101 @@
+"""
+API key pooling and quota accounting.
+"""
+
+import asyncio
+import functools
+import time
+
+import pytest
+
+from langchain_websearch import KeyPool, QueritSearchBackend, RetryPolicy
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(
+        make_backend, api_key=None, coalesce=False, retry=RetryPolicy(base_delay=1.0)
+    )
+
+
+def test_local_limit_spreads_and_exhausts_keys():
+    pool = KeyPool(["key-1", "key-2"], limit=2)
+
+    keys = [pool.acquire() for _ in range(4)]
+
+    assert sorted(keys) == ["key-1", "key-1", "key-2", "key-2"]
+    assert pool.acquire(timeout=0) is None
+    assert [s.utilization for s in pool.stats()] == [1.0, 1.0]
+    assert [s.key for s in pool.stats()] == ["...ey-1", "...ey-2"]
+
+
+def test_key_with_most_reported_budget_is_preferred():
+    pool = KeyPool(["key-1", "key-2"])
+    pool.record("key-1", 200, {"X-RateLimit-Remaining": "1"})
+    pool.record(
+        "key-2", 200, {"X-RateLimit-Remaining": "50", "X-RateLimit-Limit": "60"}
+    )
+
+    assert {pool.acquire() for _ in range(5)} == {"key-2"}
+    assert pool.stats()[1].remaining == 45
+
+
+def test_rate_limited_key_is_benched_until_retry_after():
+    pool = KeyPool(["key-1", "key-2"])
+    pool.record("key-1", 429, {"Retry-After": "0.1"})
+
+    assert {pool.acquire() for _ in range(3)} == {"key-2"}
+    assert pool.stats()[0].rate_limited == 1
+
+    time.sleep(0.12)
+    assert "key-1" in {pool.acquire() for _ in range(3)}
+
+
+def test_acquire_waits_for_a_benched_key():
+    pool = KeyPool(["only"])
+    pool.record("only", 429, {"Retry-After": "0.1"})
+
+    assert pool.acquire(timeout=0.01) is None
+    start = time.perf_counter()
+    assert pool.acquire() == "only"
+    assert time.perf_counter() - start >= 0.08
+
+
+def test_backend_moves_to_another_key_after_429(querit_stub, make_backend):
+    querit_stub.limited_keys.add("key-1")
+    pool = KeyPool(["key-1", "key-2"])
+    backend = make_backend(key_pool=pool)
+
+    start = time.perf_counter()
+    for i in range(3):
+        assert backend.search(f"q{i}")[0].title == f"q{i} result 0"
+    elapsed = time.perf_counter() - start
+
+    assert querit_stub.api_keys.count("key-1") == 1
+    assert querit_stub.api_keys.count("key-2") == 3
+    assert backend.stats.rate_limited == 1
+    # The retry went straight to the free key instead of backing off.
+    assert elapsed < 0.5
+
+
+def test_async_backend_uses_key_pool(querit_stub, make_backend):
+    pool = KeyPool(["key-1", "key-2"])
+    backend = make_backend(key_pool=pool)
+
+    async def run():
+        await asyncio.gather(*(backend.asearch(f"q{i}") for i in range(4)))
+        await backend.pool.aclose()
+
+    asyncio.run(run())
+
+    assert sorted(querit_stub.api_keys) == ["key-1", "key-1", "key-2", "key-2"]
+
+
+def test_key_pool_from_environment(monkeypatch):
+    monkeypatch.setenv("QUERIT_API_KEYS", "key-1, key-2,")
+    monkeypatch.delenv("QUERIT_API_KEY", raising=False)
+
+    backend = QueritSearchBackend()
+
+    assert backend.validate_credentials()
+    assert [s.key for s in backend.key_pool.stats()] == ["...ey-1", "...ey-2"]
@@ -0,0 +1,132 @@
+"""
+Adaptive concurrency limiting.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+
+import pytest
+import requests
+
+from langchain_websearch import (
+    AdaptiveLimiter,
+    InMemorySink,
+    RetryPolicy,
+)
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(
+        make_backend, coalesce=False, retry=RetryPolicy(max_attempts=1)
+    )
+
+
+def fill(limiter):
+    for _ in range(limiter.limit):
+        assert limiter.acquire(timeout=0)
+
+
+def run_round(limiter, latency):
+    """Fill the limit, then release every slot with ``latency``."""
+    fill(limiter)
+    for _ in range(limiter.in_flight):
+        limiter.release(latency)
+
+
+@pytest.mark.parametrize("algorithm", ["aimd", "gradient"])
+def test_limit_grows_while_latency_is_flat(algorithm):
+    limiter = AdaptiveLimiter(initial_limit=4, algorithm=algorithm)
+
+    for _ in range(5):
+        run_round(limiter, 0.05)
+
+    assert limiter.limit > 4
+
+
+@pytest.mark.parametrize("algorithm", ["aimd", "gradient"])
+def test_limit_shrinks_when_latency_rises(algorithm):
+    limiter = AdaptiveLimiter(initial_limit=20, algorithm=algorithm)
+    run_round(limiter, 0.05)
+    grown = limiter.limit
+
+    for _ in range(3):
+        run_round(limiter, 0.5)
+
+    assert limiter.limit < grown
+
+
+def test_idle_limit_does_not_grow():
+    limiter = AdaptiveLimiter(initial_limit=10)
+
+    for _ in range(50):
+        limiter.acquire()
+        limiter.release(0.05)
+
+    assert limiter.limit == 10
+
+
+def test_drops_back_off_to_the_minimum():
+    sink = InMemorySink()
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, metrics=sink)
+
+    for _ in range(30):
+        limiter.acquire()
+        limiter.release(0.05, dropped=True)
+
+    assert limiter.limit == 2
+    assert limiter.dropped == 30
+    assert set(sink.names("observe")) == {"concurrency_limit"}
+
+
+def test_waiters_are_woken_by_release():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    limiter.acquire()
+    assert limiter.acquire(timeout=0.05) is False
+
+    threading.Timer(0.05, limiter.release, args=(None,)).start()
+    assert limiter.acquire(timeout=2)
+
+    async def wait_async():
+        threading.Timer(0.05, limiter.release, args=(None,)).start()
+        return await limiter.aacquire(timeout=2)
+
+    assert asyncio.run(wait_async())
+    assert limiter.in_flight == 1
+
+
+def test_batch_and_async_paths_share_the_limit(querit_stub, make_backend):
+    querit_stub.latency = 0.1
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    backend = make_backend(limiter=limiter)
+
+    start = time.perf_counter()
+    backend.search_many([f"q{i}" for i in range(4)], max_concurrency=4)
+    asyncio.run(backend.asearch_many([f"a{i}" for i in range(4)], max_concurrency=4))
+
+    # Two at a time: each batch of four takes two rounds of 0.1s.
+    assert time.perf_counter() - start >= 0.4
+    assert len(querit_stub.requests) == 8
+    assert limiter.in_flight == 0
+
+
+def test_overload_errors_shrink_the_limit(querit_stub, make_backend):
+    querit_stub.statuses["busy"] = 503
+    sink = InMemorySink()
+    limiter = AdaptiveLimiter(initial_limit=10)
+    backend = make_backend(limiter=limiter, metrics=sink)
+
+    with pytest.raises(requests.HTTPError):
+        backend.search("busy")
+
+    assert limiter.limit == 9 and limiter.in_flight == 0
+    assert sink.total("concurrency_limit") == 9
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(initial_limit=5, max_limit=2)
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(algorithm="vegas")
@@ -0,0 +1,70 @@
+"""
+Upstream result counts and pagination against a local Querit stub.
+"""
+
+import asyncio
+import time
+
+from langchain_websearch import QueritSearchBackend
+
+
+def page_requests(stub):
+    return sorted((p["count"], p.get("offset", 0)) for p in stub.requests)
+
+
+def test_small_searches_request_only_what_they_need(querit_stub, make_backend):
+    results = make_backend().search("python", num_results=3)
+
+    assert len(results) == 3
+    assert page_requests(querit_stub) == [(3, 0)]
+
+
+def test_large_searches_fetch_pages_concurrently(querit_stub, make_backend):
+    querit_stub.latency = 0.3
+    backend = make_backend()
+
+    start = time.perf_counter()
+    results = backend.search("python", num_results=25)
+    elapsed = time.perf_counter() - start
+
+    assert page_requests(querit_stub) == [(5, 20), (10, 0), (10, 10)]
+    assert [r.position for r in results] == list(range(1, 26))
+    assert len({r.link for r in results}) == 25
+    assert elapsed < 0.3 * 2
+
+
+def test_async_search_fetches_pages_concurrently(querit_stub, make_backend):
+    querit_stub.latency = 0.3
+    backend = make_backend()
+
+    start = time.perf_counter()
+    results = asyncio.run(backend.asearch("python", num_results=50))
+    elapsed = time.perf_counter() - start
+
+    assert len(querit_stub.requests) == 5
+    assert [r.title for r in results] == [f"python result {i}" for i in range(50)]
+    assert elapsed < 0.3 * 2
+
+
+def test_short_result_sets_are_not_padded(querit_stub, make_backend):
+    querit_stub.result_count = 12
+
+    results = make_backend().search("python", num_results=30)
+
+    assert len(results) == 12
+
+
+def test_results_are_deduplicated_by_url_across_pages():
+    backend = QueritSearchBackend(api_key="test-key")
+    pages = [
+        {"results": {"result": [{"url": "https://a"}, {"url": "https://b"}]}},
+        {"results": {"result": [{"url": "https://b"}, {"url": "https://c"}]}},
+    ]
+
+    results = backend._parse_results(pages, num_results=10)
+
+    assert [(r.link, r.position) for r in results] == [
+        ("https://a", 1),
+        ("https://b", 2),
+        ("https://c", 3),
+    ]
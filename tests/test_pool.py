@@ -0,0 +1,67 @@
+"""
+Connection pooling against a local Querit stub.
+"""
+
+import asyncio
+import time
+
+from langchain_websearch import ConnectionPool, QueritSearchBackend, get_default_pool
+
+
+def test_backends_share_default_pool():
+    assert QueritSearchBackend().pool is get_default_pool()
+    assert QueritSearchBackend().pool is QueritSearchBackend().pool
+
+
+def test_sequential_searches_reuse_connection(querit_stub, make_backend):
+    pool = ConnectionPool(pool_size=2)
+    first, second = make_backend(pool=pool), make_backend(pool=pool)
+
+    for i in range(5):
+        first.search(f"q{i}")
+        second.search(f"q{i}")
+
+    assert len(querit_stub.requests) == 10
+    assert len(querit_stub.connections) == 1
+    pool.close()
+
+
+def test_idle_session_is_evicted(querit_stub, make_backend):
+    pool = ConnectionPool(idle_timeout=0.05)
+    backend = make_backend(pool=pool)
+
+    backend.search("first")
+    time.sleep(0.1)
+    backend.search("second")
+
+    assert len(querit_stub.connections) == 2
+    pool.close()
+
+
+def test_session_in_use_is_not_evicted():
+    pool = ConnectionPool(idle_timeout=0.05)
+
+    with pool.checkout() as session:
+        time.sleep(0.1)
+        assert pool.session() is session
+        with pool.checkout() as again:
+            assert again is session
+
+    time.sleep(0.1)
+    assert pool.session() is not session
+    pool.close()
+
+
+def test_async_searches_reuse_connection(querit_stub, make_backend):
+    pool = ConnectionPool()
+    backend = make_backend(pool=pool)
+
+    async def run():
+        for i in range(5):
+            await backend.asearch(f"q{i}")
+        await pool.aclose()
+
+    asyncio.run(run())
+
+    assert len(querit_stub.requests) == 5
+    assert len(querit_stub.connections) == 1
@@ -0,0 +1,77 @@
+"""
+Frequency tracking and background prefetching of hot queries.
+"""
+
+import functools
+
+import pytest
+
+from langchain_websearch import (
+    CountMinSketch,
+    InMemoryCache,
+    Prefetcher,
+    QueritSearchBackend,
+)
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(make_backend, coalesce=False, cache=InMemoryCache())
+
+
+def test_sketch_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    for i in range(500):
+        sketch.add(f"q{i % 50}")
+
+    assert all(sketch.estimate(f"q{i}") >= 10 for i in range(50))
+    sketch.decay()
+    assert sketch.estimate("q0") >= 5
+
+
+def test_hot_ranks_by_frequency():
+    prefetcher = Prefetcher(top_n=2)
+    for entry, count in [("a", 1), ("b", 5), ("c", 3)]:
+        for _ in range(count):
+            prefetcher.record(entry)
+
+    assert prefetcher.hot() == ["b", "c"]
+
+
+def test_run_once_refreshes_due_hot_queries(querit_stub, make_backend):
+    prefetcher = Prefetcher(top_n=1, refresh_after=0, interval=3600)
+    backend = make_backend(prefetch=prefetcher)
+    backend.search("python")
+    backend.search("python")
+    backend.search("rust")
+
+    assert prefetcher.run_once() == 1
+
+    assert [r["query"] for r in querit_stub.requests] == ["python", "rust", "python"]
+    assert prefetcher.prefetched == 1
+    prefetcher.stop()
+
+
+def test_recently_fetched_queries_are_skipped(make_backend):
+    prefetcher = Prefetcher(refresh_after=3600, interval=3600)
+    backend = make_backend(prefetch=prefetcher)
+    backend.search("python")
+
+    assert prefetcher.run_once() == 0
+    prefetcher.stop()
+
+
+def test_budget_caps_refreshes_per_window(make_backend):
+    prefetcher = Prefetcher(budget=2, refresh_after=0, interval=3600)
+    backend = make_backend(prefetch=prefetcher)
+    for query in ["a", "b", "c"]:
+        backend.search(query)
+
+    assert prefetcher.run_once() == 2
+    assert prefetcher.run_once() == 0
+    prefetcher.stop()
+
+
+def test_prefetch_requires_a_cache():
+    with pytest.raises(ValueError):
+        QueritSearchBackend(api_key="k", prefetch=Prefetcher())
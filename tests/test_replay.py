@@ -0,0 +1,150 @@
+"""
+Recording traffic to an archive and replaying it offline.
+"""
+
+import asyncio
+import functools
+import time
+
+import pytest
+import requests
+
+from langchain_websearch import (
+    ConnectionPool,
+    QueritSearchBackend,
+    RecordingTransport,
+    ReplayMiss,
+    ReplayTransport,
+    RetryPolicy,
+    TrafficArchive,
+)
+
+OFFLINE_URL = "http://127.0.0.1:9/v1/search"
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(
+        make_backend, coalesce=False, retry=RetryPolicy(max_attempts=1)
+    )
+
+
+def record(make_backend, path, queries):
+    backend = make_backend(transport=RecordingTransport(path))
+    results = [backend.search(query) for query in queries]
+    backend.pool.transport.archive.close()
+    return results
+
+
+def test_replay_serves_recorded_responses_offline(querit_stub, tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+    recorded = record(make_backend, path, ["python", "rust"])
+
+    backend = make_backend(base_url=OFFLINE_URL, transport=ReplayTransport(path))
+
+    assert backend.search("rust") == recorded[1]
+    assert backend.search("python") == recorded[0]
+    assert len(querit_stub.requests) == 2
+
+
+def test_archive_contents(tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+    record(make_backend, path, ["python", "python"])
+
+    archive = TrafficArchive(path)
+    exchanges = list(archive)
+
+    assert len(archive) == 2
+    assert exchanges[0].request == {
+        "method": "POST",
+        "path": "/v1/search",
+        "body": {"count": 10, "query": "python"},
+    }
+    assert exchanges[0].status == 200
+    assert b"test-key" not in path.read_bytes()
+
+
+def test_unrecorded_request_raises(tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+    record(make_backend, path, ["python"])
+
+    backend = make_backend(base_url=OFFLINE_URL, transport=ReplayTransport(path))
+
+    with pytest.raises(ReplayMiss):
+        backend.search("golang")
+
+
+def test_errors_replay_too(querit_stub, tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+    querit_stub.statuses["broken"] = 500
+    backend = make_backend(transport=RecordingTransport(path))
+    with pytest.raises(requests.HTTPError):
+        backend.search("broken")
+
+    replay = make_backend(base_url=OFFLINE_URL, transport=ReplayTransport(path))
+
+    with pytest.raises(requests.HTTPError) as info:
+        replay.search("broken")
+    assert info.value.response.status_code == 500
+
+
+def test_async_record_and_replay(tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+
+    async def run():
+        backend = make_backend(transport=RecordingTransport(path))
+        recorded = await backend.asearch("python", num_results=15)
+        await backend.pool.aclose()
+        backend.pool.transport.archive.close()
+
+        replay = make_backend(base_url=OFFLINE_URL, transport=ReplayTransport(path))
+        assert await replay.asearch("python", num_results=15) == recorded
+        await replay.pool.aclose()
+
+    asyncio.run(run())
+
+
+def test_streamed_search_replays(tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+    recorded = record(make_backend, path, ["python"])[0]
+
+    backend = make_backend(base_url=OFFLINE_URL, transport=ReplayTransport(path))
+
+    assert list(backend.iter_search("python")) == recorded
+
+
+def test_recorded_latency_is_replayed_at_speed(querit_stub, tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+    querit_stub.latency = 0.2
+    record(make_backend, path, ["python"])
+
+    def elapsed(speed):
+        backend = make_backend(
+            base_url=OFFLINE_URL, transport=ReplayTransport(path, speed=speed)
+        )
+        start = time.perf_counter()
+        backend.search("python")
+        return time.perf_counter() - start
+
+    assert elapsed(None) < 0.1
+    assert elapsed(1.0) >= 0.2
+    assert elapsed(4.0) < 0.15
+
+
+def test_truncated_record_is_ignored(tmp_path, make_backend):
+    path = tmp_path / "traffic.qrpl"
+    record(make_backend, path, ["python", "rust"])
+    path.write_bytes(path.read_bytes()[:-10])
+
+    archive = TrafficArchive(path)
+
+    assert len(archive) == 1
+
+
+def test_pool_and_transport_are_exclusive(tmp_path):
+    with pytest.raises(ValueError):
+        QueritSearchBackend(
+            api_key="k",
+            pool=ConnectionPool(),
+            transport=ReplayTransport(tmp_path / "traffic.qrpl"),
+        )
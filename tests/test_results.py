@@ -0,0 +1,61 @@
+"""
+Result types and the validation-free parse path.
+"""
+
+import pytest
+
+from langchain_websearch import (
+    CompactResult,
+    SearchResult,
+    WebSearchTool,
+)
+
+
+def test_fast_results_match_validated_results(make_backend):
+    validated = make_backend().search("python", num_results=15)
+    fast = make_backend(fast_results=True).search("python", num_results=15)
+
+    assert all(isinstance(r, SearchResult) for r in validated)
+    assert all(isinstance(r, CompactResult) for r in fast)
+    assert [r.to_model() for r in fast] == validated
+
+
+def test_fast_results_apply_to_streaming(make_backend):
+    backend = make_backend(fast_results=True)
+
+    results = list(backend.iter_search("python", num_results=3))
+
+    assert results == [
+        CompactResult(
+            f"python result {i}",
+            f"https://example.com/{i}",
+            f"Snippet {i} for python",
+            "example.com",
+            i + 1,
+        )
+        for i in range(3)
+    ]
+
+
+def test_compact_result_has_no_instance_dict():
+    result = CompactResult("t", "l", "s", "d", 1)
+
+    with pytest.raises(AttributeError):
+        result.__dict__
+
+
+def test_format_is_the_same_for_both_result_types():
+    tool = WebSearchTool()
+    compact = [CompactResult(f"t{i}", f"l{i}", f"s{i}", "d", i) for i in (1, 2)]
+
+    formatted = tool._format_results(compact)
+
+    assert formatted == tool._format_results([r.to_model() for r in compact])
+    assert formatted == (
+        "1. t1\n   URL: l1\n   Preview: s1\n\n" "2. t2\n   URL: l2\n   Preview: s2\n"
+    )
+
+
+def test_tool_opts_in_through_constructor():
+    assert WebSearchTool(fast_results=True)._backend_instance.fast_results
+    assert not WebSearchTool()._backend_instance.fast_results
@@ -0,0 +1,113 @@
+"""
+Rate limiting and retries against a local Querit stub.
+"""
+
+import asyncio
+import functools
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from langchain_websearch import RetryPolicy, TokenBucket
+from langchain_websearch.retry import retry_after_seconds
+
+
+@pytest.fixture
+def make_backend(make_backend):
+    return functools.partial(
+        make_backend, coalesce=False, retry=RetryPolicy(base_delay=0.01)
+    )
+
+
+def test_transient_errors_are_retried(querit_stub, make_backend):
+    querit_stub.statuses["flaky"] = [503, 502, 200]
+    backend = make_backend()
+
+    results = backend.search("flaky")
+
+    assert results[0].title == "flaky result 0"
+    assert len(querit_stub.requests) == 3
+    assert backend.stats.retried == 2
+
+
+def test_async_transient_errors_are_retried(querit_stub, make_backend):
+    querit_stub.statuses["flaky"] = [500, 200]
+    backend = make_backend()
+
+    results = asyncio.run(backend.asearch("flaky"))
+
+    assert results[0].title == "flaky result 0"
+    assert backend.stats.retried == 1
+
+
+def test_client_errors_are_not_retried(querit_stub, make_backend):
+    querit_stub.statuses["bad"] = 401
+    backend = make_backend()
+
+    with pytest.raises(requests.HTTPError):
+        backend.search("bad")
+
+    assert len(querit_stub.requests) == 1
+
+
+def test_retry_after_is_honored(querit_stub, make_backend):
+    querit_stub.statuses["busy"] = [429, 200]
+    querit_stub.retry_after = "0.3"
+    backend = make_backend()
+
+    start = time.perf_counter()
+    backend.search("busy")
+
+    assert time.perf_counter() - start >= 0.3
+    assert backend.stats.rate_limited == 1
+
+
+def test_retries_stop_at_the_deadline(querit_stub, make_backend):
+    querit_stub.statuses["busy"] = 429
+    querit_stub.retry_after = "5"
+    backend = make_backend(retry=RetryPolicy(max_attempts=5, deadline=1))
+
+    start = time.perf_counter()
+    with pytest.raises(requests.HTTPError):
+        backend.search("busy")
+
+    assert time.perf_counter() - start < 1
+    assert len(querit_stub.requests) == 1
+
+
+def test_token_bucket_paces_sync_and_async_callers(make_backend):
+    bucket = TokenBucket(rate=20, capacity=1)
+    backend = make_backend(rate_limiter=bucket)
+
+    async def run_async():
+        await asyncio.gather(*(backend.asearch(f"a{i}") for i in range(5)))
+
+    start = time.perf_counter()
+    for i in range(5):
+        backend.search(f"s{i}")
+    asyncio.run(run_async())
+    elapsed = time.perf_counter() - start
+
+    # 10 calls at 20/s with a burst of 1 need at least 9 / 20 seconds.
+    assert elapsed >= 0.45
+    assert bucket.throttled >= 9
+
+
+def test_token_bucket_gives_up_past_timeout():
+    bucket = TokenBucket(rate=1, capacity=1)
+
+    assert bucket.acquire()
+    assert not bucket.acquire(timeout=0.1)
+
+
+@pytest.mark.parametrize("usegmt", [True, False])
+def test_retry_after_http_date(usegmt):
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    # A naive datetime is rendered with "-0000".
+    when = retry_at if usegmt else retry_at.replace(tzinfo=None)
+    value = format_datetime(when, usegmt=usegmt)
+
+    assert retry_after_seconds(value) == pytest.approx(30, abs=2)
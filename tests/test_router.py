@@ -0,0 +1,188 @@
+"""
+Routing, circuit breaking and result fusion across several backends.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from langchain_websearch import (
+    BatchSearchMixin,
+    CircuitBreaker,
+    HedgePolicy,
+    InMemoryCache,
+    SearchResult,
+    SearchRouter,
+    WebSearchTool,
+)
+
+
+def result(url, position=1):
+    return SearchResult(
+        title=url, link=url, snippet="", display_link="", position=position
+    )
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+class FakeBackend(BatchSearchMixin):
+    def __init__(self, urls=("https://a.example",), error=None, gate=None):
+        self.urls = list(urls)
+        self.error = error
+        self.gate = gate
+        self.calls = 0
+
+    def search(self, query, num_results=10, **kwargs):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return [result(url, i) for i, url in enumerate(self.urls, 1)]
+
+    async def asearch(self, query, num_results=10, **kwargs):
+        return self.search(query, num_results, **kwargs)
+
+
+def test_round_robin_alternates_backends():
+    first, second = FakeBackend(), FakeBackend()
+    router = SearchRouter([first, second])
+
+    for _ in range(4):
+        router.search("q")
+
+    assert (first.calls, second.calls) == (2, 2)
+
+
+def test_least_loaded_avoids_busy_backend():
+    gate = threading.Event()
+    busy, idle = FakeBackend(gate=gate), FakeBackend()
+    router = SearchRouter([busy, idle], mode="least_loaded")
+    worker = threading.Thread(target=router.search, args=("slow",))
+    worker.start()
+    time.sleep(0.05)
+
+    router.search("a")
+    router.search("b")
+    gate.set()
+    worker.join()
+
+    assert (busy.calls, idle.calls) == (1, 2)
+
+
+def test_failing_backend_is_taken_out_of_rotation():
+    broken = FakeBackend(error=requests.ConnectionError("down"))
+    healthy = FakeBackend()
+    router = SearchRouter([broken, healthy], failure_threshold=2)
+
+    for _ in range(6):
+        assert router.search("q")[0].link == "https://a.example"
+
+    assert broken.calls == 2
+    assert router.breakers[0].state == CircuitBreaker.OPEN
+    assert router.healthy() == [healthy]
+
+
+def test_open_breaker_lets_a_probe_through_after_reset():
+    flaky = FakeBackend(error=http_error(503))
+    router = SearchRouter([flaky], failure_threshold=1, reset_timeout=0.05)
+
+    with pytest.raises(requests.HTTPError):
+        router.search("q")
+    with pytest.raises(RuntimeError):
+        router.search("q")
+
+    flaky.error = None
+    time.sleep(0.06)
+    router.search("q")
+
+    assert router.breakers[0].state == CircuitBreaker.CLOSED
+
+
+def test_query_errors_do_not_trip_the_breaker():
+    backend = FakeBackend(error=http_error(400))
+    other = FakeBackend()
+    router = SearchRouter([backend, other], failure_threshold=1)
+
+    with pytest.raises(requests.HTTPError):
+        router.search("bad")
+
+    assert other.calls == 0
+    assert router.breakers[0].state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("error", [ValueError("bad query"), KeyError("results")])
+def test_errors_without_a_status_do_not_trip_the_breaker(error):
+    backend = FakeBackend(error=error)
+    other = FakeBackend()
+    router = SearchRouter([backend, other], failure_threshold=1)
+
+    with pytest.raises(type(error)):
+        router.search("bad")
+
+    assert other.calls == 0
+    assert router.breakers[0].state == CircuitBreaker.CLOSED
+    assert router.breakers[0].failures == 0
+
+
+def test_timeouts_trip_the_breaker():
+    backend = FakeBackend(error=TimeoutError("deadline"))
+    other = FakeBackend()
+    router = SearchRouter([backend, other], failure_threshold=1)
+
+    router.search("q")
+
+    assert other.calls == 1
+    assert router.breakers[0].state == CircuitBreaker.OPEN
+
+
+def test_fanout_fuses_rankings_and_dedupes_urls():
+    first = FakeBackend(["https://1", "https://2", "https://3"])
+    second = FakeBackend(["https://2", "https://4"])
+    router = SearchRouter([first, second], mode="fanout")
+
+    results = router.search("q")
+
+    assert [r.link for r in results] == [
+        "https://2",
+        "https://1",
+        "https://4",
+        "https://3",
+    ]
+    assert [r.position for r in results] == [1, 2, 3, 4]
+
+
+def test_async_fanout_tolerates_a_failing_backend():
+    broken = FakeBackend(error=requests.ConnectionError("down"))
+    healthy = FakeBackend(["https://1", "https://2"])
+    router = SearchRouter([broken, healthy], mode="fanout")
+
+    results = asyncio.run(router.asearch("q", num_results=1))
+
+    assert [r.link for r in results] == ["https://1"]
+    assert router.breakers[0].failures == 1
+
+
+def test_tool_searches_through_router(querit_stub, make_backend):
+    backends = [make_backend(api_key=key, coalesce=False) for key in ("key-1", "key-2")]
+    tool = WebSearchTool(backend=SearchRouter(backends), num_results=2)
+
+    assert tool.run("python").startswith("1. python result 0")
+    assert tool.batch_run(["a", "b"])[1].startswith("1. b result 0")
+    assert len(querit_stub.requests) == 3
+
+
+@pytest.mark.parametrize(
+    "field",
+    [{"cache": InMemoryCache()}, {"fast_results": True}, {"hedge": HedgePolicy()}],
+)
+def test_tool_rejects_default_backend_fields_with_backend(field):
+    with pytest.raises(ValueError):
+        WebSearchTool(backend=FakeBackend(), **field)
@@ -0,0 +1,77 @@
+"""
+Near-duplicate query caching.
+"""
+
+import pytest
+
+from langchain_websearch import SemanticCache, canonicalize
+
+
+def bag_of_words(text):
+    # Toy embedding: one dimension per word, with "recent" close to "latest".
+    vocabulary = ["python", "news", "latest", "rust", "release"]
+    words = text.split()
+    vector = [float(word in words) for word in vocabulary]
+    if "recent" in words:
+        vector[2] = 0.8
+    return vector
+
+
+def test_canonicalize_ignores_case_order_and_stopwords():
+    assert canonicalize("Latest Python news") == "latest news python"
+    assert canonicalize("what is the  python news, latest?") == "latest news python"
+    assert canonicalize("to be or not") == "not"
+    assert canonicalize("the a") == "a the"
+
+
+def test_rephrased_query_hits_the_cache(querit_stub, make_backend):
+    cache = SemanticCache()
+    backend = make_backend(cache=cache)
+
+    first = backend.search("latest python news")
+    second = backend.search("Python news, the latest")
+
+    assert second == first
+    assert len(querit_stub.requests) == 1
+    assert cache.stats.hits == 1
+
+
+def test_similar_embedding_hits_the_cache(querit_stub, make_backend):
+    pytest.importorskip("numpy")
+    cache = SemanticCache(embed=bag_of_words, threshold=0.9)
+    backend = make_backend(cache=cache)
+
+    backend.search("latest python news")
+    backend.search("recent python news")
+    backend.search("latest rust news")
+
+    assert [p["query"] for p in querit_stub.requests] == [
+        "latest python news",
+        "latest rust news",
+    ]
+    assert cache.near_hits == 1
+
+
+def test_near_hits_require_matching_parameters(querit_stub, make_backend):
+    pytest.importorskip("numpy")
+    cache = SemanticCache(embed=bag_of_words)
+    backend = make_backend(cache=cache)
+
+    backend.search("latest python news", num_results=3)
+    backend.search("recent python news", num_results=5)
+
+    assert len(querit_stub.requests) == 2
+    assert cache.near_hits == 0
+
+
+def test_index_is_bounded_and_evicts_oldest():
+    pytest.importorskip("numpy")
+    cache = SemanticCache(embed=bag_of_words, capacity=2)
+
+    for query in ("python", "rust", "news"):
+        cache.set(cache.make_key(query, 10), [query])
+
+    assert len(cache.index) == 2
+    assert cache.stats.evictions == 1
+    assert cache.get(cache.make_key("python release", 10)) is None
+    assert cache.get(cache.make_key("rust", 10)) == ["rust"]
@@ -0,0 +1,97 @@
+"""
+Cache and rate-limit state shared between processes.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from langchain_websearch import (
+    RedisStore,
+    SharedCache,
+    SharedTokenBucket,
+    SQLiteStore,
+)
+
+
+def take_tokens(path, attempts):
+    bucket = SharedTokenBucket(SQLiteStore(path), rate=0.001, capacity=10)
+    return sum(bucket.acquire(timeout=0) for _ in range(attempts))
+
+
+def test_bucket_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    SQLiteStore(path).get("warm")  # create the schema once
+
+    with multiprocessing.get_context("spawn").Pool(3) as pool:
+        taken = pool.starmap(take_tokens, [(path, 8)] * 3)
+
+    assert sum(taken) == 10
+
+
+def test_bucket_waits_like_a_local_bucket(tmp_path):
+    bucket = SharedTokenBucket(SQLiteStore(str(tmp_path / "s.db")), rate=20)
+
+    start = time.perf_counter()
+    for _ in range(25):
+        bucket.acquire()
+
+    assert time.perf_counter() - start >= 0.2
+    assert bucket.throttled > 0
+    assert bucket.acquire(timeout=0) is False
+
+
+def test_cache_is_shared_between_backends(querit_stub, tmp_path, make_backend):
+    path = str(tmp_path / "shared.db")
+
+    def backend():
+        return make_backend(cache=SharedCache(SQLiteStore(path), ttl=60))
+
+    first = backend().search("python", num_results=3)
+    second = backend().search("python", num_results=3)
+
+    assert len(querit_stub.requests) == 1
+    assert second == first
+
+
+def test_cache_ttl_and_stale_window(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"))
+    cache = SharedCache(store, ttl=0.05, stale_ttl=0.1)
+    cache.set("a", [])
+    time.sleep(0.07)
+
+    assert cache.get("a") is None
+    assert cache.lookup("a").stale
+
+    time.sleep(0.1)
+    assert cache.lookup("a") is None
+    assert store.get("cache:a") is None
+
+
+def test_clear_only_touches_its_prefix(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"))
+    store.set("cache:a", b"1")
+    store.set("other", b"2")
+
+    SharedCache(store).clear()
+
+    assert store.get("cache:a") is None
+    assert store.get("other") == b"2"
+
+
+def test_redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    store = RedisStore(fakeredis.FakeRedis())
+
+    store.set("k", b"v", ttl=10)
+    assert store.get("k") == b"v"
+    assert store.reserve("b", 1, rate=1, capacity=1, timeout=0) == 0
+    assert store.reserve("b", 1, rate=1, capacity=1, timeout=0) is None
+
+    store.set("cache:[a]", b"1")
+    store.set("cache-b", b"2")
+    store.clear("cache:[")
+    assert store.get("cache:[a]") is None
+    assert store.get("cache-b") == b"2"
@@ -0,0 +1,106 @@
+"""
+Coalescing of identical in-flight searches against a local Querit stub.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from langchain_websearch import WebSearchTool
+from langchain_websearch.singleflight import SingleFlight
+
+
+def search_concurrently(backend, query, n):
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        futures = [executor.submit(backend.search, query) for _ in range(n)]
+    return [f.exception() or f.result() for f in futures]
+
+
+def test_concurrent_identical_searches_share_one_request(querit_stub, make_backend):
+    querit_stub.latency = 0.3
+    outcomes = search_concurrently(make_backend(), "trending", 10)
+
+    assert len(querit_stub.requests) == 1
+    assert all(o[0].title == "trending result 0" for o in outcomes)
+    assert len({id(o) for o in outcomes}) == len(outcomes)
+
+
+def test_concurrent_identical_searches_share_the_error(querit_stub, make_backend):
+    querit_stub.latency = 0.3
+    querit_stub.statuses["trending"] = 404
+    outcomes = search_concurrently(make_backend(), "trending", 5)
+
+    assert len(querit_stub.requests) == 1
+    assert all(isinstance(o, Exception) for o in outcomes)
+
+
+def test_coalescing_can_be_disabled(querit_stub, make_backend):
+    querit_stub.latency = 0.3
+    search_concurrently(make_backend(coalesce=False), "trending", 4)
+
+    assert len(querit_stub.requests) == 4
+
+
+def test_backends_do_not_share_flights(querit_stub, make_backend):
+    querit_stub.latency = 0.3
+    models = make_backend()
+    tuples = make_backend(fast_results=True)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(models.search, "trending")
+        second = executor.submit(tuples.search, "trending")
+
+    assert len(querit_stub.requests) == 2
+    assert type(first.result()[0]).__name__ == "SearchResult"
+    assert type(second.result()[0]).__name__ == "CompactResult"
+
+
+def test_separate_tools_share_one_request(querit_stub):
+    querit_stub.latency = 0.3
+    tools = [WebSearchTool() for _ in range(8)]
+    for tool in tools:
+        tool._backend_instance.api_key = "test-key"
+        tool._backend_instance.base_url = querit_stub.url
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outputs = list(executor.map(lambda tool: tool._run("trending"), tools))
+
+    assert len(querit_stub.requests) == 1
+    assert len(set(outputs)) == 1
+
+
+def test_concurrent_identical_asearches_share_one_request(querit_stub, make_backend):
+    querit_stub.latency = 0.3
+    backend = make_backend()
+
+    async def run():
+        return await asyncio.gather(*(backend.asearch("trending") for _ in range(10)))
+
+    outcomes = asyncio.run(run())
+
+    assert len(querit_stub.requests) == 1
+    assert all(o[0].title == "trending result 0" for o in outcomes)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.ado("k", slow))
+        second = asyncio.ensure_future(flights.ado("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+    assert calls == [1]
+    assert flights.in_flight() == 0
@@ -0,0 +1,102 @@
+"""
+Incremental result delivery against a local Querit stub.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from langchain_websearch import InMemoryCache
+from langchain_websearch.streaming import ResultStreamParser
+
+from benchmarks.stub_server import make_results
+
+
+def slow_stream(stub):
+    # Each chunk holds roughly one result, so a full page takes ~1.1s.
+    stub.chunk_size = 120
+    stub.chunk_delay = 0.1
+
+
+def test_parser_handles_arbitrary_chunk_boundaries():
+    body = {
+        "query": 'tricky "result": [ {',
+        "results": {
+            "meta": [{"result": [1]}],
+            "result": make_results("q", 5)["results"]["result"],
+        },
+    }
+    raw = json.dumps(body).encode()
+
+    for size in (1, 3, 7, 64, len(raw)):
+        parser = ResultStreamParser()
+        items = []
+        for start in range(0, len(raw), size):
+            items.extend(parser.feed(raw[start : start + size]))
+        parser.close()
+
+        assert items == body["results"]["result"]
+
+
+def test_parser_rejects_truncated_array():
+    parser = ResultStreamParser()
+    parser.feed(b'{"results": {"result": [{"title": "a"},')
+
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_iter_search_yields_before_body_completes(querit_stub, make_backend):
+    slow_stream(querit_stub)
+    backend = make_backend()
+
+    start = time.perf_counter()
+    results = backend.iter_search("python", num_results=10)
+    first = next(results)
+    first_latency = time.perf_counter() - start
+    rest = list(results)
+
+    assert first.title == "python result 0"
+    assert [r.position for r in [first] + rest] == list(range(1, 11))
+    assert first_latency < 0.5
+    assert time.perf_counter() - start >= 1.0
+
+
+def test_aiter_search_yields_before_body_completes(querit_stub, make_backend):
+    slow_stream(querit_stub)
+    backend = make_backend()
+
+    async def first_result():
+        async for result in backend.aiter_search("python", num_results=10):
+            return result
+
+    start = time.perf_counter()
+    first = asyncio.run(first_result())
+
+    assert first.title == "python result 0"
+    assert time.perf_counter() - start < 0.5
+
+
+def test_iter_search_pages_sequentially(querit_stub, make_backend):
+    backend = make_backend()
+
+    results = list(backend.iter_search("python", num_results=15))
+
+    assert [r.position for r in results] == list(range(1, 16))
+    assert [(p["count"], p.get("offset", 0)) for p in querit_stub.requests] == [
+        (10, 0),
+        (5, 10),
+    ]
+
+
+def test_fully_consumed_stream_fills_cache(querit_stub, make_backend):
+    cache = InMemoryCache()
+    backend = make_backend(cache=cache)
+
+    streamed = list(backend.iter_search("python", num_results=3))
+    searched = backend.search("python", num_results=3)
+
+    assert len(querit_stub.requests) == 1
+    assert [r.title for r in searched] == [r.title for r in streamed]